@@ -0,0 +1,44 @@
+from threading import Lock
+
+#======================Asset Registry Class======================#
+# keeps how to load each asset by name and only loads it the first time it is asked for
+# lets images.py and sounds.py be imported without loading anything, or opening a window or the mixer
+# assets can be loaded from several threads at once, each one is still only loaded once
+class AssetRegistry():
+    def __init__(self):
+        self.__loaders = {} # name : function that loads the asset, in the order they were added
+        self.__assets = {} # name : asset, for every asset that has been loaded
+        self.__locks = {} # name : lock held while the asset is being loaded, so another thread waits for it rather than loading it again
+        self.__locks_lock = Lock() # held while a lock is added to locks
+
+    def add(self, name, loader): # add an asset that will be loaded with loader() when it is first asked for
+        self.__loaders[name] = loader
+
+    def has(self, name): # returns True if there is an asset with this name
+        return name in self.__loaders
+
+    def is_loaded(self, name): # returns True if the asset has already been loaded
+        return name in self.__assets
+
+    def get_names(self): # returns the name of every asset in the order they were added
+        return list(self.__loaders)
+
+    def get(self, name): # returns the asset, loading it if this is the first time it has been asked for
+        if name not in self.__assets:
+            with self.__locks_lock:
+                lock = self.__locks.setdefault(name, Lock())
+            with lock:
+                if name not in self.__assets: # another thread may have loaded it while this one waited
+                    self.__assets[name] = self.__loaders[name]()
+        return self.__assets[name]
+
+    def resolve(self, names): # returns a list of assets from a list of their names, which can be nested and can contain None
+        return [self.resolve(name) if isinstance(name, list) else (self.get(name) if name else None) for name in names]
+
+    def preload(self): # load every asset now rather than when they are first used
+        for name in self.__loaders:
+            self.get(name)
+
+    def submit_preload(self, executor): # start loading every asset that isn't loaded yet on the executor, returns a future for each
+        # an asset made from others loads them itself, on its own thread, so the executor's threads never wait on each other's tasks
+        return [executor.submit(self.get, name) for name in self.__loaders if name not in self.__assets]
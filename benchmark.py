@@ -0,0 +1,156 @@
+#======================Imports======================#
+import argparse
+import gc
+import json
+import platform
+import subprocess
+from itertools import product
+from random import Random
+from time import perf_counter_ns
+
+from headless import VirtualClock # imported first so the game runs without a window or sound
+import pygame
+
+from constants import *
+from game import Game
+from game_classes import KeyState, BulletStore, DefaultEnemy, FastEnemy, FlyingEnemy, CrowEnemy, ToughEnemy, SpiritEnemy
+import images
+
+ENEMY_CLASSES = [DefaultEnemy, FastEnemy, FlyingEnemy, CrowEnemy, ToughEnemy, SpiritEnemy]
+PHASES = ['update_enemies', 'update_players', 'update_items', 'check_player_hit', 'draw']
+SAFE_DISTANCE = 3*EIGHT_PIXELS # synthetic enemies and items are kept this far from the player so the player isn't hit straight away
+
+#======================Building Loads======================#
+def random_pos(random, game_rect, centre): # a random position in the game at least SAFE_DISTANCE from the centre
+    while True:
+        pos = (random.uniform(game_rect.left + EIGHT_PIXELS, game_rect.right - EIGHT_PIXELS),
+               random.uniform(game_rect.top + EIGHT_PIXELS, game_rect.bottom - EIGHT_PIXELS))
+        if ((pos[X] - centre[X])**2 + (pos[Y] - centre[Y])**2)**0.5 >= SAFE_DISTANCE:
+            return pos
+
+def build_state(enemy_class, enemies, bullets, crates, items, seed=0): # a game state with a synthetic load
+    # the load is built into a state from Game.get_state() so the game itself doesn't need to know about benchmarks
+    random = Random(seed)
+    game = Game((0,0), DEFAULT_HEX, FENCE_LIST, clock=VirtualClock(), seed=seed)
+    state = game.get_state()
+    game_rect = pygame.Rect((0,0), (GAME_WIDTH*EIGHT_PIXELS, GAME_HEIGHT*EIGHT_PIXELS))
+    centre = game_rect.center
+    state['countdown'] = 0 # straight into the game
+
+    for _ in range(enemies):
+        direction = random.randint(0,3)
+        if enemy_class == CrowEnemy:
+            enemy = CrowEnemy(random_pos(random, game_rect, centre), direction, game_rect)
+        else:
+            enemy = enemy_class(random_pos(random, game_rect, centre), direction)
+        state['enemies'].append(enemy.get_state())
+
+    bullet_store = BulletStore()
+    for _ in range(bullets):
+        direction = pygame.math.Vector2(1, 0).rotate(random.uniform(0, 360))
+        bullet_store.add((random.uniform(0, game_rect.right), random.uniform(0, game_rect.bottom)), direction, 1, 0)
+    state['players'][0]['bullets'] = bullet_store.get_state()
+
+    # crates go on random free cells away from the edges and the centre, like the crates placed between waves
+    free = [(row, column) for row in range(2, GAME_HEIGHT - 2) for column in range(2, GAME_WIDTH - 2)
+            if not state['grid'][row][column][1] and not (row in [7, 8] and column in [7, 8])]
+    for row, column in random.sample(free, min(crates, len(free))):
+        state['grid'][row][column] = [images.cell_images.index(images.crate_image), True, True]
+    state['collidables'] = None # merged again from the grid with the crates when the state is loaded
+    state['free_tiles'] = None
+
+    for _ in range(items):
+        pos = random_pos(random, game_rect, centre)
+        state['items'].append({'type'     : random.randint(0, len(images.item_images) - 1),
+                               'rect'     : [pos[X] - EIGHT_PIXELS//2, pos[Y] - EIGHT_PIXELS//2, EIGHT_PIXELS, EIGHT_PIXELS],
+                               'timer'    : 0,
+                               'visible'  : True})
+    return game, state
+
+#======================Timing======================#
+def time_phases(game, state, samples): # time each phase on its own, reloading the state and running one frame before every sample
+    phases = game.get_phases()
+    keys = KeyState()
+    screen = pygame.Surface(SCREEN_SIZE)
+    calls = {'update_enemies'   : phases['update_enemies'],
+             'update_players'   : lambda: phases['update_players'](keys),
+             'update_items'     : phases['update_items'],
+             'check_player_hit' : phases['check_player_hit'],
+             'draw'             : lambda: game.draw(screen)}
+
+    timings = {}
+    for phase in PHASES:
+        times = []
+        for _ in range(samples):
+            game.load_state(state) # every sample starts from exactly the same load
+            for warm_up in PHASES: # loading throws away the background, flow field and bullet rects, so an untimed frame builds them again
+                calls[warm_up]()
+            gc.disable()
+            start = perf_counter_ns()
+            calls[phase]()
+            times.append(perf_counter_ns() - start)
+            gc.enable()
+        times.sort()
+        timings[phase] = {'p50_ms'  : times[len(times)//2] / 1e6,
+                          'p99_ms'  : times[min(len(times) - 1, int(len(times)*0.99))] / 1e6,
+                          'mean_ms' : sum(times) / len(times) / 1e6}
+    return timings
+
+def scenario_name(scenario): # a short readable name for a scenario
+    return f"{scenario['enemies']} {scenario['enemy_class']}, {scenario['bullets']} bullets, {scenario['crates']} crates, {scenario['items']} items"
+
+def git_commit(): # the current commit so results can be compared across commits, None if it can't be found
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old_results, new_results): # print how the p50 of every phase changed between two result files
+    old_scenarios = {scenario_name(scenario) : scenario for scenario in old_results['scenarios']}
+    print(f"comparing {old_results.get('commit')} to {new_results.get('commit')} (p50, new / old)")
+    for scenario in new_results['scenarios']:
+        old = old_scenarios.get(scenario_name(scenario))
+        if not old:
+            continue
+        ratios = []
+        for phase in PHASES:
+            old_time, new_time = old['phases'][phase]['p50_ms'], scenario['phases'][phase]['p50_ms']
+            ratios.append(f"{phase} {new_time / old_time:.2f}x" if old_time else f"{phase} -")
+        print(f"  {scenario_name(scenario)}: {', '.join(ratios)}")
+
+#======================Command Line======================#
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="time each phase of a frame under synthetic loads and save the p50 / p99 as JSON")
+    parser.add_argument("--enemy-classes", default=",".join(enemy_class.__name__ for enemy_class in ENEMY_CLASSES))
+    parser.add_argument("--enemies", default="10,100,1000", help="comma separated numbers of enemies")
+    parser.add_argument("--bullets", default="50,500", help="comma separated numbers of bullets")
+    parser.add_argument("--crates", default="0,40", help="comma separated numbers of crates")
+    parser.add_argument("--items", default="5", help="comma separated numbers of items")
+    parser.add_argument("--samples", type=int, default=50, help="number of times each phase is timed in each scenario")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="a previous results file to compare against")
+    arguments = parser.parse_args()
+
+    enemy_classes = {enemy_class.__name__ : enemy_class for enemy_class in ENEMY_CLASSES}
+    numbers = lambda text: [int(number) for number in text.split(",")]
+    results = {'commit'         : git_commit(),
+               'python'         : platform.python_version(),
+               'pygame'         : pygame.version.ver,
+               'pixel_ratio'    : PIXEL_RATIO,
+               'samples'        : arguments.samples,
+               'scenarios'      : []}
+
+    for class_name, enemies, bullets, crates, items in product(arguments.enemy_classes.split(","), numbers(arguments.enemies),
+                                                             numbers(arguments.bullets), numbers(arguments.crates), numbers(arguments.items)):
+        game, state = build_state(enemy_classes[class_name], enemies, bullets, crates, items)
+        scenario = {'enemy_class' : class_name, 'enemies' : enemies, 'bullets' : bullets, 'crates' : crates, 'items' : items}
+        scenario['phases'] = time_phases(game, state, arguments.samples)
+        results['scenarios'].append(scenario)
+        print(f"{scenario_name(scenario)}: " + ", ".join(f"{phase} {timing['p50_ms']:.3f}/{timing['p99_ms']:.3f}ms" for phase, timing in scenario['phases'].items()))
+
+    with open(arguments.output, "w") as file:
+        json.dump(results, file, indent=1)
+
+    if arguments.compare:
+        with open(arguments.compare, "r") as file:
+            compare(json.load(file), results)
@@ -0,0 +1,85 @@
+#======================Imports======================#
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window is needed to build the atlas
+
+import argparse
+import json
+
+import pygame
+
+from constants import ATLAS_PATH, ATLAS_MANIFEST
+from image_cache import file_hash
+
+IMAGES_PATH = "assets/images"
+
+#======================Packing======================#
+def find_images(directory): # every png under the directory, sorted so the atlas comes out the same each time it is built
+    paths = []
+    for folder, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".png"):
+                paths.append(os.path.join(folder, file).replace(os.sep, "/")) # same form as the paths in images.py
+    return sorted(paths)
+
+def pack(sizes, sheet_width, sheet_height, padding): # place each size on a sheet, returns a (sheet, x, y) for each size and the height used on each sheet
+    # shelf packing: tallest images first, placed left to right along a shelf until it is full and then a new shelf is started below
+    # when a sheet has no room for another shelf, a new sheet is started
+    positions = [None] * len(sizes)
+    heights = [0]
+    x = y = shelf_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        width, height = sizes[i]
+        if width > sheet_width or height > sheet_height:
+            raise ValueError(f"an image of size {width}x{height} does not fit on a {sheet_width}x{sheet_height} sheet")
+        if x + width > sheet_width: # next shelf
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        if y + height > sheet_height: # next sheet
+            heights.append(0)
+            x = y = shelf_height = 0
+        positions[i] = (len(heights) - 1, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        heights[-1] = max(heights[-1], y + height)
+    return positions, heights
+
+def build_atlas(directory, sheet_width, sheet_height, padding, max_size): # pack the sprites in the directory into sheets and save them with a manifest
+    # images bigger than max_size, like the fonts and the fences, are left out and loaded on their own
+    # they are never drawn alongside other images and would only leave large empty spaces in the sheets that still cost memory to scale up
+    paths = []
+    images = []
+    for path in find_images(directory):
+        image = pygame.image.load(path)
+        if image.get_width() <= max_size and image.get_height() <= max_size:
+            paths.append(path)
+            images.append(image)
+    positions, heights = pack([image.get_size() for image in images], sheet_width, sheet_height, padding)
+
+    sheets = [pygame.Surface((sheet_width, height), pygame.SRCALPHA) for height in heights]
+    manifest = {'sheets' : [f"sheet{i}.png" for i in range(len(sheets))],
+                'images' : {},
+                'hashes' : {}} # so the game can tell if an image has been changed since the atlas was built
+    for path, image, (sheet, x, y) in zip(paths, images, positions):
+        sheets[sheet].blit(image, (x, y))
+        manifest['images'][path] = [sheet, x, y, image.get_width(), image.get_height()]
+        manifest['hashes'][path] = file_hash(path)
+
+    os.makedirs(ATLAS_PATH, exist_ok=True)
+    for name, sheet in zip(manifest['sheets'], sheets):
+        pygame.image.save(sheet, os.path.join(ATLAS_PATH, name))
+    with open(ATLAS_MANIFEST, "w") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+#======================Command Line======================#
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pack the sprites in assets/images into sprite sheets so the game can load them all at once")
+    parser.add_argument("--width", type=int, default=128, help="width of each sheet in unscaled pixels")
+    parser.add_argument("--height", type=int, default=128, help="maximum height of each sheet in unscaled pixels")
+    parser.add_argument("--padding", type=int, default=1, help="empty pixels left between images")
+    parser.add_argument("--max-size", type=int, default=64, help="images wider or taller than this are loaded on their own")
+    arguments = parser.parse_args()
+
+    manifest = build_atlas(IMAGES_PATH, arguments.width, arguments.height, arguments.padding, arguments.max_size)
+    print(f"packed {len(manifest['images'])} images into {len(manifest['sheets'])} sheets in {ATLAS_PATH}")
@@ -18,6 +18,11 @@ EIGHT_PIXELS = 8*PIXEL_RATIO # makes positioning easier to read, comprehend, and
 GAME_WIDTH = 16
 GAME_HEIGHT = 16
 FPS = 60
+REPLAY_PATH = "last_game.replay" # the input of the last game played is saved here
+ATLAS_PATH = "assets/atlas" # the sprite sheets made by build_atlas.py
+ATLAS_MANIFEST = ATLAS_PATH + "/atlas.json" # where each image is in the sprite sheets
+IMAGE_CACHE_PATH = f"cache/images_{PIXEL_RATIO}.cache" # the finished images for this size, made by images.py
+LOADING_THREADS = 4 # how many threads load the images, sounds and fonts at startup
 
 UP = 0
 LEFT = 1
@@ -56,6 +61,7 @@ SPIRIT_ENEMY = {"HEALTH" : 3,
 
 CROW_PAUSE = 2*FPS
 CROW_BLUR_DISTANCE = 2*PIXEL_RATIO
+CROW_BLUR_ALPHA = 100
 
 HIT_TIME = int(0.1 * FPS)
 SCORE_LENGTH = 0.25*FPS
@@ -64,6 +70,13 @@ SCORE_LENGTH = 0.25*FPS
 INDEX_MULTIPLIER = 2.5
 DELAY_MULTIPLIER = 1.6
 MIN_FRAMES = 12
+# the total difficulty of each group of waves is BASE + GROWTH*wave - wave**3, up to CAP
+DIFFICULTY_BASE_1P = 500
+DIFFICULTY_GROWTH_1P = 400
+DIFFICULTY_CAP_1P = 3000
+DIFFICULTY_BASE_2P = 800
+DIFFICULTY_GROWTH_2P = 600
+DIFFICULTY_CAP_2P = 5000
 
 #======================Items======================#
 BOMB = 0
@@ -95,6 +108,14 @@ BOMB_RANGE = 7*EIGHT_PIXELS
 ENEMY_ACHIEVEMENT = 500    # to unlock special eye colour
 BULLET_ACHIEVEMENT = 1000  # to unlock special gun colour
 
+#======================Sound======================#
+# a sound with a higher priority can take a channel from one with a lower priority, and has channels kept only for it
+LOW_PRIORITY = 0    # gunfire, kills and other sounds that happen many times a second
+MEDIUM_PRIORITY = 1 # buttons and items
+HIGH_PRIORITY = 2   # the player being hit or dying
+CHANNEL_PRIORITIES = [HIGH_PRIORITY]*2 + [MEDIUM_PRIORITY]*2 + [LOW_PRIORITY]*6 # the lowest priority of sound each mixer channel can play
+SOUND_CHANNELS = len(CHANNEL_PRIORITIES)
+
 #======================Other======================#
 BUTTON_PRESSED_DELAY = 2 * FPS
 
@@ -123,6 +144,8 @@ GRASS_GREEN = (146,156,89)
 DARK_GREEN = (75,105,47)
 
 SPIRIT_ENEMY_COLOUR = (25,0,25,180)
+HIT_COLOUR = (255,0,0,100) # drawn over an enemy that was just hit
+IMMUNE_COLOUR = (255,255,255,100) # drawn over a player that can't be damaged
 
 GOLD = (213,176,56)
 SILVER = (192,192,192)
@@ -189,5 +212,6 @@ CONTROLS = ["^","_","<",">",";"]
 CHARACTER_LIST_U = UPPER_ALPHABET + NUMBERS + SPECIAL_CHARACTERS
 CHARACTER_LIST = UPPER_ALPHABET + LOWER_ALPHABET + NUMBERS + SPECIAL_CHARACTERS + CONTROLS
 NEW_LINE = '/'
+FONT_CACHE_SIZE = 64 # how many rendered strings each font remembers
 
 DEFAULT_HEX = "09"+"0d"+"11"+"15"+"19"+"1b"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"+"00"
@@ -5,8 +5,8 @@ import pygame
 from constants import *
 from utility_functions import get_key, check_index, split
 from utility_classes import Pixel, ImageButton, Stack
-from images import undo_image, redo_image, clear_image, eraser_image, eraser_image_pressed
-from sounds import button_click, hover_effect
+import images
+import sounds
 
 #======================Colour Grid Class======================# 
 # a grid of selectable coloured pixels
@@ -72,14 +72,14 @@ class ColourGrid():
                 if pixel.get_rect().collidepoint(mpos) and not pixel.get_locked():
                     if click:
                         if self.__selected != pixel:
-                            button_click.play()
+                            sounds.play("button_click")
                         self.__selected = pixel
                         self.__update_select_rect()
                         self.__changed = True  # changed is used to check if an update is needed elsewhere
                     else:
                         if not self.__hover or self.__hover != pixel:
                             if self.__selected != pixel:
-                                hover_effect.play()
+                                sounds.play("hover_effect")
                             self.__hover = pixel
                             self.__update_hover_rect()
                         
@@ -120,10 +120,10 @@ class DrawingGrid():
         self.__undo_stack = Stack()
         self.__redo_stack = Stack()
 
-        self.__undo_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] + EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), undo_image)
-        self.__redo_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] + 2*EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), redo_image)
-        self.__clear_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y]), (EIGHT_PIXELS, EIGHT_PIXELS), clear_image)
-        self.__erase_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] - 2*EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), eraser_image, hold=False, pressed_image=eraser_image_pressed)
+        self.__undo_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] + EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), images.undo_image)
+        self.__redo_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] + 2*EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), images.redo_image)
+        self.__clear_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y]), (EIGHT_PIXELS, EIGHT_PIXELS), images.clear_image)
+        self.__erase_button = ImageButton((pos[X] + self.__columns*EIGHT_PIXELS + EIGHT_PIXELS, pos[Y] - 2*EIGHT_PIXELS), (EIGHT_PIXELS, EIGHT_PIXELS), images.eraser_image, hold=False, pressed_image=images.eraser_image_pressed)
 
         self.__colour_grid = ColourGrid((pos[X], pos[Y] - 2*EIGHT_PIXELS), colours, self.__columns)
         
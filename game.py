@@ -1,19 +1,27 @@
 from math import trunc, ceil
-from random import randint, choice
+from random import Random, randrange
+from struct import pack
+from zlib import crc32
 
 import pygame
 
 from constants import *
-from utility_classes import Queue, Font
+from utility_classes import Queue, get_font
+from grid_classes import SpatialHash, TileMap, FlowField, FreeTiles
 from game_classes import (Cell, Player, Item, Score, DefaultEnemy, FastEnemy, 
-                          FlyingEnemy, CrowEnemy, ToughEnemy, SpiritEnemy)
-from images import (white_flowers1_image, white_flowers2_image, grass1_image, grass2_image, grass3_image, 
-                    crate_image, small_font_image, huge_font_image, item_images, fences_image)
-from sounds import player_hit_sound, player_death_sound, crate_thud, item_sounds
+                          FlyingEnemy, CrowEnemy, ToughEnemy, SpiritEnemy, EnemyPool)
+import images
+import sounds
+
+# the enemy classes by name, saved states refer to them by name
+ENEMY_CLASSES = {enemy_class.__name__ : enemy_class for enemy_class in [DefaultEnemy, FastEnemy, FlyingEnemy, CrowEnemy, ToughEnemy, SpiritEnemy]}
 
 #======================Game Class======================#
 class Game():
-    def __init__(self, pos, character_hex, initial_obstacles, players=1, player2_hex=None):
+    def __init__(self, pos, character_hex, initial_obstacles, players=1, player2_hex=None, clock=None, seed=None):
+        # every random choice in the game comes from this generator so a game can be repeated exactly from its seed
+        self.__seed = seed if seed is not None else randrange(2**32)
+        self.__random = Random(self.__seed)
         self.__width = GAME_WIDTH
         self.__height = GAME_HEIGHT
         self.__rect = pygame.Rect((0,0), (self.__width*EIGHT_PIXELS, self.__height*EIGHT_PIXELS))
@@ -27,22 +35,27 @@ class Game():
             self.__player1_respawn = -1 # the frame on which player 1 will respawn
             self.__player2_respawn = -1
         self.__pos = pos
+        # the pauses after a player is hit use the clock passed in, a virtual clock means they take no real time
+        self.__delay = clock.delay if clock else pygame.time.delay
         
-        self.__small_font = Font(small_font_image, CHARACTER_LIST, WHITE, 2*PIXEL_RATIO)
-        self.__countdown_font = Font(huge_font_image, CHARACTER_LIST_U, WHITE, 4*PIXEL_RATIO, alpha=230)
+        self.__small_font = get_font(images.small_font_image, CHARACTER_LIST, WHITE, 2*PIXEL_RATIO)
+        self.__countdown_font = get_font(images.huge_font_image, CHARACTER_LIST_U, WHITE, 4*PIXEL_RATIO, alpha=230)
         
         # for each initial obstacle coordinate, add collision to the cell it represents
         for row, column in initial_obstacles:
             self.__grid[row][column].set_collision(True)
 
-        self.__collidable_rects = self.__collidable_rects_list()
+        self.__tile_map = TileMap(self.__width, self.__height) # the collidable tiles merged into rects, so players and bullets only check the tiles around them
+        self.__tile_map.build(self.__grid)
+        self.__flow_field = FlowField(self.__tile_map) # the shortest ways to the players, followed by ground enemies
+        self.__free_tiles = {} # min distance from the edges : the tiles without collision at least that far in, made when first needed
 
         # place random background tiles
-        self.__place_random(grass1_image, randint(1,4), 2)
-        self.__place_random(grass2_image, randint(1,4), 1)
-        self.__place_random(grass3_image, randint(1,4), 2)
-        self.__place_random(white_flowers1_image, randint(1,3), 3)
-        self.__place_random(white_flowers2_image, randint(1,2), 3)
+        self.__place_random(images.grass1_image, self.__random.randint(1,4), 2)
+        self.__place_random(images.grass2_image, self.__random.randint(1,4), 1)
+        self.__place_random(images.grass3_image, self.__random.randint(1,4), 2)
+        self.__place_random(images.white_flowers1_image, self.__random.randint(1,3), 3)
+        self.__place_random(images.white_flowers2_image, self.__random.randint(1,2), 3)
 
         self.__items = []
         self.__enemies = []
@@ -50,7 +63,10 @@ class Game():
         self.__scores = []
         
         self.__enemy_queue = Queue()
-        self.__enemy_rects = self.__enemy_rects_list()
+        self.__enemy_grid = SpatialHash() # the ground enemies, so an enemy only checks the enemies in the tiles around it for collisions
+        self.__hash_enemies()
+        self.__bullet_hash = SpatialHash() # rebuilt every frame so enemies only check the bullets in the tiles around them
+        self.__enemy_pool = EnemyPool() # the flying and spirit enemies, moved all at once every frame
 
         self.__countdown = 3*FPS
 
@@ -72,131 +88,97 @@ class Game():
         self.__time_freeze = False # if time should be frozen
         self.__time_freeze_time = 0 # the last time a time freeze was used
         self.__freeze_surface = pygame.Surface((self.__rect.width, self.__rect.height), pygame.SRCALPHA)
+        self.__image = pygame.Surface(self.__rect.size) # everything is drawn onto this each frame before it goes on the screen
+        self.__background = None # the cells under everything and the fences, drawn once and again only when the grid changes
+        self.__above_cells = [] # (layer, position) of cells with collision and an image, drawn on top of the players and enemies
 
     def __place_random(self, image, number, min_distance, collision=False, center_spawn=True): # place a random image on the grid
-        available = [] # list of available coordinates
-        for row in range(min_distance, self.__height - min_distance): # min_distance is distance from edges
-            for column in range(min_distance, self.__width - min_distance):
-                if self.__check_valid_placement(row, column, collision, center_spawn):
-                    available.append((row, column)) # append all valid coordinates to the list
+        # tiles that can't be used this time are taken out of the free tiles and put back afterwards, so each placement is O(1)
+        free_tiles = self.__get_free_tiles(min_distance)
+        excluded = [tile for tile in self.__excluded_tiles(collision, center_spawn) if tile in free_tiles]
+        for tile in excluded:
+            free_tiles.remove(tile)
+        placed = [] # tiles used this time that are still free afterwards
         for _ in range(number):
-            if len(available) > 0:
-                row, column = choice(available) # random coordinate from the list
-                self.__grid[row][column].set_image(image)
-                if collision:
-                    self.__grid[row][column].set_collision(True)
-                    self.__grid[row][column].set_shade(True)
-                available.remove((row, column))
-        if collision:
-            self.__collidable_rects = self.__collidable_rects_list() # update the collision list
-
-    def __check_valid_placement(self, row, column, collision, center_spawn):
-        if self.__grid[row][column].get_collision():
-            return False # false if already a collidable object in the position
-        
-        if not center_spawn and (row in [trunc((GAME_WIDTH-1)/2), GAME_WIDTH//2] and column in [trunc((GAME_HEIGHT-1)/2), GAME_HEIGHT//2]):
-            return False # false if it shouldn't spawn in the center and it is in the center
-                
-        if self.__players == 1:
-            if collision and self.__grid[row][column].get_rect().colliderect(self.__player.get_rect()):
-                return False # false if colliding with the player
-        elif self.__players == 2:
-            if collision and (self.__grid[row][column].get_rect().colliderect(self.__player1.get_rect()) 
-                              or self.__grid[row][column].get_rect().colliderect(self.__player2.get_rect())):
-                return False # false if colliding with either player
-            
-        return True # otherwise, placement is valid, return True
-    
-    def __collidable_rects_list(self): # return a list of rects for collidable cells in the grid
-        # loops through every coordinate in the grid and checks for their collision
-        # recursively combines adjacent rects into singular wider / taller rects
-        collidable_rects = [] # list of rects
-        row = 0
-        column = 0
-        checked = []
-        for row in range(self.__height):
-            for column in range(self.__width):
-                if (row, column) not in checked and self.__grid[row][column].get_collision():
-                    rect = self.__grid[row][column].get_rect().copy() # base rect is the rect of the cell
-
-                    # check for adjacent collisions horizontally, possible increasing the width of the rect
-                    checked_columns = []
-                    rect.width, checked_columns = self.__check_next_hor(row, column, checked_columns, checked, EIGHT_PIXELS)
-                    for checked_column in checked_columns:
-                        checked.append((row, checked_column))
-
-                    if len(checked_columns) == 1: # if nothing was found in the horizontal
-                        # check for adjacent collisions vertically, possibly increasing the height of the rect
-                        checked_rows = []
-                        rect.height, checked_rows = self.__check_next_vert(row, column, checked_rows, checked, EIGHT_PIXELS)
-                        for checked_row in checked_rows:
-                            checked.append((checked_row, column))
-
-                    collidable_rects.append(rect)
-        return collidable_rects
-
-    def __check_next_hor(self, row, column, checked_columns, checked, width): # recursive function to check for adjacent horizontal collidables
-        # checks the next coordinate horizontally in the grid
-        # if it exists, isn't checked, and has a collision, the function calls itself to look again
-        # once an invalid coordinate is found, the function unwinds and add 8 pixels to the width per call 
-        try:
-            checked_columns.append(column)
-            if (row, column+1) not in checked:
-                if self.__grid[row][column + 1].get_collision():
-                    width, checked_columns = self.__check_next_hor(row, column + 1, checked_columns, checked, width)
-                    return width + EIGHT_PIXELS, checked_columns
-        except IndexError:
-            pass
-        return width, checked_columns # base case
+            tile = free_tiles.choice(self.__random) # random coordinate from the free tiles
+            if tile is None:
+                break
+            row, column = tile
+            self.__grid[row][column].set_image(image)
+            free_tiles.remove(tile) # each tile is only used once each time
+            if collision:
+                self.__grid[row][column].set_collision(True)
+                self.__grid[row][column].set_shade(True)
+                self.__tile_map.add_tile(row, column) # only merges the rects next to it again
+                for other_free_tiles in self.__free_tiles.values(): # the tile is never free again
+                    other_free_tiles.remove(tile)
+            else:
+                placed.append(tile)
+        for tile in excluded + placed:
+            free_tiles.add(tile)
+        self.__background = None # drawn again with the new images
+
+    def __get_free_tiles(self, min_distance): # return the tiles without collision at least min_distance from the edges
+        if min_distance not in self.__free_tiles: # found from the grid the first time, then kept up to date as crates are placed
+            self.__free_tiles[min_distance] = FreeTiles((row, column) for row in range(min_distance, self.__height - min_distance)
+                                                        for column in range(min_distance, self.__width - min_distance)
+                                                        if not self.__grid[row][column].get_collision())
+        return self.__free_tiles[min_distance]
+
+    def __excluded_tiles(self, collision, center_spawn): # return the tiles without collision that still can't be placed on
+        excluded = []
+        if not center_spawn: # the center, if it shouldn't spawn there
+            excluded.extend((row, column) for row in sorted({trunc((GAME_WIDTH-1)/2), GAME_WIDTH//2}) for column in sorted({trunc((GAME_HEIGHT-1)/2), GAME_HEIGHT//2}))
+        if collision: # the tiles under any player, so they aren't stuck inside it
+            for player in self.get_players():
+                rect = player.get_rect()
+                excluded.extend((row, column) for row in range(rect.top // EIGHT_PIXELS, (rect.bottom - 1) // EIGHT_PIXELS + 1)
+                                for column in range(rect.left // EIGHT_PIXELS, (rect.right - 1) // EIGHT_PIXELS + 1))
+        return excluded
     
-    def __check_next_vert(self, row, column, checked_rows, checked, height): # recursive function to check for adjacent vertical collidables
-        # checks the next coordinate vertically in the grid
-        # if it exists, isn't checked, and has a collision, the function calls itself to look again
-        # once an invalid coordinate is found, the function unwinds and adds 8 pixels to the height per call
-        try:
-            checked_rows.append(row)
-            if (row + 1, column) not in checked:
-                if self.__grid[row + 1][column].get_collision():
-                    height, checked_rows = self.__check_next_vert(row + 1, column, checked_rows, checked, height)
-                    return height + EIGHT_PIXELS, checked_rows # when unwinding, each iteration adds 8 pixels
-        except IndexError:
-            pass
-        return height, checked_rows # base case
-
-    def __enemy_rects_list(self): # returns a list of rects of all ground enemies
-        rect_list = []
+    def __hash_enemies(self): # put all ground enemies into the enemy grid
+        self.__enemy_grid.clear()
         for enemy in self.__enemies:
             if not enemy.get_flying():
-                rect_list.append(enemy.get_rect()) 
-        return rect_list
+                self.__enemy_grid.insert(enemy, enemy.get_rect())
+
+    def __pool_enemies(self): # put all the enemies the enemy pool can move into it
+        self.__enemy_pool.clear()
+        for enemy in self.__enemies:
+            if self.__enemy_pool.accepts(enemy):
+                self.__enemy_pool.add(enemy)
+
+    def __remove_enemy(self, enemy): # remove an enemy from the enemy list and the enemy pool
+        self.__enemies.remove(enemy)
+        self.__enemy_pool.remove(enemy)
 
     def __enemy_group(self, enemy_class, amount): # returns a dictionary with an amount of enemies and a difficulty of an enemy class
         enemies = []
-        spawn_side = randint(0,3)
+        spawn_side = self.__random.randint(0,3)
         groups = amount // 4   # the number of groups of 4  
         remaining = amount % 4 # the number of remaining enemies after groups of 4 are taken out
 
         # spawn the groups of 4 in lines
         for _ in range(groups): 
             if spawn_side == UP:
-                enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4) for side_position in range(0,4)) 
+                enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random) for side_position in range(0,4)) 
             elif spawn_side == LEFT:
-                enemies.extend(enemy_class((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4) for side_position in range(0,4))
+                enemies.extend(enemy_class((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4, random_generator=self.__random) for side_position in range(0,4))
             elif spawn_side == DOWN:
-                enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4) for side_position in range(0,4))
+                enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random) for side_position in range(0,4))
             elif spawn_side == RIGHT:
-                enemies.extend(enemy_class(((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS)), direction=(spawn_side+2)%4) for side_position in range(0,4))
+                enemies.extend(enemy_class(((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS)), direction=(spawn_side+2)%4, random_generator=self.__random) for side_position in range(0,4))
         
         side_positions = [2, 1, 3, 0]
         # spawn the remaining enemies, prioritising spawning them in the middle
         if spawn_side == UP:
-            enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4) for i in range(remaining)) 
+            enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random) for i in range(remaining)) 
         elif spawn_side == LEFT:
-            enemies.extend(enemy_class((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS), direction=(spawn_side+2)%4) for i in range(remaining))
+            enemies.extend(enemy_class((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS), direction=(spawn_side+2)%4, random_generator=self.__random) for i in range(remaining))
         elif spawn_side == DOWN:
-            enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4) for i in range(remaining))
+            enemies.extend(enemy_class((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random) for i in range(remaining))
         elif spawn_side == RIGHT:
-            enemies.extend(enemy_class(((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS)), direction=(spawn_side+2)%4) for i in range(remaining))
+            enemies.extend(enemy_class(((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_positions[i]*EIGHT_PIXELS)), direction=(spawn_side+2)%4, random_generator=self.__random) for i in range(remaining))
         
         difficulty = 0
         for enemy in enemies:
@@ -207,16 +189,16 @@ class Game():
     def __fast_enemy(self, amount): # returns a dictionary with an amount of fast enemies and a difficulty
         enemies = []
         for _ in range(amount):
-            spawn_side = randint(0,3) # random side for spawing
-            side_position = randint(0,3) # random position on that side
+            spawn_side = self.__random.randint(0,3) # random side for spawing
+            side_position = self.__random.randint(0,3) # random position on that side
             if spawn_side == UP:
-                enemies.append(FastEnemy((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4))
+                enemies.append(FastEnemy((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.top + EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random))
             elif spawn_side == LEFT:
-                enemies.append(FastEnemy((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4))
+                enemies.append(FastEnemy((self.__rect.left + EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4, random_generator=self.__random))
             elif spawn_side == DOWN:
-                enemies.append(FastEnemy((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4))
+                enemies.append(FastEnemy((self.__rect.centerx - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS, self.__rect.bottom - EIGHT_PIXELS/2), direction=(spawn_side+2)%4, random_generator=self.__random))
             elif spawn_side == RIGHT:
-                enemies.append(FastEnemy((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4))
+                enemies.append(FastEnemy((self.__rect.right - EIGHT_PIXELS/2, self.__rect.centery - (3/2)*(EIGHT_PIXELS) + side_position*EIGHT_PIXELS), direction=(spawn_side+2)%4, random_generator=self.__random))
         
         difficulty = 0
         for enemy in enemies:
@@ -227,8 +209,8 @@ class Game():
     def __flying_enemy(self, amount): # returns a dictionary with an amount of flying enemies and a difficulty
         enemies = []
         for _ in range(amount):
-            side = randint(0,3)
-            position = randint(1, GAME_WIDTH-2) # random position along an edge
+            side = self.__random.randint(0,3)
+            position = self.__random.randint(1, GAME_WIDTH-2) # random position along an edge
             if side == RIGHT:
                 enemies.append(FlyingEnemy((self.__rect.right + EIGHT_PIXELS//2, position*EIGHT_PIXELS + EIGHT_PIXELS//2), direction=(side+2)%4))
             elif side == LEFT:
@@ -246,8 +228,8 @@ class Game():
 
     def __crow_enemy(self): # returns a dictionary with an amount of crow enemies and a difficulty
         enemies = []
-        side = randint(0,3)
-        position = randint(1, GAME_WIDTH-2) # random position along an edge
+        side = self.__random.randint(0,3)
+        position = self.__random.randint(1, GAME_WIDTH-2) # random position along an edge
         if side == RIGHT:
             enemies.append(CrowEnemy((self.__rect.right + EIGHT_PIXELS//2, position*EIGHT_PIXELS + EIGHT_PIXELS//2), (side+2)%4, self.__rect))
         elif side == LEFT:
@@ -266,8 +248,8 @@ class Game():
     def __spirit_enemy(self, amount): # returns a dictionary with an amount of spirit enemies and a difficulty
         enemies = []
         for _ in range(amount):
-            side = randint(0,3)
-            position = randint(1, GAME_WIDTH-2) # random position along an edge
+            side = self.__random.randint(0,3)
+            position = self.__random.randint(1, GAME_WIDTH-2) # random position along an edge
             if side == RIGHT:
                 enemies.append(SpiritEnemy((self.__rect.right + EIGHT_PIXELS//2, position*EIGHT_PIXELS + EIGHT_PIXELS//2), direction=(side+2)%4))
             elif side == LEFT:
@@ -285,9 +267,9 @@ class Game():
 
     def __generate_enemy_waves_1p(self): # enqueues dictionaries of enemies to the enemy queue
         # total difficulty specifies the total sum of enemy scores for the enemy waves group
-        total_difficulty = 500 + 400*self.__wave_index - (self.__wave_index**3) # gradually increases for each wave group
-        if total_difficulty > 3000: # capped at 3000
-            total_difficulty = 3000 
+        total_difficulty = DIFFICULTY_BASE_1P + DIFFICULTY_GROWTH_1P*self.__wave_index - (self.__wave_index**3) # gradually increases for each wave group
+        if total_difficulty > DIFFICULTY_CAP_1P: # capped at 3000
+            total_difficulty = DIFFICULTY_CAP_1P 
         difficulty = 0
 
         # while the sum of enemy scores is less than the desired sum, randomly select the enemy type to create a wave of
@@ -295,49 +277,49 @@ class Game():
         # enqueue that wave and add the sum of scores to the overall sum
         # the range of enemies that can spawn and the number of enemies that can spawn at once for each type change over time
         while difficulty < total_difficulty:
-            match randint(0,(self.__wave_index + 1) if self.__wave_index < 5 else 5): # randomly selects the enemy type to create a wave of
+            match self.__random.randint(0,(self.__wave_index + 1) if self.__wave_index < 5 else 5): # randomly selects the enemy type to create a wave of
                 case 0: # default enemies can spawn from wave 0
-                    wave = self.__enemy_group(DefaultEnemy, randint(2, 6) if self.__wave_index < 3 else (randint(4, 10) if self.__wave_index < 6 else randint(2,6)))
+                    wave = self.__enemy_group(DefaultEnemy, self.__random.randint(2, 6) if self.__wave_index < 3 else (self.__random.randint(4, 10) if self.__wave_index < 6 else self.__random.randint(2,6)))
                 case 1: # fast enemies can spawn from wave 0
-                    wave = self.__fast_enemy(1 if self.__wave_index < 3 else (randint(1, 2) if self.__wave_index < 6 else randint(2,3)))
+                    wave = self.__fast_enemy(1 if self.__wave_index < 3 else (self.__random.randint(1, 2) if self.__wave_index < 6 else self.__random.randint(2,3)))
                 case 2: # flying enemies can spawn from wave 1
-                    wave = self.__flying_enemy(1 if self.__wave_index < 2 else (randint(1, 2) if self.__wave_index < 7 else randint(2,4)))
+                    wave = self.__flying_enemy(1 if self.__wave_index < 2 else (self.__random.randint(1, 2) if self.__wave_index < 7 else self.__random.randint(2,4)))
                 case 3: # crow enemies can spawn from wave 2
                     wave = self.__crow_enemy() # always 1 crow enemy
                 case 4: # tough enemies can spawn from wave 3
-                    wave = self.__enemy_group(ToughEnemy, randint(4,6) if self.__wave_index < 4 else (randint(4, 10) if self.__wave_index < 8 else randint(6,12)))
+                    wave = self.__enemy_group(ToughEnemy, self.__random.randint(4,6) if self.__wave_index < 4 else (self.__random.randint(4, 10) if self.__wave_index < 8 else self.__random.randint(6,12)))
                 case 5: # spirit enemies can spawn from wave 4
-                    wave = self.__spirit_enemy(1 if self.__wave_index < 5 else (randint(1, 3) if self.__wave_index < 8 else randint(2,4)))
+                    wave = self.__spirit_enemy(1 if self.__wave_index < 5 else (self.__random.randint(1, 3) if self.__wave_index < 8 else self.__random.randint(2,4)))
             self.__enemy_queue.enqueue(wave)
             difficulty += wave['difficulty']
 
     def __generate_enemy_waves_2p(self): # very similar to its 1 player counterpart but tailored for two player
-        total_difficulty = 800 + 600*self.__wave_index - (self.__wave_index**3) # higher score sum for 2p
-        if total_difficulty > 5000: # higher limit
-            total_difficulty = 5000 
+        total_difficulty = DIFFICULTY_BASE_2P + DIFFICULTY_GROWTH_2P*self.__wave_index - (self.__wave_index**3) # higher score sum for 2p
+        if total_difficulty > DIFFICULTY_CAP_2P: # higher limit
+            total_difficulty = DIFFICULTY_CAP_2P 
         difficulty = 0
 
         # the number of enemies that can spawn in each wave is increased for two player
         while difficulty < total_difficulty:
-            match randint(0, (self.__wave_index + 1) if self.__wave_index < 5 else 5):
+            match self.__random.randint(0, (self.__wave_index + 1) if self.__wave_index < 5 else 5):
                 case 0: # spawns from wave 0
-                    wave = self.__enemy_group(DefaultEnemy, randint(2, 6) if self.__wave_index < 3 else (randint(4, 12) if self.__wave_index < 6 else randint(6,14)))
+                    wave = self.__enemy_group(DefaultEnemy, self.__random.randint(2, 6) if self.__wave_index < 3 else (self.__random.randint(4, 12) if self.__wave_index < 6 else self.__random.randint(6,14)))
                 case 1: # spawns from wave 0
-                    wave = self.__fast_enemy(1 if self.__wave_index < 2 else (randint(2, 3) if self.__wave_index < 6 else randint(2,4)))
+                    wave = self.__fast_enemy(1 if self.__wave_index < 2 else (self.__random.randint(2, 3) if self.__wave_index < 6 else self.__random.randint(2,4)))
                 case 2: # spawns from wave 1
-                    wave = self.__flying_enemy(1 if self.__wave_index < 2 else (randint(2, 3) if self.__wave_index < 7 else randint(3,5)))
+                    wave = self.__flying_enemy(1 if self.__wave_index < 2 else (self.__random.randint(2, 3) if self.__wave_index < 7 else self.__random.randint(3,5)))
                 case 3: # spawns from wave 2
                     wave = self.__crow_enemy()
                 case 4: # spawns from wave 3
-                    wave = self.__enemy_group(ToughEnemy, randint(4,8) if self.__wave_index < 4 else (randint(6, 12) if self.__wave_index < 8 else randint(8,14)))
+                    wave = self.__enemy_group(ToughEnemy, self.__random.randint(4,8) if self.__wave_index < 4 else (self.__random.randint(6, 12) if self.__wave_index < 8 else self.__random.randint(8,14)))
                 case 5: # spawns from wave 4
-                    wave = self.__spirit_enemy(1 if self.__wave_index < 5 else (randint(2, 3) if self.__wave_index < 8 else randint(3,5)))
+                    wave = self.__spirit_enemy(1 if self.__wave_index < 5 else (self.__random.randint(2, 3) if self.__wave_index < 8 else self.__random.randint(3,5)))
             self.__enemy_queue.enqueue(wave)
             difficulty += wave['difficulty']
 
     def __first_waves(self): # allows the very first wave to be controlled
-        self.__enemy_queue.enqueue(self.__enemy_group(DefaultEnemy, randint(3,6))) # spawn between 3 and 6 default enemies
-        self.__enemy_queue.enqueue(self.__enemy_group(DefaultEnemy, randint(4,8))) # spawn between 4 and 8 more
+        self.__enemy_queue.enqueue(self.__enemy_group(DefaultEnemy, self.__random.randint(3,6))) # spawn between 3 and 6 default enemies
+        self.__enemy_queue.enqueue(self.__enemy_group(DefaultEnemy, self.__random.randint(4,8))) # spawn between 4 and 8 more
 
     def __use_item(self, type, player=0): # use an item
         match player: # which player used the item
@@ -364,8 +346,8 @@ class Game():
         elif type == HEART:
             player_class.increase_health(1)
 
-        if item_sounds[type]: # if there is a sound for the item
-            item_sounds[type].play()
+        if sounds.item_sounds[type]: # if there is a sound for the item
+            sounds.play(sounds.item_sounds[type])
 
         self.__items_used += 1
 
@@ -378,7 +360,7 @@ class Game():
                 to_kill.append(enemy)
         # remove the enemies in the list from the main enemy list
         for enemy in to_kill:
-            self.__enemies.remove(enemy)
+            self.__remove_enemy(enemy)
             self.__enemies_killed += 1
         self.__bomb_time = self.__timer
         self.__shake = True
@@ -392,6 +374,144 @@ class Game():
             return self.__player.get_item().get_type()
         return None
     
+    def get_players(self): # return a list of the players in the game
+        if self.__players == 1:
+            return [self.__player]
+        elif self.__players == 2:
+            return [self.__player1, self.__player2]
+
+    def get_enemies(self): # return the list of enemies
+        return self.__enemies
+
+    def get_game_over(self): # return True if every player is out of lives
+        if self.__players == 1:
+            return self.__player.get_lives() <= 0
+        elif self.__players == 2:
+            return self.__player1.get_lives() <= 0 and self.__player2.get_lives() <= 0
+
+    def get_timer(self): # return the number of frames since the countdown finished
+        return self.__timer
+
+    def get_wave_index(self): # return the number of groups of waves that have been generated, -1 before the first
+        return self.__wave_index
+
+    def get_phases(self): # return the parts of update by name so that they can be timed separately
+        return {'update_enemies'    : self.__update_enemies,
+                'update_players'    : self.__update_players,
+                'update_items'      : self.__update_items,
+                'check_player_hit'  : self.__check_player_hit}
+
+    def get_seed(self): # return the seed of the game's random generator
+        return self.__seed
+
+    def get_checksum(self): # return a CRC32 of the state of every entity, cheap enough to take every frame
+        # two games given the same seed and input should give the same checksum on every frame
+        values = [self.__timer, self.__countdown, self.__wave_index, self.__enemy_timer, self.__enemy_delay,
+                  self.__time_score, self.__enemy_score, self.__enemies_killed, self.__enemy_queue.size(), len(self.__enemies_to_spawn)]
+        for player in self.get_players():
+            values.extend((player.get_pos()[X], player.get_pos()[Y], player.get_lives(), player.get_bullets_shot()))
+            values.extend(player.get_bullets().get_positions())
+        for enemy in self.__enemies:
+            values.extend((enemy.get_pos()[X], enemy.get_pos()[Y], enemy.get_health()))
+        for item in self.__items:
+            values.extend((item.get_type(), item.get_rect().x, item.get_rect().y))
+        return crc32(pack(f"<{len(values)}d", *values))
+
+    def __enemy_from_state(self, state): # create an enemy from a state returned by its get_state
+        enemy_class = ENEMY_CLASSES[state['type']]
+        direction = state['direction'] if state['direction'] is not None else UP # only decides the initial image, which is then loaded over
+        if enemy_class == CrowEnemy:
+            enemy = CrowEnemy(state['pos'], direction, self.__rect)
+        elif enemy_class in [FlyingEnemy, SpiritEnemy]:
+            enemy = enemy_class(state['pos'], direction)
+        else:
+            enemy = enemy_class(state['pos'], direction, random_generator=self.__random)
+        enemy.load_state(state)
+        return enemy
+
+    def get_state(self): # return everything that changes during the game as a dictionary of plain values
+        # the dictionary can be saved as JSON and passed to load_state to carry on from exactly the same point
+        version, internal_state, gauss_next = self.__random.getstate()
+        state = {'random'           : [version, list(internal_state), gauss_next],
+                 'grid'             : [[[images.cell_images.index(cell.get_image()), cell.get_collision(), cell.get_shade()] for cell in row] for row in self.__grid],
+                 'collidables'      : [list(rect) for rect in self.__tile_map.get_rects()], # saved as merging crates one at a time depends on the order they were placed in
+                 'free_tiles'       : [[min_distance, [list(tile) for tile in free_tiles.get_tiles()]] for min_distance, free_tiles in self.__free_tiles.items()], # the order decides where crates go
+                 'players'          : [player.get_state() for player in self.get_players()],
+                 'items'            : [item.get_state() for item in self.__items],
+                 'enemies'          : [enemy.get_state() for enemy in self.__enemies],
+                 'enemies_to_spawn' : [enemy.get_state() for enemy in self.__enemies_to_spawn],
+                 'enemy_queue'      : [{'enemies' : [enemy.get_state() for enemy in wave['enemies']], 'difficulty' : wave['difficulty']} for wave in self.__enemy_queue.get_items()],
+                 'scores'           : [score.get_state() for score in self.__scores],
+                 'countdown'        : self.__countdown,
+                 'time_score'       : self.__time_score,
+                 'enemy_score'      : self.__enemy_score,
+                 'enemies_killed'   : self.__enemies_killed,
+                 'items_used'       : self.__items_used,
+                 'item_countdown'   : self.__item_countdown,
+                 'crate_countdown'  : self.__crate_countdown,
+                 'enemy_delay'      : self.__enemy_delay,
+                 'enemy_timer'      : self.__enemy_timer,
+                 'timer'            : self.__timer,
+                 'wave_index'       : self.__wave_index,
+                 'shake'            : self.__shake,
+                 'bomb_time'        : self.__bomb_time,
+                 'time_freeze'      : self.__time_freeze,
+                 'time_freeze_time' : self.__time_freeze_time}
+        if self.__players == 2:
+            state['respawn'] = [self.__player1_respawn, self.__player2_respawn]
+        return state
+
+    def load_state(self, state): # set the game back to a state returned by get_state
+        version, internal_state, gauss_next = state['random']
+        self.__random.setstate((version, tuple(internal_state), gauss_next))
+
+        for row in range(self.__height):
+            for column in range(self.__width):
+                image, collision, shade = state['grid'][row][column]
+                self.__grid[row][column].set_image(images.cell_images[image])
+                self.__grid[row][column].set_collision(collision)
+                self.__grid[row][column].set_shade(shade)
+        collidables = state['collidables'] # None to merge them again from the grid
+        self.__tile_map.build(self.__grid, None if collidables is None else [pygame.Rect(rect) for rect in collidables])
+        free_tiles = state['free_tiles'] # None to find them again from the grid when they are next needed
+        self.__background = None
+        self.__free_tiles = {min_distance : FreeTiles(tuple(tile) for tile in tiles) for min_distance, tiles in free_tiles or []}
+
+        for player, player_state in zip(self.get_players(), state['players']):
+            player.load_state(player_state)
+
+        self.__items = [Item.from_state(item) for item in state['items']]
+        self.__enemies = [self.__enemy_from_state(enemy) for enemy in state['enemies']]
+        self.__enemies_to_spawn = [self.__enemy_from_state(enemy) for enemy in state['enemies_to_spawn']]
+        self.__hash_enemies()
+        self.__pool_enemies()
+        self.__enemy_queue.reset()
+        for wave in state['enemy_queue']:
+            self.__enemy_queue.enqueue({'enemies' : [self.__enemy_from_state(enemy) for enemy in wave['enemies']], 'difficulty' : wave['difficulty']})
+        self.__scores = []
+        for score_state in state['scores']:
+            score = Score(self.__small_font, WHITE, score_state['score'], pygame.Rect(score_state['rect']), alpha=SCORE_ALPHA)
+            score.set_timer(score_state['timer'])
+            self.__scores.append(score)
+
+        self.__countdown = state['countdown']
+        self.__time_score = state['time_score']
+        self.__enemy_score = state['enemy_score']
+        self.__enemies_killed = state['enemies_killed']
+        self.__items_used = state['items_used']
+        self.__item_countdown = state['item_countdown']
+        self.__crate_countdown = state['crate_countdown']
+        self.__enemy_delay = state['enemy_delay']
+        self.__enemy_timer = state['enemy_timer']
+        self.__timer = state['timer']
+        self.__wave_index = state['wave_index']
+        self.__shake = state['shake']
+        self.__bomb_time = state['bomb_time']
+        self.__time_freeze = state['time_freeze']
+        self.__time_freeze_time = state['time_freeze_time']
+        if self.__players == 2:
+            self.__player1_respawn, self.__player2_respawn = state['respawn']
+
     def get_player_lives(self): # return the player's lives
         if self.__players == 1:
             return self.__player.get_lives()
@@ -421,9 +541,12 @@ class Game():
     
     def __check_enemy_spawn(self): # add the enemies that won't collide with another enemy to the main enemy list
         for enemy in self.__enemies_to_spawn: 
-            if enemy.get_rect().collidelist(self.__enemy_rects) == -1 or enemy.get_flying(): # checking for collision
+            if enemy.get_flying() or not self.__enemy_grid.collides(enemy.get_rect()): # checking for collision
                 self.__enemies.append(enemy)
-                self.__enemy_rects.append(enemy.get_rect()) # add the enemy's rect to the enemy rects list
+                if self.__enemy_pool.accepts(enemy):
+                    self.__enemy_pool.add(enemy) # add the enemy to the enemy pool
+                if not enemy.get_flying():
+                    self.__enemy_grid.insert(enemy, enemy.get_rect()) # add the enemy to the enemy grid
                 self.__enemies_to_spawn.remove(enemy)
     
     def __check_player_hit(self): # check if a player has been hit
@@ -438,12 +561,15 @@ class Game():
                     if not self.__player.get_immunity(): # first checking if the player is immune
                         self.__player.hit(1) # take one life off the player and return them to the centre
                         if self.__player.get_lives() == 0:
-                            player_death_sound.play()
-                            pygame.time.delay(2000) # pause for 2 seconds if the player is dead
+                            sounds.play("player_death_sound")
+                            sounds.flush() # started now so it plays during the pause, not after it
+                            self.__delay(2000) # pause for 2 seconds if the player is dead
                         else:
-                            player_hit_sound.play()
-                            pygame.time.delay(1200) # pause for 1.2 seconds if the player is not yet dead
+                            sounds.play("player_hit_sound")
+                            sounds.flush()
+                            self.__delay(1200) # pause for 1.2 seconds if the player is not yet dead
                         self.__enemies = [] # reset the enemy list
+                        self.__enemy_pool.clear()
                         self.__player.empty_bullets() # reset the player's bullets
                         self.__items = [] # reset the items
                     break # stop looking at enemies to prevent errors
@@ -459,7 +585,7 @@ class Game():
                         self.__player1.add_immunity(7*FPS)  # 7 to account for 3 seconds of respawning
                         self.__player1_respawn = self.__timer + 3*FPS # not spawned for 3 seconds
                         self.__player1.set_spawned(False)
-                        self.__enemies.remove(enemy)
+                        self.__remove_enemy(enemy)
                         break
                 if distance2 < 7*PIXEL_RATIO:
                     if not self.__player2.get_immunity() and self.__player2.get_lives() > 0:
@@ -467,70 +593,72 @@ class Game():
                         self.__player2.add_immunity(7*FPS) # 7 to account for 3 seconds of respawning
                         self.__player2_respawn = self.__timer + 3*FPS # not spawned for 3 seconds
                         self.__player2.set_spawned(False)
-                        self.__enemies.remove(enemy)
+                        self.__remove_enemy(enemy)
                         break
     
-    def __update_players(self): # update the player(s)
+    def __update_players(self, keys): # update the player(s)
         if self.__players == 1:
-            self.__player.update(self.__collidable_rects) # update player 1
+            self.__player.update(self.__tile_map, keys=keys) # update player 1
         elif self.__players == 2:
             rect1, rect2 = None, None
             if self.__player1.get_lives() > 0 and self.__player1.get_spawned():
                 rect1 = self.__player1.get_rect()
             if self.__player2.get_lives() > 0 and self.__player2.get_spawned():
                 rect2 = self.__player2.get_rect()  
-            self.__player1.update(self.__collidable_rects, other_player_rect = rect2) # update player 1 with player 2's rect if they're spawned
-            self.__player2.update(self.__collidable_rects, other_player_rect = rect1) # update player 2 with player 1's rect if they're spawned
+            self.__player1.update(self.__tile_map, other_player_rect = rect2, keys=keys) # update player 1 with player 2's rect if they're spawned
+            self.__player2.update(self.__tile_map, other_player_rect = rect1, keys=keys) # update player 2 with player 1's rect if they're spawned
+
+    def __hash_bullets(self): # put every player's bullets into the bullet hash along with the player that shot them
+        self.__bullet_hash.clear()
+        if not self.__enemies:
+            return # nothing to hit
+        for player in self.get_players():
+            for index, rect in enumerate(player.get_bullets().get_rects()):
+                self.__bullet_hash.insert((player, index), rect)
 
     def __update_enemies(self): # update the enemies
+        self.__hash_bullets() # bullets don't move while the enemies update, so the hash is built once per frame
+        if self.__players == 1:
+            player1_pos, player2_pos = self.__player.get_pos(), None
+        elif self.__players == 2:
+            # enemies only travel towards alive and non-immune players
+            player1_pos, player2_pos = None, None 
+            if self.__player1.get_lives() > 0 and not self.__player1.get_immunity():
+                player1_pos = self.__player1.get_pos()
+            if self.__player2.get_lives() > 0 and not self.__player2.get_immunity():
+                player2_pos = self.__player2.get_pos()
+        if not self.__time_freeze:
+            self.__enemy_pool.update(player1_pos, player2_pos) # the players don't move until after the enemies
+            self.__flow_field.update([player1_pos, player2_pos]) # only searched again if a player has changed tile or a crate was placed
+
         for enemy in self.__enemies:
-            # check if the enemy has been hit by a bullet
-            if self.__players == 1:
-                for bullet in self.__player.get_bullets():
-                    if enemy.get_rect().colliderect(bullet.get_rect()):
-                        enemy.hit(bullet.get_damage())
-                        self.__player.remove_bullet(bullet)
-            elif self.__players == 2:
-                for bullet in self.__player1.get_bullets():
-                    if enemy.get_rect().colliderect(bullet.get_rect()):
-                        enemy.hit(bullet.get_damage()) # damage the enemy with the bullet's damage
-                        self.__player1.remove_bullet(bullet)
-                for bullet in self.__player2.get_bullets():
-                    if enemy.get_rect().colliderect(bullet.get_rect()):
-                        enemy.hit(bullet.get_damage())
-                        self.__player2.remove_bullet(bullet)
+            # check if the enemy has been hit by a bullet, only bullets in the same tiles as the enemy can hit it
+            for player, index in self.__bullet_hash.query(enemy.get_rect()):
+                bullets = player.get_bullets()
+                if enemy.get_rect().colliderect(bullets.get_rect(index)):
+                    enemy.hit(bullets.get_damage(index)) # damage the enemy with the bullet's damage
+                    player.remove_bullet(index)
+                    self.__bullet_hash.remove((player, index))
                         
             # run the enemy's update function if time isn't frozen
             if not self.__time_freeze: 
-                if self.__players == 1:
-                    if not enemy.get_flying():
-                        enemy.update(self.__player.get_pos(), self.__rect, self.__collidable_rects, self.__enemy_rects.copy())
-                    else:
-                        enemy.update(self.__player.get_pos())
-                elif self.__players == 2:
-                    # enemies only travel towards alive and non-immune players
-                    player1_pos, player2_pos = None, None 
-                    if self.__player1.get_lives() > 0 and not self.__player1.get_immunity():
-                        player1_pos = self.__player1.get_pos()
-                    if self.__player2.get_lives() > 0 and not self.__player2.get_immunity():
-                        player2_pos = self.__player2.get_pos()
-
-                    if not enemy.get_flying():
-                        enemy.update(player1_pos, self.__rect, self.__collidable_rects, self.__enemy_rects.copy(), player2_pos=player2_pos)
-                    else:
-                        enemy.update(player1_pos, player2_pos=player2_pos)
+                if not enemy.get_flying():
+                    enemy.update(player1_pos, self.__rect, self.__tile_map.get_rects(), self.__enemy_grid, self.__flow_field, player2_pos=player2_pos)
+                    self.__enemy_grid.move(enemy, enemy.get_rect())
+                else:
+                    enemy.update(self.__enemy_pool) # flying and spirit enemies take what the pool worked out, crows ignore it
 
             if enemy.get_health() == -5: # crow enemy is set to -5 if it has flown off of screen
-                self.__enemies.remove(enemy) # no score added
+                self.__remove_enemy(enemy) # no score added
             elif enemy.get_health() <= 0:
-                if self.__item_countdown == 0 and randint(1,ITEM_CHANCE_1P if self.__players == 1 else ITEM_CHANCE_2P) == 1: # random chance for an item to spawn
+                if self.__item_countdown == 0 and self.__random.randint(1,ITEM_CHANCE_1P if self.__players == 1 else ITEM_CHANCE_2P) == 1: # random chance for an item to spawn
                     if (self.__players == 1 and self.__player.get_lives() < 4) or (self.__players == 2 and (self.__player1.get_lives() < 4 or self.__player2.get_lives() < 4)):
                         spawn_lives = True # only spawns lives if a player has less than 4 lives
                     else:
                         spawn_lives = False
-                    self.__items.append(Item(enemy.get_rect().center, randint(0, len(item_images)-1 - (0 if spawn_lives else 1))))
+                    self.__items.append(Item(enemy.get_rect().center, self.__random.randint(0, len(images.item_images)-1 - (0 if spawn_lives else 1))))
                     self.__item_countdown = ITEM_COUNTDOWN # items can't spawn within 0.5 seconds of eachother
-                self.__enemies.remove(enemy)
+                self.__remove_enemy(enemy)
                 self.__scores.append(Score(self.__small_font, WHITE, enemy.get_score(), enemy.get_rect(), alpha=SCORE_ALPHA))
                 self.__enemy_score += enemy.get_score() # add the enemy's score to the total
                 self.__enemies_killed += 1
@@ -571,7 +699,7 @@ class Game():
         if self.__time_freeze and self.__timer - self.__time_freeze_time >= TIME_FREEZE_LENGTH:
             self.__time_freeze = False
 
-    def update(self, event_list):
+    def update(self, event_list, keys=None): # keys defaults to the keyboard if not passed in
         for event in event_list:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                 if self.__players == 1: # in 1p, space uses an item
@@ -596,7 +724,7 @@ class Game():
             if not self.__player2.get_spawned() and self.__timer == self.__player2_respawn:
                 self.__player2.set_spawned(True)
 
-        self.__enemy_rects = self.__enemy_rects_list() # update the enemy_rects list
+        self.__hash_enemies() # rebuilt every frame as enemies are removed in many places
         self.__check_enemy_spawn() # check if any more enemies can spawn
         
         if not self.__countdown: # update if not during the 3 second countdown
@@ -604,7 +732,7 @@ class Game():
             self.__update_scores()
             self.__update_items()
 
-        self.__update_players() # player can move during the countdown
+        self.__update_players(keys) # player can move during the countdown
 
         if not self.__countdown and not self.__time_freeze:
             if self.__wave_index == -1: # immediately spawn first wave 
@@ -615,10 +743,10 @@ class Game():
                     if not self.__crate_countdown:
                         self.__crate_countdown = 1*FPS # first countdown, until a crate is spawned
                     elif self.__crate_countdown == 1:  # 0 would be caught by first if
-                        crate_thud.play()
-                        self.__place_random(crate_image, 1, 2, collision=True, center_spawn=False)
+                        sounds.play("crate_thud")
+                        self.__place_random(images.crate_image, 1, 2, collision=True, center_spawn=False)
                         if self.__players == 2: # place a second crate in 2 player
-                            self.__place_random(crate_image, 1, 2, collision=True, center_spawn=False)
+                            self.__place_random(images.crate_image, 1, 2, collision=True, center_spawn=False)
 
                         if self.__players == 1:
                             self.__generate_enemy_waves_1p()
@@ -649,6 +777,8 @@ class Game():
         else:
             self.__countdown -= 1
 
+        self.__check_player_hit() # checked in update rather than draw so the game can run without being drawn
+
     def __display_controls_1p(self, image): # display the single player controls
         self.__small_font.render(image, "MOVE:", (4*EIGHT_PIXELS, 3*EIGHT_PIXELS), alignment=CENTER)
         self.__small_font.render(image, "W"+NEW_LINE+"A S D", (4*EIGHT_PIXELS, 4*EIGHT_PIXELS), alignment=CENTER)
@@ -675,30 +805,35 @@ class Game():
         self.__small_font.render(image, "PAUSE:", (8*EIGHT_PIXELS, 12.5*EIGHT_PIXELS), alignment=CENTER)
         self.__small_font.render(image, "ESC", (8*EIGHT_PIXELS, 13.5*EIGHT_PIXELS), alignment=CENTER)
 
-    def draw(self, screen):
-        image = pygame.surface.Surface(self.__rect.size) # empty image to blit everything to
-
-        above = []
+    def __draw_background(self): # draw the cells that don't go on top of anything and the fences onto the background
+        self.__background = pygame.Surface(self.__rect.size)
+        self.__above_cells = []
         for row in self.__grid:
             for cell in row:
                 if cell.get_collision() and cell.has_image():
-                    above.append(cell)
+                    self.__above_cells.append((cell.get_layer(), cell.get_rect().topleft))
                 else:
-                    cell.draw(image)                    
+                    cell.draw(self.__background)
+        self.__background.blit(images.fences_image, (0,0))
+
+    def draw(self, screen):
+        if not self.__background: # only when the grid has changed
+            self.__draw_background()
+        image = self.__image
+        image.blit(self.__background, (0,0))
 
         if self.__countdown:
             if self.__players == 1:
                 self.__display_controls_1p(image)
             elif self.__players == 2:
                 self.__display_controls_2p(image)
-
-        image.blit(fences_image, (0,0))
+            image.blit(images.fences_image, (0,0)) # the fences go over the controls
 
         for item in self.__items:
             item.draw(image)
 
-        for bullet in self.__player.get_bullets() if self.__players == 1 else self.__player1.get_bullets() + self.__player2.get_bullets():
-            bullet.draw(image)
+        for player in self.get_players():
+            player.get_bullets().draw(image)
 
         if self.__players == 1:
             self.__player.draw(image)
@@ -712,8 +847,7 @@ class Game():
             if not enemy.get_flying():
                 enemy.draw(image)
 
-        for cell in above:
-            cell.draw(image)
+        image.blits(self.__above_cells, doreturn=False)
 
         for score in self.__scores:
             score.draw(image)
@@ -725,8 +859,6 @@ class Game():
         if self.__countdown:
             self.__countdown_font.render(image, f"{ceil(self.__countdown/FPS)}", (8*EIGHT_PIXELS, 8*EIGHT_PIXELS - self.__countdown_font.get_height()//2), alignment=CENTER)
 
-        self.__check_player_hit()
-
         offset = (0,0)
         if self.__shake:
             if self.__timer - self.__bomb_time == SCREEN_SHAKE_LENGTH and self.__shake:
@@ -1,13 +1,18 @@
-from random import randint
+import random
 from math import trunc, sin, pi
 
+import numpy as np
 import pygame
 
 from constants import *
-from utility_functions import split, get_key
-from images import (item_images, bullet_image, default_enemy_images, fast_enemy_images, flying_enemy_images, 
-                    crow_enemy_images, tough_enemy_images, spirit_enemy_images, exclamation)
-from sounds import crow_sound, enemy_killed, default_shoot
+from utility_functions import split, get_key, silhouette
+import images
+import sounds
+
+# the keys each player uses in the order UP, LEFT, DOWN, RIGHT for moving and then for shooting
+PLAYER_CONTROLS = {0 : ([pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d], [pygame.K_UP, pygame.K_LEFT, pygame.K_DOWN, pygame.K_RIGHT]),
+                   1 : ([pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d], [pygame.K_g, pygame.K_v, pygame.K_b, pygame.K_n]),
+                   2 : ([pygame.K_9, pygame.K_i, pygame.K_o, pygame.K_p], [pygame.K_UP, pygame.K_LEFT, pygame.K_DOWN, pygame.K_RIGHT])}
 
 #======================Cell Class======================#
 # an 8 pixel by 8 pixel square that can have collision and an image
@@ -21,6 +26,7 @@ class Cell():
         self.__rect = pygame.Rect(pos, (EIGHT_PIXELS, EIGHT_PIXELS))
         self.__shade_surface = pygame.Surface((EIGHT_PIXELS, EIGHT_PIXELS), pygame.SRCALPHA)
         pygame.draw.rect(self.__shade_surface, (0,0,0,50), (0, 0, EIGHT_PIXELS, EIGHT_PIXELS)) # a mostly transparent black
+        self.__layer = None # the cell drawn on its own, made when first asked for
 
     def has_image(self): # returns True if the cell has an image
         if self.__image:
@@ -32,12 +38,20 @@ class Cell():
     
     def get_rect(self): # returns the rect of the cell
         return self.__rect
+
+    def get_image(self): # returns the image of the cell
+        return self.__image
+
+    def get_shade(self): # returns the shade attribute of the cell
+        return self.__shade
     
     def set_image(self, image): # sets the image of the cell
         self.__image = image
+        self.__layer = None
 
     def set_shade(self, shade): # sets the shade attribute of the cell
         self.__shade = shade
+        self.__layer = None
 
     def set_collision(self, collision): # sets the collision attribute of the cell
         self.__collision = collision
@@ -49,6 +63,28 @@ class Cell():
         if self.__image:
             screen.blit(self.__image, self.__rect)
 
+    def get_layer(self): # returns the cell and its shade drawn onto a transparent surface, so it can be drawn with one blit at the cell's position
+        if not self.__layer:
+            self.__layer = pygame.Surface((EIGHT_PIXELS + PIXEL_RATIO, EIGHT_PIXELS + PIXEL_RATIO), pygame.SRCALPHA)
+            pygame.draw.rect(self.__layer, GRASS_GREEN, (0, 0, EIGHT_PIXELS, EIGHT_PIXELS))
+            if self.__shade:
+                self.__layer.blit(self.__shade_surface, (PIXEL_RATIO, PIXEL_RATIO))
+            if self.__image:
+                self.__layer.blit(self.__image, (0, 0))
+        return self.__layer
+
+#======================Key State Class======================#
+# stands in for pygame.key.get_pressed() so that input can come from somewhere other than the keyboard
+class KeyState():
+    def __init__(self, pressed=()):
+        self.__pressed = set(pressed) # the keys that are currently held down
+
+    def __getitem__(self, key): # allows keys[pygame.K_w] like the real key state
+        return key in self.__pressed
+
+    def get_pressed(self): # return the set of pressed keys
+        return self.__pressed
+
 #======================Player Class======================#
 # a controllable character that can move and shoot
 # one or two initialised for the game
@@ -69,7 +105,7 @@ class Player():
         self.__rect = self.__image.get_rect(center = self.__pos)
         self.__speed = PLAYER_SPEED
         self.__lives = 3
-        self.__bullets = []
+        self.__bullets = BulletStore()
         self.__bullet_damage = 1 # lots of variables to make possible future items easy to implement
         self.__last_shot = 0
         self.__fire_rate = FIRE_RATE # frames between each shot
@@ -124,11 +160,11 @@ class Player():
                     pygame.draw.rect(image, get_key(hat_hex[i][j], BITMAP_DICTIONARY), pygame.rect.Rect((j*PIXEL_RATIO,i*PIXEL_RATIO), (1*PIXEL_RATIO, 1*PIXEL_RATIO)))
 
         # creates a transparent white version of the image to draw when the player is immune to damage
-        immune = pygame.mask.from_surface(image).to_surface(setcolor=(255,255,255,100), unsetcolor=(0,0,0,0))
+        immune = silhouette(image, IMMUNE_COLOUR)
 
         return image, immune
 
-    def __move(self, keys, collidables):
+    def __move(self, keys, tile_map, other_player_rect):
         velocity_x = 0 # the movement of the player's x position
         velocity_y = 0 # the movement of the player's y position
 
@@ -143,7 +179,7 @@ class Player():
 
         velocity_x, velocity_y = self.__edge_collisions(player_sides, velocity_x, velocity_y)  # check and correct for collisions with the edges of the game
 
-        velocity_x, velocity_y = self.__collidables_collisions(player_sides, velocity_x, velocity_y, collidables) # check and correct for collisions with each collidable object in the game
+        velocity_x, velocity_y = self.__collidables_collisions(player_sides, velocity_x, velocity_y, tile_map, other_player_rect) # check and correct for collisions with the collidable objects around the player
         
         return velocity_x, velocity_y
 
@@ -188,12 +224,17 @@ class Player():
 
         return velocity_x, velocity_y
 
-    def __collidables_collisions(self, player_sides, velocity_x, velocity_y, collidables): # check and correct for collisions with each collidable object in the game
+    def __collidables_collisions(self, player_sides, velocity_x, velocity_y, tile_map, other_player_rect): # check and correct for collisions with the collidable objects around the player
         # rects that show where the player is about to move
         self.__new_rect_x.center = self.__pos + pygame.math.Vector2(velocity_x, 0) # only taking into account x motion
         self.__new_rect_y.center = self.__pos + pygame.math.Vector2(0, velocity_y) # only taking into account y motion
         self.__new_rect.center = self.__pos + pygame.math.Vector2(velocity_x, velocity_y) # taking into account both
 
+        # only the collidables on the tiles the new rects cover can collide, the other player is checked last
+        collidables = tile_map.get_collidables(self.__new_rect_x.union(self.__new_rect_y).union(self.__new_rect))
+        if other_player_rect:
+            collidables.append(other_player_rect)
+
         x = velocity_x # temporary variables so it doesn't change between loops
         y = velocity_y
 
@@ -264,26 +305,24 @@ class Player():
         if (bullet_x != 0 or bullet_y != 0 )and (self.__timer - self.__last_shot > self.__fire_rate * self.__fire_rate_multiplier):
             offset = (x_offset, y_offset)
             direction = pygame.math.Vector2(bullet_x,bullet_y)
-            bullet = Bullet(self.__pos + offset, direction, self.__bullet_damage, self.__timer)
-            self.__bullets.append(bullet)
-            self.__bullets_shot += 1
+            self.__add_bullet(offset, direction)
             if self.__shotgun:
                 self.__shoot_shotgun(offset, direction)
             if self.__backwards_shot:
                 self.__shoot_backwards_shot(offset, direction)
             self.__last_shot = self.__timer
+
+    def __add_bullet(self, offset, direction): # shoot a single bullet
+        self.__bullets.add(self.__pos + offset, direction, self.__bullet_damage, self.__timer)
+        self.__bullets_shot += 1
+        sounds.play("default_shoot") # every bullet asks for the sound as before, the voice manager only plays it once a frame
                                 
     def __shoot_shotgun(self, offset, direction): # shoot 2 extra bullets at a slightly offset angle
-        bullet1 = Bullet(self.__pos + offset, direction.rotate(-11.25), self.__bullet_damage, self.__timer)  # 11.25 degrees anticlockwise
-        bullet2 = Bullet(self.__pos + offset, direction.rotate(11.25), self.__bullet_damage, self.__timer) # 11.25 degrees clockwise
-        self.__bullets.append(bullet1)
-        self.__bullets.append(bullet2)
-        self.__bullets_shot += 2
+        self.__add_bullet(offset, direction.rotate(-11.25)) # 11.25 degrees anticlockwise
+        self.__add_bullet(offset, direction.rotate(11.25)) # 11.25 degrees clockwise
     
     def __shoot_backwards_shot(self, offset, direction): # shoots an extra bullet in the opposite direction
-        bullet = Bullet(self.__pos + offset, direction.rotate(180), self.__bullet_damage, self.__timer) # 180 degrees clockwise
-        self.__bullets.append(bullet)
-        self.__bullets_shot += 1
+        self.__add_bullet(offset, direction.rotate(180)) # 180 degrees clockwise
         if self.__shotgun:
             self.__shoot_shotgun(offset, -direction) # shoot shotgun backwards too
     
@@ -311,10 +350,10 @@ class Player():
         self.__lives += amount
 
     def empty_bullets(self): # reset the player's bullets
-        self.__bullets = []
+        self.__bullets.clear()
 
-    def remove_bullet(self, bullet): # remove a bullet from the list
-        self.__bullets.remove(bullet)
+    def remove_bullet(self, index): # remove a bullet from the bullet store
+        self.__bullets.remove(index)
 
     def get_bullets_shot(self): # return the number of bullets shot
         return self.__bullets_shot
@@ -337,7 +376,7 @@ class Player():
     def get_rect(self): # return the rect of the player
         return self.__rect
     
-    def get_bullets(self): # return the bullets list
+    def get_bullets(self): # return the bullet store
         return self.__bullets
     
     def get_pos(self): # return the position of the player
@@ -352,24 +391,63 @@ class Player():
     def set_spawned(self, spawned): # set the spawned status
         self.__spawned = spawned
 
-    def update(self, collidables, other_player_rect=None): # update the player and take keyboard input
+    def get_state(self): # return everything that changes during a game as a dictionary so it can be saved and loaded
+        facing = [self.__front_image, self.__back_image, self.__left_image, self.__right_image].index(self.__image)
+        return {'pos'                   : list(self.__pos),
+                'rect'                  : list(self.__rect),
+                'facing'                : facing,
+                'speed'                 : self.__speed,
+                'lives'                 : self.__lives,
+                'bullets'               : self.__bullets.get_state(),
+                'bullet_damage'         : self.__bullet_damage,
+                'last_shot'             : self.__last_shot,
+                'fire_rate'             : self.__fire_rate,
+                'fire_rate_multiplier'  : self.__fire_rate_multiplier,
+                'item'                  : self.__item.get_state() if self.__item else None,
+                'shoes'                 : [self.__shoes, self.__shoes_time],
+                'shotgun'               : [self.__shotgun, self.__shotgun_time],
+                'rapid_fire'            : [self.__rapid_fire, self.__rapid_fire_time],
+                'backwards_shot'        : [self.__backwards_shot, self.__backwards_shot_time],
+                'immunity'              : [self.__immunity, self.__immunity_time],
+                'spawned'               : self.__spawned,
+                'bullets_shot'          : self.__bullets_shot,
+                'timer'                 : self.__timer}
+
+    def load_state(self, state): # set the player back to a state returned by get_state
+        self.__pos = pygame.math.Vector2(state['pos'])
+        self.__rect = pygame.Rect(state['rect'])
+        self.__image = [self.__front_image, self.__back_image, self.__left_image, self.__right_image][state['facing']]
+        self.__immune_image = [self.__front_immune, self.__back_immune, self.__left_immune, self.__right_immune][state['facing']]
+        self.__speed = state['speed']
+        self.__lives = state['lives']
+        self.__bullets.load_state(state['bullets'])
+        self.__bullet_damage = state['bullet_damage']
+        self.__last_shot = state['last_shot']
+        self.__fire_rate = state['fire_rate']
+        self.__fire_rate_multiplier = state['fire_rate_multiplier']
+        self.__item = Item.from_state(state['item']) if state['item'] else None
+        self.__shoes, self.__shoes_time = state['shoes']
+        self.__shotgun, self.__shotgun_time = state['shotgun']
+        self.__rapid_fire, self.__rapid_fire_time = state['rapid_fire']
+        self.__backwards_shot, self.__backwards_shot_time = state['backwards_shot']
+        self.__immunity, self.__immunity_time = state['immunity']
+        self.__spawned = state['spawned']
+        self.__bullets_shot = state['bullets_shot']
+        self.__timer = state['timer']
+
+    def update(self, tile_map, other_player_rect=None, keys=None): # update the player and take keyboard input
+        # keys can be passed in so that input can come from somewhere other than the keyboard (e.g. a bot or a replay)
         self.__timer += 1
 
         # fire rate slightly reduced if the player has shotgun, fire rate increased if the player has rapid fire
         self.__fire_rate_multiplier = (RAPID_FIRE_MULTIPLIER if self.__rapid_fire else 1) * (SHOTGUN_RATE_MULTIPLIER if self.__shotgun else 1)   
 
-        for bullet in self.__bullets:
-            for collidable in collidables:
-                if collidable.colliderect(bullet.get_rect()):
-                    self.__bullets.remove(bullet) # remove every bullet that has collided with a collidable object
-                    break # could otherwise try to remove the bullet from the list twice
-            bullet.update()
-            if self.__timer - bullet.get_spawn_time() > BULLET_LIFETIME: # so that bullets don't last forever if they don't hit anything
-                self.__bullets.remove(bullet)
+        self.__bullets.update(self.__timer, tile_map) # moves the bullets and removes any that hit a collidable object
 
         if self.__lives > 0 and self.__spawned:
-            keys = pygame.key.get_pressed()
-            velocity_x, velocity_y = self.__move(keys, collidables + ([other_player_rect] if other_player_rect else []))
+            if keys is None:
+                keys = pygame.key.get_pressed()
+            velocity_x, velocity_y = self.__move(keys, tile_map, other_player_rect)
             self.__pos += pygame.math.Vector2(velocity_x, velocity_y)
             self.__rect.center = self.__pos
             self.__shoot(keys)
@@ -400,45 +478,168 @@ class Player():
                 if FPS//2 < (self.__immunity_time - self.__timer) % FPS < FPS: # flash immunity image on and off every 0.5 seconds
                     screen.blit(self.__immune_image, (self.__pos[X] - EIGHT_PIXELS/2, self.__pos[Y] - EIGHT_PIXELS/2))
 
-#======================Bullet Class======================#
-# a bullet that travels in a given direction
-# shot by the player during the game
-class Bullet():
-    def __init__(self, pos, direction, damage, spawn_time):
-        self.__direction = direction
-        self.__pos = pygame.math.Vector2(pos)
-        self.__speed = BULLET_SPEED
-        self.__image = bullet_image
-        self.__damage = damage
-        self.__rect = self.__image.get_rect(center = self.__pos)
-        self.__spawn_time = spawn_time
-        default_shoot.play() 
-
-    def get_rect(self): # return the rect of the bullet
-        return self.__rect
-    
-    def get_damage(self): # return the damage of the bullet
-        return self.__damage
-    
-    def get_spawn_time(self): # return the spawn time of the bullet
-        return self.__spawn_time
-
-    def update(self): # update the position of the bullet
-        self.__pos += self.__direction * self.__speed
-        self.__rect.center = self.__pos
-
-    def draw(self, screen): # draw the bullet
-        screen.blit(self.__image, self.__rect.topleft)
+#======================Bullet Store Class======================#
+# all the bullets shot by a player stored in arrays, one row per bullet, so they can all be moved and checked at once
+# bullets are referred to by their index, which only changes when update drops the bullets that have gone
+class BulletStore():
+    def __init__(self, capacity=64):
+        self.__image = images.bullet_image
+        self.__size = self.__image.get_size()
+        self.__half_size = (self.__size[X]//2, self.__size[Y]//2)
+        self.__capacity = 0
+        self.__count = 0 # bullets are kept in the first count rows
+        self.__pos = np.zeros((0, 2))
+        self.__direction = np.zeros((0, 2))
+        self.__velocity = np.zeros((0, 2)) # direction times speed, so moving is a single addition
+        self.__damage = np.zeros(0, np.int64)
+        self.__spawn_time = np.zeros(0, np.int64)
+        self.__topleft = np.zeros((0, 2), np.int64) # the top left of each bullet's rect
+        self.__alive = np.zeros(0, bool) # bullets that haven't been removed since the last update
+        self.__removed = False # whether any bullets are waiting to be dropped
+        self.__rects = None # pygame rects of the bullets, made when asked for
+        self.__grow(capacity)
+
+    def __grow(self, capacity): # make the arrays big enough for a number of bullets, keeping what is already in them
+        def grown(array):
+            new_array = np.zeros((capacity,) + array.shape[1:], array.dtype)
+            new_array[:self.__capacity] = array
+            return new_array
+        self.__pos = grown(self.__pos)
+        self.__direction = grown(self.__direction)
+        self.__velocity = grown(self.__velocity)
+        self.__damage = grown(self.__damage)
+        self.__spawn_time = grown(self.__spawn_time)
+        self.__topleft = grown(self.__topleft)
+        self.__alive = grown(self.__alive)
+        self.__capacity = capacity
+
+    def __place_rects(self, start, end): # move the rects of a range of bullets to be centred on their positions
+        # pygame rounds a rect's centre half away from zero, so the rects match what pygame.Rect would give
+        pos = self.__pos[start:end]
+        self.__topleft[start:end] = np.copysign(np.floor(np.abs(pos) + 0.5), pos) - self.__half_size
+        self.__rects = None
+
+    def __compact(self): # drop the removed bullets, keeping the rest in order
+        if not self.__removed:
+            return
+        keep = self.__alive[:self.__count]
+        count = int(np.count_nonzero(keep))
+        for array in [self.__pos, self.__direction, self.__velocity, self.__damage, self.__spawn_time, self.__topleft]:
+            array[:count] = array[:self.__count][keep]
+        self.__alive[:count] = True
+        self.__count = count
+        self.__removed = False
+        self.__rects = None
+
+    def add(self, pos, direction, damage, spawn_time, rect=None): # add a bullet, rect is only given when loading
+        if self.__count == self.__capacity:
+            self.__grow(self.__capacity * 2)
+        index = self.__count
+        self.__pos[index] = pos[X], pos[Y]
+        self.__direction[index] = direction[X], direction[Y]
+        self.__velocity[index] = direction[X] * BULLET_SPEED, direction[Y] * BULLET_SPEED
+        self.__damage[index] = damage
+        self.__spawn_time[index] = spawn_time
+        self.__alive[index] = True
+        self.__count += 1
+        if rect:
+            self.__topleft[index] = rect[X], rect[Y]
+            self.__rects = None
+        else:
+            self.__place_rects(index, index + 1)
+
+    def remove(self, index): # remove a bullet, it is dropped at the next update so the other indices stay the same until then
+        self.__alive[index] = False
+        self.__removed = True
+
+    def clear(self): # remove every bullet
+        self.__count = 0
+        self.__removed = False
+        self.__rects = None
+
+    def get_count(self): # return the number of bullets
+        self.__compact()
+        return self.__count
+
+    def get_rects(self): # return a list of a pygame rect for each bullet, in index order
+        self.__compact()
+        if self.__rects is None:
+            self.__rects = [pygame.Rect(left, top, *self.__size) for left, top in self.__topleft[:self.__count].tolist()]
+        return self.__rects
+
+    def get_rect(self, index): # return the rect of a bullet, get_rects must have been called since the last change
+        return self.__rects[index]
+
+    def get_damage(self, index): # return the damage of a bullet
+        return self.__damage[index].item()
+
+    def get_positions(self): # return the x and y of every bullet one after the other
+        self.__compact()
+        return self.__pos[:self.__count].ravel().tolist()
+
+    def get_state(self): # return the bullets as a list of dictionaries so they can be saved and loaded
+        self.__compact()
+        return [{'pos'          : pos,
+                 'direction'    : direction,
+                 'damage'       : damage,
+                 'spawn_time'   : spawn_time,
+                 'rect'         : [left, top, *self.__size]}
+                for pos, direction, damage, spawn_time, (left, top) in zip(self.__pos[:self.__count].tolist(), self.__direction[:self.__count].tolist(),
+                                                                          self.__damage[:self.__count].tolist(), self.__spawn_time[:self.__count].tolist(),
+                                                                          self.__topleft[:self.__count].tolist())]
+
+    def load_state(self, state): # set the bullets back to a list returned by get_state
+        self.clear()
+        for bullet in state:
+            self.add(bullet['pos'], bullet['direction'], bullet['damage'], bullet['spawn_time'], rect=bullet['rect'])
+
+    def update(self, timer, tile_map): # move every bullet and drop the ones that have gone, all at once
+        self.__compact()
+        count = self.__count
+        if not count:
+            return
+        # bullets that hit a collidable object are removed, checked before they move
+        # bullets that leave the game aren't, they fly on until they expire as they always have
+        gone = tile_map.collides_many(self.__topleft[:count], self.__size)
+
+        # so that bullets don't last forever if they don't hit anything
+        # bullets are kept in the order they were shot so the expired ones are always at the start
+        gone[:np.searchsorted(self.__spawn_time[:count], timer - BULLET_LIFETIME)] = True
+
+        self.__pos[:count] += self.__velocity[:count]
+        self.__place_rects(0, count)
+        if gone.any():
+            self.__alive[:count] = ~gone
+            self.__removed = True
+            self.__compact()
+
+    def draw(self, screen): # draw every bullet
+        self.__compact()
+        screen.blits([(self.__image, topleft) for topleft in self.__topleft[:self.__count].tolist()], doreturn=False)
 
 #======================Item Class======================#
 # a temporary item that has an image and a type and a rect
 class Item():
     def __init__(self, pos, type):
         self.__type = type
-        self.__image = item_images[self.__type]
+        self.__image = images.item_images[self.__type]
         self.__rect = self.__image.get_rect(center = pos)
         self.__timer = 0 # how many frames the item has been around for
 
+    @classmethod
+    def from_state(cls, state): # create an item from a state returned by get_state
+        item = cls((0,0), state['type'])
+        item.__rect = pygame.Rect(state['rect'])
+        item.__timer = state['timer']
+        item.__image = images.item_images[item.__type] if state['visible'] else None
+        return item
+
+    def get_state(self): # return the item as a dictionary so it can be saved and loaded
+        return {'type'      : self.__type,
+                'rect'      : list(self.__rect),
+                'timer'     : self.__timer,
+                'visible'   : self.__image is not None}
+
     def get_type(self): # return the type of the item
         return self.__type
     
@@ -451,7 +652,7 @@ class Item():
             return True # true returned if the item should be removed from the list
         elif self.__timer > ITEM_TIME - ITEM_FLASH_TIME:
             if self.__timer % (ITEM_FLASH_TIME//9) == 0: # flip the image on and off 9 times
-                self.__image = None if self.__image else item_images[self.__type]
+                self.__image = None if self.__image else images.item_images[self.__type]
         return False
 
     def draw(self, screen): # draw the item
@@ -467,6 +668,14 @@ class Score():
         self.__rect = rect
         self.__timer = 0
 
+    def get_state(self): # return the score as a dictionary so it can be saved and loaded
+        return {'score' : int(self.__score),
+                'rect'  : list(self.__rect),
+                'timer' : self.__timer}
+
+    def set_timer(self, timer): # set how long the score has been around for
+        self.__timer = timer
+
     def update(self): # check how long the score has been around for
         self.__timer += 1
         if self.__timer > SCORE_LENGTH:
@@ -479,7 +688,7 @@ class Score():
 #======================Enemy Class======================#
 # a base class for all the different enemy types
 class Enemy():
-    def __init__(self, pos, settings, initial_image, flying):
+    def __init__(self, pos, settings, initial_image, flying, random_generator=random):
         self._pos = pygame.math.Vector2(pos)
         self._prev_pos = self._pos.copy() # pos reverted to previous pos if a collision occurs
         self._health = settings["HEALTH"] # settings is a dictionary of the health, speed, and score
@@ -491,6 +700,7 @@ class Enemy():
         self._rect = self._image.get_rect(center = self._pos)
         self.__red = False
         self.__hit_timer = 0
+        self._random = random_generator # the game's random generator so that games can be repeated from a seed
 
     def get_flying(self): # return whether the enemy is flying or not
         return self.__flying
@@ -500,16 +710,47 @@ class Enemy():
     
     def get_rect(self): # return the rect of the enemy
         return self._rect
+
+    def get_pos(self): # return the position of the enemy
+        return self._pos
     
     def get_health(self): # return the health of the enemy
         return self._health
+
+    def _get_image_index(self, images): # return the (row, column) of the current image in a 2d list of animation frames
+        for row in range(len(images)):
+            for column in range(len(images[row])):
+                if images[row][column] is self._image:
+                    return [row, column]
+
+    def get_state(self): # return everything that changes during a game as a dictionary so it can be saved and loaded
+        # subclasses add their own attributes on top of these
+        return {'type'      : type(self).__name__,
+                'pos'       : list(self._pos),
+                'prev_pos'  : list(self._prev_pos),
+                'health'    : self._health,
+                'speed'     : self._speed,
+                'timer'     : self._timer,
+                'rect'      : list(self._rect),
+                'red'       : self.__red,
+                'hit_timer' : self.__hit_timer}
+
+    def load_state(self, state): # set the enemy back to a state returned by get_state
+        self._pos = pygame.math.Vector2(state['pos'])
+        self._prev_pos = pygame.math.Vector2(state['prev_pos'])
+        self._health = state['health']
+        self._speed = state['speed']
+        self._timer = state['timer']
+        self._rect = pygame.Rect(state['rect'])
+        self.__red = state['red']
+        self.__hit_timer = state['hit_timer']
     
     def hit(self, damage=1): # damage the enemy
         self._health -= damage
         self.__red = True # temporarily red after hit
         self.__hit_timer = 0
         if self._health == 0:
-            enemy_killed.play()
+            sounds.play("enemy_killed")
     
     def draw(self, screen): # draw the enemy
         self.__hit_timer += 1
@@ -518,18 +759,36 @@ class Enemy():
         screen.blit(self._image, (self._pos[X] - EIGHT_PIXELS/2, self._pos[Y] - EIGHT_PIXELS/2))
         # if the enemy was hit recently, blit a slightly transparent red version of the enemy's image over the enemy
         if self.__red:
-            screen.blit(pygame.mask.from_surface(self._image).to_surface(setcolor=(255,0,0,100), unsetcolor=(0,0,0,0)), (self._pos[X] - EIGHT_PIXELS/2, self._pos[Y] - EIGHT_PIXELS/2))
+            screen.blit(images.hit_images[self._image], (self._pos[X] - EIGHT_PIXELS/2, self._pos[Y] - EIGHT_PIXELS/2))
 
 #======================Default Enemy Class======================#
 # ground enemy, the first enemy the player sees
 # moves towards the player in straight lines with random influence
 class DefaultEnemy(Enemy):
-    def __init__(self, pos, direction):
-        super().__init__(pos, DEFAULT_ENEMY, default_enemy_images[direction][1], False)
+    def __init__(self, pos, direction, random_generator=random):
+        super().__init__(pos, DEFAULT_ENEMY, images.default_enemy_images[direction][1], False, random_generator)
         self.__direction_change_time = 0 # last time the direction was changed
+        self.__wandering = False # whether the enemy turned randomly and ignores the flow field until it next changes direction
         self.__random_time = 0 # time until direction is next changed
         self.__direction = direction # direction the enemy is currently facing
-        self.__images = default_enemy_images # 2d array of animation frames in rows for directions
+        self.__images = images.default_enemy_images # 2d array of animation frames in rows for directions
+
+    def get_state(self):
+        state = super().get_state()
+        state.update({'direction'               : self.__direction,
+                      'direction_change_time'   : self.__direction_change_time,
+                      'random_time'             : self.__random_time,
+                      'wandering'               : self.__wandering,
+                      'image'                   : self._get_image_index(self.__images)})
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.__direction = state['direction']
+        self.__direction_change_time = state['direction_change_time']
+        self.__random_time = state['random_time']
+        self.__wandering = state['wandering']
+        self._image = self.__images[state['image'][0]][state['image'][1]]
 
     def __move(self): # return velocities for the enemy based on its direction
         if self.__direction == LEFT:
@@ -560,15 +819,17 @@ class DefaultEnemy(Enemy):
             else:
                 self.__direction = DOWN
         self.__direction_change_time = self._timer
+        self.__wandering = False
 
         # if the enemy is between 2 and 8 grid cells from the player, chance for random direction
         if 2*EIGHT_PIXELS < (x_distance**2 + y_distance**2)**0.5 < 8*EIGHT_PIXELS:
-            self.__random_time = randint(FPS//4, FPS) # random time before next direction check between 15 and 60 frames
-            random_int = randint(-1,3) # 2/5 chance to move randomly
+            self.__random_time = self._random.randint(FPS//4, FPS) # random time before next direction check between 15 and 60 frames
+            random_int = self._random.randint(-1,3) # 2/5 chance to move randomly
             if random_int <= 1: # only accepts -1, 0, or 1, can add to direction to turn left / right
                 self.__direction = (self.__direction + random_int) % 4 # mod 4 as there are 4 directions
+                self.__wandering = random_int != 0 # a random turn, so the flow field doesn't steer it straight back
 
-    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_rects): # check for collisions
+    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_grid): # check for collisions
         # doesn't need to be pixel perfect like for the player
         # simply, if a collision is detected after the enemy moves, the enemy returns to their previous position
         collision = False
@@ -582,8 +843,7 @@ class DefaultEnemy(Enemy):
                 or (self._rect.bottom >= game_rect.bottom and velocity_y > 0)):
             collision = True # collision is true if any collision between the enemy and the game sides
             
-        enemy_rects.remove(self._rect) # remove the enemy's rect from the list
-        if self._rect.collidelistall(enemy_rects):
+        if enemy_grid.collides(self._rect, ignore=self): # only looks at the enemies in the tiles around this one
             collision = True
 
         if collision: # if there is a collision, return the enemy to their previous position
@@ -591,7 +851,7 @@ class DefaultEnemy(Enemy):
             self._rect.center = self._pos
             self.__random_time = 6 # reduce random time if colliding
         
-    def update(self, player_pos, game_rect, collidables, enemy_rects, player2_pos=None): # update and move the enemy
+    def update(self, player_pos, game_rect, collidables, enemy_grid, flow_field, player2_pos=None): # update and move the enemy
         # player_pos always supplied in one player
         # player_pos only supplied if player 1 is alive in two player
         # player2_pos only supplied if player 2 is alive in two player
@@ -609,22 +869,39 @@ class DefaultEnemy(Enemy):
         if player_pos:
             if self._timer - self.__direction_change_time > self.__random_time:
                 self.__change_direction(player_pos)
+            if not self.__wandering: # follow the shortest way to a player around any crates
+                direction = flow_field.get_direction(self._pos, self.__direction, self._speed)
+                if direction is not None:
+                    self.__direction = direction
             velocity_x, velocity_y = self.__move()
             self._image = self.__images[self.__direction][trunc(((self._timer * 4)/FPS) % len(self.__images[0]))] # 4 animation frames per second
             self._prev_pos = self._pos.copy() #.copy() so that they aren't linked
             self._pos += (velocity_x, velocity_y)
             self._rect.center = self._pos # update the position of the rect
-            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_rects)
+            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_grid)
 
 #======================Fast Enemy Class======================#
 # ground enemy, the second enemy the player will see
 # runs straight until it meets the player in either x or y, then changes direction
 class FastEnemy(Enemy):
-    def __init__(self, pos, direction):
-        super().__init__(pos, FAST_ENEMY, fast_enemy_images[direction][0], False)
+    def __init__(self, pos, direction, random_generator=random):
+        super().__init__(pos, FAST_ENEMY, images.fast_enemy_images[direction][0], False, random_generator)
         self.__direction = None
         self.__random_move_delay = 0 # to keep moving in a direction for n frames despite anything else
-        self.__images = fast_enemy_images
+        self.__images = images.fast_enemy_images
+
+    def get_state(self):
+        state = super().get_state()
+        state.update({'direction'           : self.__direction,
+                      'random_move_delay'   : self.__random_move_delay,
+                      'image'               : self._get_image_index(self.__images)})
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.__direction = state['direction']
+        self.__random_move_delay = state['random_move_delay']
+        self._image = self.__images[state['image'][0]][state['image'][1]]
     
     def __move(self): # return velocities for the enemy based on its direction
         if self.__direction == LEFT:
@@ -674,7 +951,7 @@ class FastEnemy(Enemy):
         else:
             self.__direction = DOWN
 
-    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_rects): # check for collisions
+    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_grid): # check for collisions
         collision = False
 
         if self._rect.collidelistall(collidables):
@@ -686,20 +963,18 @@ class FastEnemy(Enemy):
                 or (self._rect.bottom >= game_rect.bottom and velocity_y > 0)):
             collision = True
 
-        enemy_rects.remove(self._rect)
-
-        if self._rect.collidelistall(enemy_rects):
+        if enemy_grid.collides(self._rect, ignore=self):
             collision = True
 
         if collision:
             self._pos = self._prev_pos.copy()
             self._rect.center = self._pos
-            random_int = randint(-1,3)
+            random_int = self._random.randint(-1,3)
             if random_int <= 1:
                 self.__direction = (self.__direction + random_int) % 4
             self.__random_move_delay = FPS//2 # if collision, possibly moves in a random direction for 0.5 seconds
         
-    def update(self, player_pos, game_rect, collidables, enemy_rects, player2_pos=None): # update and move the enemy
+    def update(self, player_pos, game_rect, collidables, enemy_grid, flow_field, player2_pos=None): # update and move the enemy
         if player2_pos: # check who is closest
             if player_pos:
                 player1_distance = ((player_pos[X] - self._pos[X])**2 + (player_pos[Y] - self._pos[Y])**2)**0.5  
@@ -714,12 +989,15 @@ class FastEnemy(Enemy):
         if player_pos:
             if self.__random_move_delay == 0: 
                 self.__check_direction(player_pos)
+                direction = flow_field.get_direction(self._pos, self.__direction, self._speed) # the shortest way to a player around any crates
+                if direction is not None:
+                    self.__direction = direction
             self._prev_pos = self._pos.copy()
             velocity_x, velocity_y = self.__move()
             self._image = self.__images[self.__direction][trunc(((self._timer * 8)/FPS) % len(self.__images[0]))] # 8 animation frames per second
             self._pos += (velocity_x, velocity_y)
             self._rect.center = self._pos
-            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_rects)
+            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_grid)
             if self.__random_move_delay > 0:
                 self.__random_move_delay -= 1
 
@@ -728,53 +1006,32 @@ class FastEnemy(Enemy):
 # moves directly towards the player with speed varying sinusoidally
 class FlyingEnemy(Enemy):
     def __init__(self, pos, direction):
-        super().__init__(pos, FLYING_ENEMY, flying_enemy_images[direction][0], True)
-        self.__cycle = FPS * 3 # time period of the sine wave, varies over 3 seconds
+        super().__init__(pos, FLYING_ENEMY, images.flying_enemy_images[direction][0], True)
         self.__direction = direction
-        self.__images = flying_enemy_images
-
-    def __move(self, player_pos): # return velocities for the enemy based on the player position
-        velocity_x = 0
-        velocity_y = 0
-        x_distance = player_pos[X] - self._pos[X]
-        y_distance = player_pos[Y] - self._pos[Y]
-        distance = (x_distance**2 + y_distance**2)**0.5 # pythagoras
-        if distance != 0:
-            velocity_x += self._speed * (x_distance / distance) # portion of direction in the x
-            velocity_y += self._speed * (y_distance / distance) # portion of direction in the y
-        return velocity_x, velocity_y
-    
-    def __check_direction(self, velocity_x, velocity_y): # alter direction attribute based on velocities
-        if abs(velocity_y) + 0.5 > abs(velocity_x): # favour image being up or down
-            if velocity_y > 0:
-                self.__direction = DOWN
-            else:
-                self.__direction = UP
-        else:
-            if velocity_x > 0:
-                self.__direction = RIGHT
-            else:
-                self.__direction = LEFT
-    
-    def update(self, player_pos, player2_pos=None): # update and move the enemy
-        if player2_pos: # check who is closest
-            if player_pos:
-                player1_distance = ((player_pos[X] - self._pos[X])**2 + (player_pos[Y] - self._pos[Y])**2)**0.5  
-            else:
-                player1_distance = GAME_WIDTH*EIGHT_PIXELS # arbitrarily large
-            player2_distance = ((player2_pos[X] - self._pos[X])**2 + (player2_pos[Y] - self._pos[Y])**2)**0.5
-            if player2_distance <= player1_distance:
-                player_pos = player2_pos
-
-        self._timer += 1
-
-        if player_pos:
-            self._speed = (sin((self._timer * 2*pi) / self.__cycle) / 2) * PIXEL_RATIO/5 * FPS/60 + FLYING_ENEMY["SPEED"] # sinusoidal speed variation
-            velocity_x, velocity_y = self.__move(player_pos)
-            self.__check_direction(velocity_x, velocity_y) # so direction is correct for animation
+        self.__images = images.flying_enemy_images
+
+    def get_state(self):
+        state = super().get_state()
+        state.update({'direction'   : self.__direction,
+                      'image'       : self._get_image_index(self.__images)})
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.__direction = state['direction']
+        self._image = self.__images[state['image'][0]][state['image'][1]]
+
+    def get_movement(self): # return the position, speed and timer the enemy pool works out the next frame from
+        return self._pos[X], self._pos[Y], self._speed, self._timer
+
+    def update(self, enemy_pool): # move the enemy to where the enemy pool worked out it goes this frame
+        # the movement of every flying enemy is worked out at once by EnemyPool.update
+        x, y, self._speed, self._timer, direction, frame, moved = enemy_pool.step(self)
+        if moved:
             # no checking collisions for flying enemies
-            self._image = self.__images[self.__direction][trunc(((self._timer * 4)/FPS) % len(self.__images[0]))] # 4 animation frames per second
-            self._pos += velocity_x, velocity_y
+            self.__direction = direction
+            self._image = self.__images[self.__direction][frame]
+            self._pos.update(x, y)
             self._rect.center = self._pos
 
 #======================Crow Enemy Class======================#
@@ -782,15 +1039,15 @@ class FlyingEnemy(Enemy):
 # moves very fast in a straight line across the game, warns the player of its position before moving
 class CrowEnemy(Enemy):
     def __init__(self, pos, direction, game_rect):
-        super().__init__(pos, CROW_ENEMY, crow_enemy_images[direction], True)
+        super().__init__(pos, CROW_ENEMY, images.crow_enemy_images[direction], True)
         # crow enemy has a transparent version of the same image that follows behind them to add motion blur
-        self.__blur_image = self._image.copy()
-        self.__blur_image.set_alpha(100)
+        self.__blur_image = images.blur_images[self._image]
         self.__blur_rect = self._rect.copy()
         # a larger rect created to detect if the enemy should be killed because it has flown far off screen
         self.__large_rect = pygame.Rect((self._rect.x - EIGHT_PIXELS, self._rect.y - EIGHT_PIXELS), 
                                         (self._rect.width + 2*EIGHT_PIXELS, self._rect.height + 2*EIGHT_PIXELS))
         self.__game_rect = game_rect
+        self.__direction = direction
         blur_distance = CROW_BLUR_DISTANCE
         if direction == RIGHT: # velocity is decided at the beginning as the enemy does not change direction
             self.__velocity = (self._speed, 0)
@@ -808,9 +1065,23 @@ class CrowEnemy(Enemy):
         # position is calculated by adding 8 pixels of movement in the enemy's direction as they spawn 8 pixels off screen
         self.__exclamation_pos = pygame.math.Vector2(self._rect.topleft) + (pygame.math.Vector2(self.__velocity)*(EIGHT_PIXELS/self._speed))
 
-    def update(self, *args): # *args to get and disregard any other arguments passed in
+    def get_state(self):
+        state = super().get_state()
+        state.update({'direction'       : self.__direction,
+                      'blur_rect'       : list(self.__blur_rect),
+                      'large_rect'      : list(self.__large_rect),
+                      'exclamation_pos' : list(self.__exclamation_pos)})
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.__blur_rect = pygame.Rect(state['blur_rect'])
+        self.__large_rect = pygame.Rect(state['large_rect'])
+        self.__exclamation_pos = pygame.math.Vector2(state['exclamation_pos'])
+
+    def update(self, *args, **kwargs): # *args and **kwargs to get and disregard any other arguments passed in
         if self._timer == 0:
-            crow_sound.play() # sound needs to be played in update otherwise it would play when the enemy is initialised in the wave creation
+            sounds.play("crow_sound") # sound needs to be played in update otherwise it would play when the enemy is initialised in the wave creation
         self._timer += 1
         if self._timer > CROW_PAUSE: # paused for a few seconds before moving
             self._pos += self.__velocity
@@ -822,7 +1093,7 @@ class CrowEnemy(Enemy):
 
     def draw(self, screen): # draw the enemy, polymorphism necessary for blur image
         if self._timer < CROW_PAUSE // 1.5:
-            screen.blit(exclamation, self.__exclamation_pos) # only visible for 2/3 of the pause time
+            screen.blit(images.exclamation, self.__exclamation_pos) # only visible for 2/3 of the pause time
         screen.blit(self.__blur_image, self.__blur_rect)
         screen.blit(self._image, self._rect)
 
@@ -830,12 +1101,30 @@ class CrowEnemy(Enemy):
 # ground enemy, the fifth enemy the player will see
 # similar movement to the default enemy but with less random movement
 class ToughEnemy(Enemy):
-    def __init__(self, pos, direction):
-        super().__init__(pos, TOUGH_ENEMY, tough_enemy_images[direction][0], False)
+    def __init__(self, pos, direction, random_generator=random):
+        super().__init__(pos, TOUGH_ENEMY, images.tough_enemy_images[direction][0], False, random_generator)
         self.__direction_change_time = 0
+        self.__wandering = False # whether the enemy turned randomly and ignores the flow field until it next changes direction
         self.__random_time = 0
         self.__direction = 0
-        self.__images = tough_enemy_images
+        self.__images = images.tough_enemy_images
+
+    def get_state(self):
+        state = super().get_state()
+        state.update({'direction'               : self.__direction,
+                      'direction_change_time'   : self.__direction_change_time,
+                      'random_time'             : self.__random_time,
+                      'wandering'               : self.__wandering,
+                      'image'                   : self._get_image_index(self.__images)})
+        return state
+
+    def load_state(self, state):
+        super().load_state(state)
+        self.__direction = state['direction']
+        self.__direction_change_time = state['direction_change_time']
+        self.__random_time = state['random_time']
+        self.__wandering = state['wandering']
+        self._image = self.__images[state['image'][0]][state['image'][1]]
 
     def __move(self): # return velocities for the enemy based on its direction
         if self.__direction == LEFT:
@@ -866,14 +1155,16 @@ class ToughEnemy(Enemy):
             else:
                 self.__direction = DOWN
         self.__direction_change_time = self._timer
+        self.__wandering = False
 
         if 2*EIGHT_PIXELS < (x_distance**2 + y_distance**2)**0.5 < 8*EIGHT_PIXELS:
-            self.__random_time = randint(20,80) # random time before next direction check between 20 and 80 frames
-            random_int = randint(-1,7) # 2/7 chance to move randomly
+            self.__random_time = self._random.randint(20,80) # random time before next direction check between 20 and 80 frames
+            random_int = self._random.randint(-1,7) # 2/7 chance to move randomly
             if random_int <= 1:
                 self.__direction = (self.__direction + random_int) % 4
+                self.__wandering = random_int != 0
 
-    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_rects):
+    def __check_collisions(self, velocity_x, velocity_y, game_rect, collidables, enemy_grid):
         collision = False
 
         if self._rect.collidelistall(collidables):
@@ -885,8 +1176,7 @@ class ToughEnemy(Enemy):
                 or (self._rect.bottom >= game_rect.bottom and velocity_y > 0)):
             collision = True
             
-        enemy_rects.remove(self._rect)
-        if self._rect.collidelistall(enemy_rects):
+        if enemy_grid.collides(self._rect, ignore=self):
             collision = True
 
         if collision:
@@ -894,7 +1184,7 @@ class ToughEnemy(Enemy):
             self._rect.center = self._pos
             self.__random_time = 5 # reduce random time if colliding
         
-    def update(self, player_pos, game_rect, collidables, enemy_rects, player2_pos=None):
+    def update(self, player_pos, game_rect, collidables, enemy_grid, flow_field, player2_pos=None):
         if player2_pos: # check who is closest
             if player_pos:
                 player1_distance = ((player_pos[X] - self._pos[X])**2 + (player_pos[Y] - self._pos[Y])**2)**0.5  
@@ -909,60 +1199,130 @@ class ToughEnemy(Enemy):
         if player_pos:
             if self._timer - self.__direction_change_time > self.__random_time:
                 self.__change_direction(player_pos)
+            if not self.__wandering: # follow the shortest way to a player around any crates
+                direction = flow_field.get_direction(self._pos, self.__direction, self._speed)
+                if direction is not None:
+                    self.__direction = direction
             velocity_x, velocity_y = self.__move()
             self._image = self.__images[self.__direction][trunc(((self._timer * 3)/FPS) % len(self.__images[0]))] # 3 animation frames per second
             self._prev_pos = self._pos.copy()
             self._pos += (velocity_x, velocity_y)
             self._rect.center = self._pos
-            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_rects)
+            self.__check_collisions(velocity_x, velocity_y, game_rect, collidables, enemy_grid)
 
 #======================Spirit Enemy Class======================#
 # flying enemy, the sixth and final enemy the player will see
 # similar movement to the flying enemy but without the sinusoidal speed
 class SpiritEnemy(Enemy):
     def __init__(self, pos, direction):
-        super().__init__(pos, SPIRIT_ENEMY, spirit_enemy_images[direction], True)
-        self.__images = spirit_enemy_images
+        super().__init__(pos, SPIRIT_ENEMY, images.spirit_enemy_images[direction], True)
+        self.__images = images.spirit_enemy_images
         self.__direction = direction
 
-    def __move(self, player_pos): # return velocities for the enemy based on the player position
-        velocity_x = 0
-        velocity_y = 0
-        x_distance = player_pos[X] - self._pos[X]
-        y_distance = player_pos[Y] - self._pos[Y]
-        distance = (x_distance**2 + y_distance**2)**0.5 # pythagoras
-        if distance != 0:
-            velocity_x += self._speed * (x_distance / distance) # portion of direction in the x
-            velocity_y += self._speed * (y_distance / distance) # portion of direction in the y
-        return velocity_x, velocity_y
-    
-    def __check_direction(self, velocity_x, velocity_y): # alter direction attribute based on velocities
-        if abs(velocity_x) > abs(velocity_y) + 0.5: # favour image being up or down
-            if velocity_x > 0:
-                self.__direction = RIGHT
-            else:
-                self.__direction = LEFT
-        else:
-            if velocity_y > 0:
-                self.__direction = DOWN
-            else:
-                self.__direction = UP
-    
-    def update(self, player_pos, player2_pos=None): # update and move the enemy
-        if player2_pos: # check who is closest
-            if player_pos:
-                player1_distance = ((player_pos[X] - self._pos[X])**2 + (player_pos[Y] - self._pos[Y])**2)**0.5  
-            else:
-                player1_distance = GAME_WIDTH*EIGHT_PIXELS # arbitrarily large
-            player2_distance = ((player2_pos[X] - self._pos[X])**2 + (player2_pos[Y] - self._pos[Y])**2)**0.5
-            if player2_distance <= player1_distance:
-                player_pos = player2_pos
+    def get_state(self):
+        state = super().get_state()
+        state['direction'] = self.__direction
+        return state
 
-        self._timer += 1
+    def load_state(self, state):
+        super().load_state(state)
+        self.__direction = state['direction']
+        self._image = self.__images[self.__direction]
 
-        if player_pos:
-            velocity_x, velocity_y = self.__move(player_pos)
-            self.__check_direction(velocity_x, velocity_y)
+    def get_movement(self): # return the position, speed and timer the enemy pool works out the next frame from
+        return self._pos[X], self._pos[Y], self._speed, self._timer
+
+    def update(self, enemy_pool): # move the enemy to where the enemy pool worked out it goes this frame
+        x, y, self._speed, self._timer, direction, _, moved = enemy_pool.step(self)
+        if moved:
+            self.__direction = direction
             self._image = self.__images[self.__direction]
-            self._pos += velocity_x, velocity_y
+            self._pos.update(x, y)
             self._rect.center = self._pos
+
+#======================Enemy Pool Class======================#
+# works out the movement of every flying and spirit enemy at once with arrays, one row per enemy
+# the enemies keep their own position, speed and timer, update reads them all into arrays and works out where each goes next
+# then each enemy's own update takes its row with step, so an enemy whose update isn't called in a frame doesn't move, as before
+class EnemyPool():
+    def __init__(self):
+        self.__flying_cycle = FPS * 3 # time period of the flying enemy's sine wave, varies over 3 seconds
+        self.__flying_frames = len(images.flying_enemy_images[0])
+        self.__enemies = {} # enemy : whether it is a flying enemy, in the order they were added
+        self.__rows = {} # enemy : its row in next_values, for the enemies there were at the last update
+        self.__next_values = None # x, y, speed, timer, direction, animation frame and whether it moved, of each enemy
+
+    def accepts(self, enemy): # return whether an enemy's movement can be worked out by the pool
+        return type(enemy) in [FlyingEnemy, SpiritEnemy]
+
+    def get_size(self): # return the number of enemies in the pool
+        return len(self.__enemies)
+
+    def add(self, enemy): # add an enemy to be moved from the next update
+        self.__enemies[enemy] = type(enemy) == FlyingEnemy
+
+    def remove(self, enemy): # remove an enemy, enemies not in the pool are ignored
+        self.__enemies.pop(enemy, None)
+
+    def clear(self): # remove every enemy, only used when the enemies themselves are thrown away as well
+        self.__enemies = {}
+        self.__rows = {}
+
+    def update(self, player_pos, player2_pos=None): # work out where every enemy in the pool moves to this frame
+        # gives the same movement as the flying and spirit enemies used to work out one at a time
+        # player_pos and player2_pos are only supplied for players that enemies should move towards
+        enemies = list(self.__enemies)
+        self.__rows = dict(zip(enemies, range(len(enemies))))
+        if not enemies:
+            return
+        values = np.array([enemy.get_movement() for enemy in enemies], float) # x, y, speed and timer
+        x = values[:, X]
+        y = values[:, Y]
+        timer = values[:, 3] + 1
+        flying = np.fromiter(self.__enemies.values(), bool, len(enemies))
+
+        # nearest player selection, player 2 is chased if they are at least as close as player 1
+        target = np.zeros((len(enemies), 2))
+        moved = np.full(len(enemies), bool(player_pos))
+        if player_pos:
+            target[:] = player_pos[X], player_pos[Y]
+        if player2_pos:
+            if player_pos:
+                player1_distance = ((player_pos[X] - x)**2 + (player_pos[Y] - y)**2)**0.5
+            else:
+                player1_distance = GAME_WIDTH*EIGHT_PIXELS # arbitrarily large
+            player2_distance = ((player2_pos[X] - x)**2 + (player2_pos[Y] - y)**2)**0.5
+            nearer = player2_distance <= player1_distance
+            target[nearer] = player2_pos[X], player2_pos[Y]
+            moved |= nearer
+
+        # flying enemies' speed varies sinusoidally, spirits keep their speed
+        speed = np.where(flying & moved, (np.sin((timer * 2*pi) / self.__flying_cycle) / 2) * PIXEL_RATIO/5 * FPS/60 + FLYING_ENEMY["SPEED"],
+                         values[:, 2])
+
+        # homing, each enemy moves at its speed directly towards its target
+        x_distance = target[:, X] - x
+        y_distance = target[:, Y] - y
+        distance = (x_distance**2 + y_distance**2)**0.5 # pythagoras
+        velocity = np.zeros((len(enemies), 2))
+        np.divide(x_distance, distance, out=velocity[:, X], where=distance != 0)
+        np.divide(y_distance, distance, out=velocity[:, Y], where=distance != 0)
+        velocity *= speed[:, np.newaxis]
+        velocity[~moved] = 0
+        velocity_x, velocity_y = velocity[:, X], velocity[:, Y]
+
+        # direction for the images, flying enemies favour up or down and spirits favour left or right
+        up_down = np.where(velocity_y > 0, DOWN, UP)
+        left_right = np.where(velocity_x > 0, RIGHT, LEFT)
+        direction = np.where(flying, np.where(np.abs(velocity_y) + 0.5 > np.abs(velocity_x), up_down, left_right),
+                                     np.where(np.abs(velocity_x) > np.abs(velocity_y) + 0.5, left_right, up_down))
+
+        # 4 animation frames per second for flying enemies, spirits have a single image
+        frame = np.where(flying, np.trunc(((timer * 4)/FPS) % self.__flying_frames), 0)
+
+        self.__next_values = np.column_stack((x + velocity_x, y + velocity_y, speed, timer, direction, frame, moved))
+
+    def step(self, enemy): # return the values update worked out for an enemy
+        # returns x, y, speed, timer, direction, animation frame and whether it moved, direction and frame are only worked out if it moved
+        x, y, speed, timer, direction, frame, moved = self.__next_values[self.__rows[enemy]].tolist()
+        return x, y, speed, int(timer), int(direction), int(frame), moved == 1
@@ -0,0 +1,296 @@
+from collections import deque
+
+import numpy as np
+import pygame
+
+from constants import *
+
+#======================Spatial Hash Class======================#
+# splits the game into square cells (the 8x8 pixel tiles by default) and keeps track of which items are in which cells
+# an item is in every cell its rect overlaps, so anything that could collide with a rect is in one of the cells the rect overlaps
+class SpatialHash():
+    def __init__(self, cell_size=EIGHT_PIXELS):
+        self.__cell_size = cell_size
+        self.__cells = {}      # (column, row) : dictionary of item : rect for the items in the cell, dictionaries keep insertion order and remove in O(1)
+        self.__item_cells = {} # item : list of the (column, row) cells it is in
+
+    def __cells_of(self, rect): # returns the (column, row) of every cell a rect overlaps
+        # right and bottom are one past the edge of the rect, so -1 to not count a cell the rect only touches
+        size = self.__cell_size
+        left, top = rect.left // size, rect.top // size
+        right, bottom = (rect.right - 1) // size, (rect.bottom - 1) // size
+        if left == right:
+            if top == bottom: # most small rects are within a single cell
+                return [(left, top)]
+            return [(left, top), (left, bottom)] if bottom == top + 1 else [(left, row) for row in range(top, bottom + 1)]
+        if top == bottom:
+            return [(left, top), (right, top)] if right == left + 1 else [(column, top) for column in range(left, right + 1)]
+        return [(column, row) for column in range(left, right + 1) for row in range(top, bottom + 1)]
+
+    def insert(self, item, rect): # add an item with a rect to every cell the rect overlaps
+        # the rect is kept as the same object, so if it is moved in place collision checks use where it is now
+        cells = self.__cells_of(rect)
+        self.__item_cells[item] = cells
+        for cell in cells:
+            if cell in self.__cells:
+                self.__cells[cell][item] = rect
+            else:
+                self.__cells[cell] = {item : rect}
+
+    def remove(self, item): # remove an item from every cell it is in
+        for cell in self.__item_cells.pop(item):
+            del self.__cells[cell][item]
+
+    def move(self, item, rect): # update the cells of an item whose rect has changed
+        if self.__cells_of(rect) != self.__item_cells[item]: # most moves stay within the same cells
+            self.remove(item)
+            self.insert(item, rect)
+
+    def query(self, rect): # return a list of every item in the cells a rect overlaps, each item only once
+        # these are only the items that could collide with the rect, they still need checking with colliderect
+        items = {}
+        for cell in self.__cells_of(rect):
+            if cell in self.__cells:
+                items.update(self.__cells[cell])
+        return list(items)
+
+    def collides(self, rect, ignore=None): # returns True if the rect collides with the rect of any item other than ignore
+        for cell in self.__cells_of(rect):
+            if cell in self.__cells:
+                for item, item_rect in self.__cells[cell].items():
+                    if item is not ignore and rect.colliderect(item_rect):
+                        return True
+        return False
+
+    def clear(self): # remove every item
+        self.__cells = {}
+        self.__item_cells = {}
+
+    def __contains__(self, item): # allows item in spatial_hash
+        return item in self.__item_cells
+
+#======================Tile Map Class======================#
+# which tiles of the game's grid have collision, so a rect only needs checking against the tiles it overlaps
+# also merges the collidable tiles into wider / taller rects and keeps which rect covers each tile, for checks that need the rects themselves
+class TileMap():
+    def __init__(self, columns, rows, tile_size=EIGHT_PIXELS, border=2):
+        self.__columns = columns
+        self.__rows = rows
+        self.__tile_size = tile_size
+        self.__border = border # empty tiles around the outside, so rects that have left the game are looked up there and collide with nothing
+        self.__occupied = np.zeros((rows + 2*border, columns + 2*border), bool) # indexed by [row + border, column + border]
+        self.__owners = [[-1]*columns for _ in range(rows)] # index of the collidable rect covering each tile, -1 if none
+        self.__rects = [] # the collidable tiles merged into as few rects as the greedy merge finds
+        self.__collision = [[False]*columns for _ in range(rows)] # whether each tile has collision, as lists for lookups one at a time
+        self.__version = 0 # goes up every time the tiles are built, so anything worked out from them knows to start again
+
+    def build(self, grid, rects=None): # work out the tiles from a grid of cells, merging them into rects unless the rects are given
+        border = self.__border
+        self.__collision = [[cell.get_collision() for cell in row] for row in grid]
+        self.__occupied[border:border + self.__rows, border:border + self.__columns] = self.__collision
+        self.__owners = [[-1]*self.__columns for _ in range(self.__rows)]
+        if rects is None:
+            rects = self.__merge({(row, column) for row in range(self.__rows) for column in range(self.__columns) if self.__collision[row][column]})
+        self.__rects = []
+        for rect in rects:
+            self.__set_rect(len(self.__rects), rect)
+        self.__version += 1
+
+    def add_tile(self, row, column): # give a tile collision, only the rects next to it are merged again
+        if self.__collision[row][column]:
+            return
+        self.__collision[row][column] = True
+        self.__occupied[row + self.__border, column + self.__border] = True
+
+        # the rects touching the tile are split back into tiles and merged again along with it
+        indices = set()
+        for row_offset, column_offset in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
+            if 0 <= row + row_offset < self.__rows and 0 <= column + column_offset < self.__columns:
+                indices.add(self.__owners[row + row_offset][column + column_offset])
+        indices.discard(-1)
+        tiles = {(row, column)}
+        for index in indices:
+            tiles.update(self.__rect_tiles(self.__rects[index]))
+
+        # the merged rects take the places of the old ones, any places left over are filled from the end of the list
+        places = sorted(indices)
+        for rect in self.__merge(tiles):
+            self.__set_rect(places.pop(0) if places else len(self.__rects), rect)
+        for index in reversed(places):
+            last = self.__rects.pop()
+            if index < len(self.__rects):
+                self.__set_rect(index, last)
+        self.__version += 1
+
+    def __merge(self, tiles): # merge a set of (row, column) tiles into rects, a tile joins the tiles to its right, or if there are none the tiles below it
+        # goes along each row from the top, so merging every tile gives the same rects whatever order they were added in
+        size = self.__tile_size
+        remaining = set(tiles) # tiles not in a rect yet
+        rects = []
+        for row, column in sorted(tiles):
+            if (row, column) not in remaining:
+                continue
+            remaining.remove((row, column))
+            width, height = 1, 1
+            while (row, column + width) in remaining:
+                remaining.remove((row, column + width))
+                width += 1
+            if width == 1:
+                while (row + height, column) in remaining:
+                    remaining.remove((row + height, column))
+                    height += 1
+            rects.append(pygame.Rect(column*size, row*size, width*size, height*size))
+        return rects
+
+    def __rect_tiles(self, rect): # return the (row, column) of every tile a rect covers
+        size = self.__tile_size
+        return [(row, column) for row in range(rect.top // size, rect.bottom // size) for column in range(rect.left // size, rect.right // size)]
+
+    def __set_rect(self, index, rect): # put a rect at an index of the list, or on the end, and make it the owner of its tiles
+        if index == len(self.__rects):
+            self.__rects.append(rect)
+        else:
+            self.__rects[index] = rect
+        for row, column in self.__rect_tiles(rect):
+            self.__owners[row][column] = index
+
+    def get_rects(self): # return the list of collidable rects
+        return self.__rects
+
+    def get_size(self): # return the number of columns and rows
+        return self.__columns, self.__rows
+
+    def get_tile_size(self):
+        return self.__tile_size
+
+    def get_collision(self): # return a list of rows of whether each tile has collision
+        return self.__collision
+
+    def get_version(self):
+        return self.__version
+
+    def get_collidables(self, rect): # return the collidable rects covering the tiles a rect overlaps, in the order of the list
+        # right and bottom are one past the edge of the rect, so -1 to not count a tile the rect only touches
+        size = self.__tile_size
+        left, top = max(rect.left // size, 0), max(rect.top // size, 0)
+        right, bottom = min((rect.right - 1) // size, self.__columns - 1), min((rect.bottom - 1) // size, self.__rows - 1)
+        indices = set()
+        for row in range(top, bottom + 1):
+            indices.update(self.__owners[row][left:right + 1])
+        indices.discard(-1)
+        return [self.__rects[index] for index in sorted(indices)]
+
+    def collides_many(self, topleft, size): # return which of an array of rects overlap a tile with collision
+        # topleft is an array of rows of left, top and size is the width and height of every rect
+        # the rects can't be bigger than a tile, so checking the tiles under their four corners is enough
+        border = self.__border*self.__tile_size
+        corners = np.array([(0, 0), (size[X] - 1, 0), (0, size[Y] - 1), (size[X] - 1, size[Y] - 1)]) + border
+        tiles = (topleft[:, np.newaxis] + corners) // self.__tile_size # [rect, corner] : (column, row) in the occupied array
+        np.clip(tiles, 0, (self.__occupied.shape[1] - 1, self.__occupied.shape[0] - 1), out=tiles)
+        return self.__occupied[tiles[..., Y], tiles[..., X]].any(axis=1)
+
+#======================Flow Field Class======================#
+# the number of tiles from every tile to the nearest target, found with a breadth first search over a tile map
+# ground enemies follow it downhill to walk around crates instead of into them
+# only searched again when a target changes tile or the tile map is rebuilt, then each lookup is O(1)
+class FlowField():
+    def __init__(self, tile_map):
+        self.__tile_map = tile_map
+        self.__steps = {UP : (0, -1), LEFT : (-1, 0), DOWN : (0, 1), RIGHT : (1, 0)} # direction : (column, row) step
+        self.__targets = None # the tiles searched from last time
+        self.__version = None # the version of the tile map searched last time
+        self.__distances = [] # rows of the number of tiles to the nearest target, -1 if a target can't be reached
+
+    def update(self, positions): # search again if the targets have changed tile or the tile map has changed
+        # positions is a list of target positions, None for targets that aren't being moved towards
+        columns, rows = self.__tile_map.get_size()
+        size = self.__tile_map.get_tile_size()
+        targets = sorted({(int(pos[X] // size), int(pos[Y] // size)) for pos in positions if pos})
+        targets = [(column, row) for column, row in targets if 0 <= column < columns and 0 <= row < rows]
+        if targets == self.__targets and self.__tile_map.get_version() == self.__version:
+            return
+        self.__targets = targets
+        self.__version = self.__tile_map.get_version()
+
+        collision = self.__tile_map.get_collision()
+        distances = [[-1]*columns for _ in range(rows)]
+        queue = deque()
+        for column, row in targets:
+            distances[row][column] = 0
+            queue.append((column, row))
+        while queue:
+            column, row = queue.popleft()
+            distance = distances[row][column] + 1
+            for step_x, step_y in self.__steps.values():
+                next_column, next_row = column + step_x, row + step_y
+                if 0 <= next_column < columns and 0 <= next_row < rows and distances[next_row][next_column] == -1 and not collision[next_row][next_column]:
+                    distances[next_row][next_column] = distance
+                    queue.append((next_column, next_row))
+        self.__distances = distances
+
+    def get_direction(self, pos, preferred, leeway): # return the direction to move from a position, None if there is no path to follow
+        # preferred is used if it is one of the shortest ways, so an enemy's own choice still counts
+        # if the position is more than leeway off the middle of its tile across the way to go, the direction back to the middle is given
+        # first so that turns are made in the middle of a tile and corners aren't clipped
+        columns, rows = self.__tile_map.get_size()
+        size = self.__tile_map.get_tile_size()
+        column, row = int(pos[X] // size), int(pos[Y] // size)
+        if not (0 <= column < columns and 0 <= row < rows) or self.__distances[row][column] <= 0:
+            return None # outside the grid, somewhere no target can be reached from, or already on a target's tile
+
+        distance = self.__distances[row][column]
+        chosen = None
+        for direction in [preferred, UP, LEFT, DOWN, RIGHT]:
+            if direction is None:
+                continue
+            step_x, step_y = self.__steps[direction]
+            next_column, next_row = column + step_x, row + step_y
+            if 0 <= next_column < columns and 0 <= next_row < rows and self.__distances[next_row][next_column] == distance - 1:
+                chosen = direction
+                break
+
+        if chosen in [LEFT, RIGHT]:
+            offset = pos[Y] - (row*size + size/2)
+            if abs(offset) >= leeway:
+                return UP if offset > 0 else DOWN
+        else:
+            offset = pos[X] - (column*size + size/2)
+            if abs(offset) >= leeway:
+                return LEFT if offset > 0 else RIGHT
+        return chosen
+
+#======================Free Tiles Class======================#
+# the tiles that something can be placed on, kept in a list so a random one is picked in O(1)
+# a tile is removed by moving the last tile into its place, so removing is O(1) and the list never has gaps
+class FreeTiles():
+    def __init__(self, tiles):
+        self.__tiles = list(tiles) # list of (row, column)
+        self.__indices = {tile : index for index, tile in enumerate(self.__tiles)} # where each tile is in the list
+
+    def add(self, tile): # add a tile to the end of the list, if it isn't already in it
+        if tile not in self.__indices:
+            self.__indices[tile] = len(self.__tiles)
+            self.__tiles.append(tile)
+
+    def remove(self, tile): # remove a tile, if it is in the list
+        index = self.__indices.pop(tile, None)
+        if index is None:
+            return
+        last = self.__tiles.pop()
+        if index < len(self.__tiles): # the last tile takes its place
+            self.__tiles[index] = last
+            self.__indices[last] = index
+
+    def choice(self, random): # return a random tile using a random generator, None if there are none
+        if self.__tiles:
+            return random.choice(self.__tiles)
+        return None
+
+    def get_tiles(self): # return the list of tiles, its order decides which tile is picked
+        return self.__tiles
+
+    def __contains__(self, tile): # allows tile in free_tiles
+        return tile in self.__indices
+
+    def __len__(self):
+        return len(self.__tiles)
@@ -0,0 +1,240 @@
+#======================Imports======================#
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window is needed to run the game headless
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # set before pygame is imported so that they take effect
+
+import argparse
+from time import perf_counter
+
+import pygame
+
+from constants import *
+from game import Game
+from game_classes import KeyState, PLAYER_CONTROLS
+from replay import InputRecorder, Replay, ReplayInput, KEYFRAME_INTERVAL
+import sounds
+
+#======================Virtual Clock Class======================#
+# counts time in frames instead of waiting for it to pass
+# used in place of pygame.time so the game runs as fast as the CPU allows
+class VirtualClock():
+    def __init__(self):
+        self.__ticks = 0 # milliseconds that have passed in the game
+
+    def tick(self): # advance the clock by one frame
+        self.__ticks += 1000/FPS
+
+    def delay(self, milliseconds): # pause without waiting, the time is just added on
+        self.__ticks += milliseconds
+
+    def set_ticks(self, ticks): # jump the clock to a time, used when a game is loaded part way through
+        self.__ticks = ticks
+
+    def get_ticks(self): # return the number of milliseconds that have passed
+        return self.__ticks
+
+#======================Scripted Input Class======================#
+# input read from a script of (frames, keys, use item) entries
+# e.g. [(60, [pygame.K_d, pygame.K_UP], False), (30, [], True)] holds D and UP for a second then presses SPACE once
+class ScriptedInput():
+    def __init__(self, script, loop=True):
+        self.__script = script
+        self.__loop = loop # whether to start the script again once it ends
+        self.__index = 0 # the current entry in the script
+        self.__frame = 0 # the number of frames into the current entry
+
+    def get_input(self, game): # return the key state and event list for the next frame
+        if self.__index >= len(self.__script):
+            return KeyState(), [] # script has ended, nothing is pressed
+        frames, pressed, use_item = self.__script[self.__index]
+        event_list = []
+        if use_item and self.__frame == 0: # SPACE is only pressed on the first frame of the entry
+            event_list.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+
+        self.__frame += 1
+        if self.__frame >= frames: # move onto the next entry
+            self.__frame = 0
+            self.__index += 1
+            if self.__loop and self.__index == len(self.__script):
+                self.__index = 0
+        return KeyState(pressed), event_list
+
+#======================Bot Input Class======================#
+# a simple bot that shoots at the nearest enemy and keeps away from it
+# has no randomness so that the same game always gives the same input
+class BotInput():
+    def __init__(self, flee_distance=4*EIGHT_PIXELS, aim_leeway=2*PIXEL_RATIO):
+        self.__flee_distance = flee_distance # how close an enemy has to be before the bot runs away from it
+        self.__aim_leeway = aim_leeway # how far off an enemy can be in x or y before the bot shoots diagonally
+
+    def __sign(self, value, leeway): # returns -1, 0 or 1 depending on the value, 0 if within the leeway
+        if value > leeway:
+            return 1
+        elif value < -leeway:
+            return -1
+        return 0
+
+    def __direction_keys(self, keys, x, y): # returns the keys in UP, LEFT, DOWN, RIGHT order for a direction
+        pressed = []
+        if y < 0:
+            pressed.append(keys[UP])
+        elif y > 0:
+            pressed.append(keys[DOWN])
+        if x < 0:
+            pressed.append(keys[LEFT])
+        elif x > 0:
+            pressed.append(keys[RIGHT])
+        return pressed
+
+    def get_input(self, game): # return the key state and event list for the next frame
+        pressed = []
+        event_list = []
+        for player in game.get_players():
+            move_keys, shoot_keys = PLAYER_CONTROLS[player.get_player()]
+            player_x, player_y = player.get_rect().center
+
+            nearest = None
+            nearest_distance = None
+            for enemy in game.get_enemies():
+                distance = ((enemy.get_rect().centerx - player_x)**2 + (enemy.get_rect().centery - player_y)**2)**0.5
+                if nearest_distance is None or distance < nearest_distance:
+                    nearest, nearest_distance = enemy, distance
+
+            if nearest:
+                x_distance = nearest.get_rect().centerx - player_x
+                y_distance = nearest.get_rect().centery - player_y
+                pressed.extend(self.__direction_keys(shoot_keys, self.__sign(x_distance, self.__aim_leeway), self.__sign(y_distance, self.__aim_leeway)))
+                if nearest_distance < self.__flee_distance: # run directly away from the enemy
+                    pressed.extend(self.__direction_keys(move_keys, -self.__sign(x_distance, 0), -self.__sign(y_distance, 0)))
+            else: # nothing to shoot at, head back towards the middle
+                centre_x, centre_y = GAME_WIDTH*EIGHT_PIXELS//2, GAME_HEIGHT*EIGHT_PIXELS//2
+                pressed.extend(self.__direction_keys(move_keys, self.__sign(centre_x - player_x, EIGHT_PIXELS), self.__sign(centre_y - player_y, EIGHT_PIXELS)))
+
+            if player.get_item() and player.get_player() == 0: # use items straight away in single player
+                event_list.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        return KeyState(pressed), event_list
+
+#======================Headless Runner Class======================#
+# steps a game with no window, no frame rate cap and input from an input provider
+# an input provider is anything with a get_input(game) method that returns a key state and an event list
+class HeadlessRunner():
+    def __init__(self, input_provider, players=1, character_hex=DEFAULT_HEX, player2_hex=DEFAULT_HEX, initial_obstacles=FENCE_LIST, seed=None, checksums=False, record=False, keyframe_interval=KEYFRAME_INTERVAL):
+        self.__clock = VirtualClock()
+        player2_hex = player2_hex if players == 2 else None
+        self.__game = Game((0,0), character_hex, initial_obstacles, players=players, player2_hex=player2_hex, clock=self.__clock, seed=seed)
+        self.__input = input_provider
+        self.__recorder = InputRecorder(self.__game.get_seed(), players, character_hex, player2_hex, keyframe_interval) if record else None # records the input so it can be saved as a replay
+        self.__frames = 0 # the number of frames that have been stepped
+        self.__checksums = [] if checksums else None # the checksum of the game after every frame, if asked for
+
+    def get_game(self): # return the game being run
+        return self.__game
+
+    def get_clock(self): # return the virtual clock
+        return self.__clock
+
+    def get_frames(self): # return the number of frames stepped
+        return self.__frames
+
+    def get_checksums(self): # return the list of checksums, None if they are not being taken
+        return self.__checksums
+
+    def get_recorder(self): # return the input recorder, None if the input is not being recorded
+        return self.__recorder
+
+    def load_state(self, state, frames): # carry on from a saved game state that is a number of frames into the game
+        self.__game.load_state(state)
+        self.__frames = frames
+        self.__clock.set_ticks(frames * 1000/FPS)
+
+    def step(self): # run a single frame of the game
+        keys, event_list = self.__input.get_input(self.__game)
+        if self.__recorder:
+            self.__recorder.record(keys, event_list, self.__game)
+        self.__game.update(event_list, keys)
+        sounds.end_frame()
+        self.__clock.tick()
+        self.__frames += 1
+        if self.__checksums is not None:
+            self.__checksums.append(self.__game.get_checksum())
+
+    def run(self, max_frames=None): # run until the game is over or max_frames have been stepped, returns the results
+        start_frames = self.__frames
+        start_time = perf_counter()
+        while not self.__game.get_game_over() and (max_frames is None or self.__frames - start_frames < max_frames):
+            self.step()
+        elapsed = perf_counter() - start_time
+        frames = self.__frames - start_frames
+        return {'seed'              : self.__game.get_seed(),
+                'frames'            : frames,
+                'game_seconds'      : self.__clock.get_ticks() / 1000,
+                'real_seconds'      : elapsed,
+                'ticks_per_second'  : frames / elapsed if elapsed else 0,
+                'game_over'         : self.__game.get_game_over(),
+                'score'             : self.__game.get_score(),
+                'enemies_killed'    : self.__game.get_enemies_killed(),
+                'bullets_shot'      : self.__game.get_bullets_shot(),
+                'items_used'        : self.__game.get_items_used(),
+                'checksum'          : self.__game.get_checksum()}
+
+def play_replay(path, checksums=False): # play a replay back headless, returns the runner and whether it ended the same way it was recorded
+    replay = Replay(path)
+    if replay.get_pixel_ratio() != PIXEL_RATIO:
+        print(f"warning: replay was recorded with a pixel ratio of {replay.get_pixel_ratio()} but the current one is {PIXEL_RATIO}, it will not play back the same")
+    runner = HeadlessRunner(ReplayInput(replay), players=replay.get_players(), character_hex=replay.get_character_hex(), player2_hex=replay.get_player2_hex(), seed=replay.get_seed(), checksums=checksums)
+    runner.run(max_frames=replay.get_frames())
+    return runner, runner.get_game().get_checksum() == replay.get_final_checksum()
+
+def seek_replay(replay, frame): # returns a runner that has played a replay up to a frame, starting from the keyframe before it
+    keyframe = replay.get_keyframe(frame)
+    runner = HeadlessRunner(ReplayInput(replay, keyframe), players=replay.get_players(), character_hex=replay.get_character_hex(), player2_hex=replay.get_player2_hex(), seed=replay.get_seed())
+    if keyframe:
+        runner.load_state(keyframe['state'], keyframe['frame'])
+    runner.run(max_frames=min(frame, replay.get_frames()) - runner.get_frames())
+    return runner
+
+#======================Command Line======================#
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="run the game headless as fast as possible and report the ticks per second")
+    parser.add_argument("--players", type=int, choices=[1, 2], default=1)
+    parser.add_argument("--frames", type=int, default=None, help="maximum number of frames to run, defaults to until the game is over")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the game, random if not given")
+    parser.add_argument("--idle", action="store_true", help="give no input instead of using the bot")
+    parser.add_argument("--record", default=None, help="save the input of the run to this replay file")
+    parser.add_argument("--keyframe-seconds", type=float, default=KEYFRAME_INTERVAL/FPS, help="with --record, how often the game state is saved so --seek is fast, 0 for none and a smaller file")
+    parser.add_argument("--replay", default=None, help="play back this replay file instead and check it ends the same way")
+    parser.add_argument("--seek", type=float, default=None, help="with --replay, jump to this many seconds into the replay and report the checksum there")
+    parser.add_argument("--voices", action="store_true", help="also report how many sounds were played and how many channels were playing each frame")
+    arguments = parser.parse_args()
+
+    if arguments.replay and arguments.seek is not None:
+        start_time = perf_counter()
+        replay = Replay(arguments.replay)
+        runner = seek_replay(replay, round(arguments.seek*FPS))
+        elapsed = perf_counter() - start_time
+        print(f"frame: {runner.get_frames()}")
+        print(f"keyframes: {replay.get_keyframe_count()}")
+        print(f"real_seconds: {round(elapsed, 3)}")
+        print(f"checksum: {runner.get_game().get_checksum()}")
+        raise SystemExit(0)
+
+    if arguments.replay:
+        start_time = perf_counter()
+        runner, matches = play_replay(arguments.replay)
+        elapsed = perf_counter() - start_time
+        print(f"frames: {runner.get_frames()}")
+        print(f"real_seconds: {round(elapsed, 2)}")
+        print(f"checksum: {runner.get_game().get_checksum()}")
+        print(f"matches: {matches}")
+        raise SystemExit(0 if matches else 1)
+
+    runner = HeadlessRunner(ScriptedInput([]) if arguments.idle else BotInput(), players=arguments.players, seed=arguments.seed, record=bool(arguments.record),
+                            keyframe_interval=round(arguments.keyframe_seconds*FPS))
+    results = runner.run(max_frames=arguments.frames)
+    if arguments.record:
+        runner.get_recorder().save(arguments.record, results['checksum'])
+    if arguments.voices:
+        for key, value in sounds.get_voice_info().items():
+            print(f"sound {key}: {round(value, 2) if isinstance(value, float) else value}")
+    for key, value in results.items():
+        print(f"{key}: {round(value, 2) if isinstance(value, float) else value}")
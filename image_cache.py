@@ -0,0 +1,106 @@
+import os
+import json
+import mmap
+from hashlib import sha1
+from struct import pack, unpack, calcsize, error
+from threading import Lock
+
+from pygame import image
+
+# a cache file is a header followed by the finished pixels of every image, 4 bytes per pixel in BGRA order
+# BGRA is the order convert_alpha() gives, so images are wrapped straight around the memory mapped file without converting
+# the header is JSON giving where each image's pixels start after it and the modified time and hash of every file the images were made from
+# if any of those files have changed the whole cache is thrown away and rebuilt
+CACHE_MAGIC = b"TSSI"
+CACHE_VERSION = 1 # changes whenever the layout of the file changes
+HEADER_FORMAT = "<4sBI" # magic, version, length of the JSON
+PIXEL_FORMAT = "BGRA"
+
+def file_hash(path): # the hash of a file's contents
+    with open(path, "rb") as file:
+        return sha1(file.read()).hexdigest()
+
+#======================Image Cache Class======================#
+# keeps finished images (scaled, recoloured, masked) on disk so later starts don't need to make them again
+# get returns an image from the file if it is there, otherwise makes it and save writes it for next time
+# images are loaded on several threads at once, so everything that reads or changes the images or sources holds the lock
+class ImageCache():
+    def __init__(self, path, sources=[]):
+        self.__path = path
+        self.__images = {} # name : image, both from the file and made since it was loaded
+        self.__sources = {} # path : [modified time, hash] of every file an image was made from
+        self.__changed = False # if there is anything to save
+        self.__buffer = None # the memory mapped file, the images loaded from it share its memory
+        self.__lock = Lock()
+        try:
+            self.__load()
+        except (OSError, ValueError, KeyError, error): # a missing, unreadable or out of date cache is rebuilt
+            self.__images = {}
+            self.__sources = {}
+            self.__buffer = None
+        for source in sources:
+            self.__add_source(source)
+
+    def __load(self):
+        with open(self.__path, "rb") as file:
+            magic, version, header_length = unpack(HEADER_FORMAT, file.read(calcsize(HEADER_FORMAT)))
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                raise ValueError(f"{self.__path} is not an image cache of version {CACHE_VERSION}")
+            header = json.loads(file.read(header_length))
+            for source, (modified, digest) in header['sources'].items():
+                if os.stat(source).st_mtime_ns != modified:
+                    if file_hash(source) != digest:
+                        raise ValueError(f"{source} has changed since {self.__path} was made")
+                    header['sources'][source] = [os.stat(source).st_mtime_ns, digest] # only touched, so the images are still correct
+                    self.__changed = True
+            # copy on write so images can still be drawn on without changing the file
+            self.__buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.__sources = header['sources']
+        pixels = memoryview(self.__buffer)[calcsize(HEADER_FORMAT) + header_length:]
+        for name, (offset, width, height) in header['images'].items():
+            self.__images[name] = image.frombuffer(pixels[offset:offset + width*height*4], (width, height), PIXEL_FORMAT)
+
+    def __add_source(self, source): # remember a file the images depend on so the cache can be checked against it next time, the lock must be held
+        if source not in self.__sources:
+            self.__sources[source] = [os.stat(source).st_mtime_ns, file_hash(source)]
+            self.__changed = True
+
+    def get(self, name, make, sources=[]): # return the image with this name, made with make() if it isn't in the cache
+        with self.__lock:
+            for source in sources:
+                self.__add_source(source)
+            if name in self.__images:
+                return self.__images[name]
+        made_image = make() # made without the lock, as making an image can need other images from the cache
+        with self.__lock:
+            self.__changed = True
+            return self.__images.setdefault(name, made_image) # if another thread made it first, every caller gets the same image
+
+    def save(self): # write every image to the cache file if any have been made since it was loaded
+        with self.__lock:
+            self.__save()
+
+    def __save(self):
+        if not self.__changed:
+            return
+        header = {'sources' : self.__sources,
+                  'images'  : {}}
+        pixels = []
+        offset = 0 # from the start of the pixels, just after the header
+        for name, cached_image in self.__images.items():
+            pixels.append(image.tobytes(cached_image, PIXEL_FORMAT))
+            header['images'][name] = [offset, cached_image.get_width(), cached_image.get_height()]
+            offset += len(pixels[-1])
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-(calcsize(HEADER_FORMAT) + len(encoded)) % 4) # pixels start on a multiple of 4 bytes
+        try:
+            os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+            with open(self.__path + ".tmp", "wb") as file:
+                file.write(pack(HEADER_FORMAT, CACHE_MAGIC, CACHE_VERSION, len(encoded)))
+                file.write(encoded)
+                for data in pixels:
+                    file.write(data)
+            os.replace(self.__path + ".tmp", self.__path) # replaced in one step so a half written cache is never loaded
+        except OSError: # the cache is only a speed up, the game still works if it can't be written
+            return
+        self.__changed = False
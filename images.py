@@ -1,143 +1,274 @@
-from pygame import display, image, transform, mask
+import os
+import json
+import atexit
 
-from constants import PIXEL_RATIO, SCREEN_SIZE, BACKGROUND_COLOUR, SPIRIT_ENEMY_COLOUR, WHITE
-from utility_functions import colour_swap
+from pygame import Surface, display, image, transform, mask
 
-display.init()
-display.set_mode(SCREEN_SIZE)  # display must be initialised and a video mode set for image loading and manipulation
+from constants import PIXEL_RATIO, SCREEN_SIZE, ATLAS_PATH, ATLAS_MANIFEST, IMAGE_CACHE_PATH, BACKGROUND_COLOUR, SPIRIT_ENEMY_COLOUR, WHITE, HIT_COLOUR, CROW_BLUR_ALPHA
+from utility_functions import colour_swap, silhouette, transparent_copy
+from image_cache import ImageCache, file_hash
+from asset_registry import AssetRegistry
 
 # all images are scaled up by PIXEL_RATIO to ensure a consistent pixel size
 
+#======================Lazy Loading======================#
+# importing this module loads nothing, each image is loaded the first time it is used as images.<name>
+# or all at once by preload(), so tools that never draw anything don't need a window or to wait for every image
+assets = AssetRegistry()
+get = assets.get
+
+def __getattr__(name): # only called for names that haven't been used yet, after loading they are normal attributes of the module
+    if not assets.has(name):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = get(name)
+    return globals()[name]
+
+def preload(): # load every image now, e.g. while the game is starting, rather than the first time each is used
+    assets.preload()
+    save_cache()
+
+def submit_preload(executor): # start loading every image on the executor's threads, returns a future for each, save_cache() once they are done
+    return assets.submit_preload(executor)
+
+def save_cache(): # write any images made since the cache was loaded so the next start doesn't have to make them
+    if assets.is_loaded("image_cache"):
+        get("image_cache").save()
+atexit.register(save_cache) # for images that were loaded on their own rather than by preload()
+
+def require_display(): # images can only be converted to the screen's pixel format once a video mode has been set
+    if not display.get_init():
+        display.init()
+    if not display.get_surface():
+        display.set_mode(SCREEN_SIZE) # if the game hasn't made its window yet
+
+def add_image(name, path): # add an image file
+    assets.add(name, lambda: load_image(path))
+
+def add_list(name, names): # add a list of other images by their names, which can be a list of lists
+    assets.add(name, lambda: assets.resolve(names))
+
+# finished images are kept in a cache file for each PIXEL_RATIO so later starts don't decode, scale or mask anything
+# this file, utility_functions.py and the colours in constants.py decide how the images are made, so the cache is rebuilt if any of them change
+assets.add("image_cache", lambda: ImageCache(IMAGE_CACHE_PATH, ["images.py", "utility_functions.py", "constants.py"]))
+image_sources = {} # image : the files it was loaded from, so images made from it are rebuilt in the cache when they change
+
+#======================Atlas======================#
+# images are packed into a few sprite sheets by build_atlas.py so only a handful of files are decoded at startup
+# every image is scaled up into a subsurface of one large copy of its sheet, so images drawn together share one source surface
+# only the images are scaled rather than the whole sheet, so the empty space between them costs nothing
+def load_atlas(): # returns each image in the atlas scaled up and cut out of its sheet, nothing if the atlas hasn't been built
+    try:
+        with open(ATLAS_MANIFEST, "r") as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return {}
+    changed = changed_images(manifest)
+    scaled_sheets = []
+    for i, sheet in enumerate(manifest['sheets']):
+        rects = [rect for sheet_number, *rect in manifest['images'].values() if sheet_number == i]
+        sheet_path = f"{ATLAS_PATH}/{sheet}"
+        scaled_sheets.append(get("image_cache").get(sheet_path, lambda: scale_sheet(sheet_path, rects), [sheet_path, ATLAS_MANIFEST]))
+    images = {}
+    for path, (sheet, x, y, width, height) in manifest['images'].items():
+        if path not in changed: # changed images are left out so load_image loads them from their own file
+            images[path] = scaled_sheets[sheet].subsurface((x*PIXEL_RATIO, y*PIXEL_RATIO, width*PIXEL_RATIO, height*PIXEL_RATIO))
+            image_sources[images[path]] = [path, f"{ATLAS_PATH}/{manifest['sheets'][sheet]}", ATLAS_MANIFEST]
+    return images
+assets.add("atlas_images", load_atlas)
+
+def changed_images(manifest): # returns the images that have been changed since the atlas was built, warning that it needs building again
+    # only images modified after their sheet are hashed, so this costs little when nothing has changed
+    changed = []
+    for path, (sheet, *_) in manifest['images'].items():
+        if (os.path.exists(path) and os.stat(path).st_mtime_ns > os.stat(f"{ATLAS_PATH}/{manifest['sheets'][sheet]}").st_mtime_ns
+                and file_hash(path) != manifest.get('hashes', {}).get(path)):
+            changed.append(path)
+    if changed:
+        print(f"warning: {len(changed)} images have changed since the atlas was built, run build_atlas.py to pack them again: {', '.join(changed)}")
+    return changed
+
+def scale_sheet(path, rects): # returns a copy of the sheet at the path with the images in each rect scaled up
+    require_display()
+    sheet = image.load(path).convert_alpha()
+    scaled_sheet = Surface((sheet.get_width()*PIXEL_RATIO, sheet.get_height()*PIXEL_RATIO), 0, sheet) # same pixel format as the sheet
+    for x, y, width, height in rects:
+        scaled_rect = (x*PIXEL_RATIO, y*PIXEL_RATIO, width*PIXEL_RATIO, height*PIXEL_RATIO)
+        transform.scale(sheet.subsurface((x, y, width, height)), scaled_rect[2:], scaled_sheet.subsurface(scaled_rect))
+    return scaled_sheet
+
+def load_image(path): # returns the image at the path scaled up by PIXEL_RATIO, images not in the atlas are loaded on their own
+    if path in get("atlas_images"):
+        return get("atlas_images")[path]
+    loaded_image = get("image_cache").get(path, lambda: scale_image(path), [path])
+    image_sources[loaded_image] = [path]
+    return loaded_image
+
+def scale_image(path): # returns the image at the path scaled up by PIXEL_RATIO
+    require_display()
+    return transform.scale_by(image.load(path).convert_alpha(), PIXEL_RATIO)
+
 #======================Enemies======================#
-default_back_image1 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_back1.png").convert_alpha(), PIXEL_RATIO)
-default_back_image2 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_back2.png").convert_alpha(), PIXEL_RATIO)
-default_back_image3 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_back3.png").convert_alpha(), PIXEL_RATIO)
-default_back_image4 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_back4.png").convert_alpha(), PIXEL_RATIO)
-default_left_image1 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_left1.png").convert_alpha(), PIXEL_RATIO)
-default_left_image2 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_left2.png").convert_alpha(), PIXEL_RATIO)
-default_left_image3 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_left3.png").convert_alpha(), PIXEL_RATIO)
-default_left_image4 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_left4.png").convert_alpha(), PIXEL_RATIO)
-default_front_image1 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_front1.png").convert_alpha(), PIXEL_RATIO)
-default_front_image2 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_front2.png").convert_alpha(), PIXEL_RATIO)
-default_front_image3 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_front3.png").convert_alpha(), PIXEL_RATIO)
-default_front_image4 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_front4.png").convert_alpha(), PIXEL_RATIO)
-default_right_image1 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_right1.png").convert_alpha(), PIXEL_RATIO)
-default_right_image2 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_right2.png").convert_alpha(), PIXEL_RATIO)
-default_right_image3 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_right3.png").convert_alpha(), PIXEL_RATIO)
-default_right_image4 = transform.scale_by(image.load("assets/images/enemies/default enemy/goblin_right4.png").convert_alpha(), PIXEL_RATIO)
-default_enemy_images = [[default_back_image1,default_back_image2,default_back_image3,default_back_image4],
-                        [default_left_image1,default_left_image2,default_left_image3,default_left_image4],
-                        [default_front_image1,default_front_image2,default_front_image3,default_front_image4],
-                        [default_right_image1,default_right_image2,default_right_image3,default_right_image4]]
-
-fast_up_image1 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_up1.png").convert_alpha(), PIXEL_RATIO)
-fast_up_image2 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_up2.png").convert_alpha(), PIXEL_RATIO)
-fast_left_image1 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_left1.png").convert_alpha(), PIXEL_RATIO)
-fast_left_image2 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_left2.png").convert_alpha(), PIXEL_RATIO)
-fast_down_image1 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_down1.png").convert_alpha(), PIXEL_RATIO)
-fast_down_image2 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_down2.png").convert_alpha(), PIXEL_RATIO)
-fast_right_image1 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_right1.png").convert_alpha(), PIXEL_RATIO)
-fast_right_image2 = transform.scale_by(image.load("assets/images/enemies/fast enemy/mushroom_right2.png").convert_alpha(), PIXEL_RATIO)
-fast_enemy_images = [[fast_up_image1,fast_up_image2],
-                     [fast_left_image1,fast_left_image2],
-                     [fast_down_image1,fast_down_image2],
-                     [fast_right_image1,fast_right_image2]]
-
-flying_up_image1 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_up1.png").convert_alpha(), PIXEL_RATIO)
-flying_up_image2 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_up2.png").convert_alpha(), PIXEL_RATIO)
-flying_left_image1 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_left1.png").convert_alpha(), PIXEL_RATIO)
-flying_left_image2 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_left2.png").convert_alpha(), PIXEL_RATIO)
-flying_down_image1 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_down1.png").convert_alpha(), PIXEL_RATIO)
-flying_down_image2 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_down2.png").convert_alpha(), PIXEL_RATIO)
-flying_right_image1 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_right1.png").convert_alpha(), PIXEL_RATIO)
-flying_right_image2 = transform.scale_by(image.load("assets/images/enemies/flying enemy/flying_right2.png").convert_alpha(), PIXEL_RATIO)
-flying_enemy_images = [[flying_up_image1,flying_up_image2],
-                       [flying_left_image1,flying_left_image2],
-                       [flying_down_image1,flying_down_image2],
-                       [flying_right_image1,flying_right_image2]]
-
-crow_up_image = transform.scale_by(image.load("assets/images/enemies/crow enemy/crow_enemy_up.png").convert_alpha(), PIXEL_RATIO)
-crow_left_image = transform.scale_by(image.load("assets/images/enemies/crow enemy/crow_enemy_left.png").convert_alpha(), PIXEL_RATIO)
-crow_down_image = transform.scale_by(image.load("assets/images/enemies/crow enemy/crow_enemy_down.png").convert_alpha(), PIXEL_RATIO)
-crow_right_image = transform.scale_by(image.load("assets/images/enemies/crow enemy/crow_enemy_right.png").convert_alpha(), PIXEL_RATIO)
-crow_enemy_images = [crow_up_image, crow_left_image, crow_down_image, crow_right_image]
-
-tough_back_image1 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_back1.png").convert_alpha(), PIXEL_RATIO)
-tough_back_image2 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_back2.png").convert_alpha(), PIXEL_RATIO)
-tough_back_image3 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_back3.png").convert_alpha(), PIXEL_RATIO)
-tough_back_image4 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_back4.png").convert_alpha(), PIXEL_RATIO)
-tough_left_image1 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_left1.png").convert_alpha(), PIXEL_RATIO)
-tough_left_image2 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_left2.png").convert_alpha(), PIXEL_RATIO)
-tough_left_image3 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_left3.png").convert_alpha(), PIXEL_RATIO)
-tough_left_image4 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_left4.png").convert_alpha(), PIXEL_RATIO)
-tough_front_image1 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_front1.png").convert_alpha(), PIXEL_RATIO)
-tough_front_image2 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_front2.png").convert_alpha(), PIXEL_RATIO)
-tough_front_image3 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_front3.png").convert_alpha(), PIXEL_RATIO)
-tough_front_image4 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_front4.png").convert_alpha(), PIXEL_RATIO)
-tough_right_image1 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_right1.png").convert_alpha(), PIXEL_RATIO)
-tough_right_image2 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_right2.png").convert_alpha(), PIXEL_RATIO)
-tough_right_image3 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_right3.png").convert_alpha(), PIXEL_RATIO)
-tough_right_image4 = transform.scale_by(image.load("assets/images/enemies/tough enemy/tough_right4.png").convert_alpha(), PIXEL_RATIO)
-tough_enemy_images = [[tough_back_image1,tough_back_image2,tough_back_image3,tough_back_image4],
-                        [tough_left_image1,tough_left_image2,tough_left_image3,tough_left_image4],
-                        [tough_front_image1,tough_front_image2,tough_front_image3,tough_front_image4],
-                        [tough_right_image1,tough_right_image2,tough_right_image3,tough_right_image4]]
-
-spirit_up_image = transform.scale_by(image.load("assets/images/enemies/spirit enemy/spirit_back.png").convert_alpha(), PIXEL_RATIO)
-spirit_left_image = transform.scale_by(image.load("assets/images/enemies/spirit enemy/spirit_left.png").convert_alpha(), PIXEL_RATIO)
-spirit_down_image = transform.scale_by(image.load("assets/images/enemies/spirit enemy/spirit_front.png").convert_alpha(), PIXEL_RATIO)
-spirit_right_image = transform.scale_by(image.load("assets/images/enemies/spirit enemy/spirit_right.png").convert_alpha(), PIXEL_RATIO)
-spirit_enemy_images = [spirit_up_image, spirit_left_image, spirit_down_image, spirit_right_image]
-for i in range(len(spirit_enemy_images)):
-    face_mask = mask.from_threshold(spirit_enemy_images[i], (255,255,255), threshold=(1, 1, 1, 255))
+add_image("default_back_image1", "assets/images/enemies/default enemy/goblin_back1.png")
+add_image("default_back_image2", "assets/images/enemies/default enemy/goblin_back2.png")
+add_image("default_back_image3", "assets/images/enemies/default enemy/goblin_back3.png")
+add_image("default_back_image4", "assets/images/enemies/default enemy/goblin_back4.png")
+add_image("default_left_image1", "assets/images/enemies/default enemy/goblin_left1.png")
+add_image("default_left_image2", "assets/images/enemies/default enemy/goblin_left2.png")
+add_image("default_left_image3", "assets/images/enemies/default enemy/goblin_left3.png")
+add_image("default_left_image4", "assets/images/enemies/default enemy/goblin_left4.png")
+add_image("default_front_image1", "assets/images/enemies/default enemy/goblin_front1.png")
+add_image("default_front_image2", "assets/images/enemies/default enemy/goblin_front2.png")
+add_image("default_front_image3", "assets/images/enemies/default enemy/goblin_front3.png")
+add_image("default_front_image4", "assets/images/enemies/default enemy/goblin_front4.png")
+add_image("default_right_image1", "assets/images/enemies/default enemy/goblin_right1.png")
+add_image("default_right_image2", "assets/images/enemies/default enemy/goblin_right2.png")
+add_image("default_right_image3", "assets/images/enemies/default enemy/goblin_right3.png")
+add_image("default_right_image4", "assets/images/enemies/default enemy/goblin_right4.png")
+add_list("default_enemy_images", [["default_back_image1","default_back_image2","default_back_image3","default_back_image4"],
+                                 ["default_left_image1","default_left_image2","default_left_image3","default_left_image4"],
+                                 ["default_front_image1","default_front_image2","default_front_image3","default_front_image4"],
+                                 ["default_right_image1","default_right_image2","default_right_image3","default_right_image4"]])
+
+add_image("fast_up_image1", "assets/images/enemies/fast enemy/mushroom_up1.png")
+add_image("fast_up_image2", "assets/images/enemies/fast enemy/mushroom_up2.png")
+add_image("fast_left_image1", "assets/images/enemies/fast enemy/mushroom_left1.png")
+add_image("fast_left_image2", "assets/images/enemies/fast enemy/mushroom_left2.png")
+add_image("fast_down_image1", "assets/images/enemies/fast enemy/mushroom_down1.png")
+add_image("fast_down_image2", "assets/images/enemies/fast enemy/mushroom_down2.png")
+add_image("fast_right_image1", "assets/images/enemies/fast enemy/mushroom_right1.png")
+add_image("fast_right_image2", "assets/images/enemies/fast enemy/mushroom_right2.png")
+add_list("fast_enemy_images", [["fast_up_image1","fast_up_image2"],
+                              ["fast_left_image1","fast_left_image2"],
+                              ["fast_down_image1","fast_down_image2"],
+                              ["fast_right_image1","fast_right_image2"]])
+
+add_image("flying_up_image1", "assets/images/enemies/flying enemy/flying_up1.png")
+add_image("flying_up_image2", "assets/images/enemies/flying enemy/flying_up2.png")
+add_image("flying_left_image1", "assets/images/enemies/flying enemy/flying_left1.png")
+add_image("flying_left_image2", "assets/images/enemies/flying enemy/flying_left2.png")
+add_image("flying_down_image1", "assets/images/enemies/flying enemy/flying_down1.png")
+add_image("flying_down_image2", "assets/images/enemies/flying enemy/flying_down2.png")
+add_image("flying_right_image1", "assets/images/enemies/flying enemy/flying_right1.png")
+add_image("flying_right_image2", "assets/images/enemies/flying enemy/flying_right2.png")
+add_list("flying_enemy_images", [["flying_up_image1","flying_up_image2"],
+                                ["flying_left_image1","flying_left_image2"],
+                                ["flying_down_image1","flying_down_image2"],
+                                ["flying_right_image1","flying_right_image2"]])
+
+add_image("crow_up_image", "assets/images/enemies/crow enemy/crow_enemy_up.png")
+add_image("crow_left_image", "assets/images/enemies/crow enemy/crow_enemy_left.png")
+add_image("crow_down_image", "assets/images/enemies/crow enemy/crow_enemy_down.png")
+add_image("crow_right_image", "assets/images/enemies/crow enemy/crow_enemy_right.png")
+add_list("crow_enemy_images", ["crow_up_image", "crow_left_image", "crow_down_image", "crow_right_image"])
+
+add_image("tough_back_image1", "assets/images/enemies/tough enemy/tough_back1.png")
+add_image("tough_back_image2", "assets/images/enemies/tough enemy/tough_back2.png")
+add_image("tough_back_image3", "assets/images/enemies/tough enemy/tough_back3.png")
+add_image("tough_back_image4", "assets/images/enemies/tough enemy/tough_back4.png")
+add_image("tough_left_image1", "assets/images/enemies/tough enemy/tough_left1.png")
+add_image("tough_left_image2", "assets/images/enemies/tough enemy/tough_left2.png")
+add_image("tough_left_image3", "assets/images/enemies/tough enemy/tough_left3.png")
+add_image("tough_left_image4", "assets/images/enemies/tough enemy/tough_left4.png")
+add_image("tough_front_image1", "assets/images/enemies/tough enemy/tough_front1.png")
+add_image("tough_front_image2", "assets/images/enemies/tough enemy/tough_front2.png")
+add_image("tough_front_image3", "assets/images/enemies/tough enemy/tough_front3.png")
+add_image("tough_front_image4", "assets/images/enemies/tough enemy/tough_front4.png")
+add_image("tough_right_image1", "assets/images/enemies/tough enemy/tough_right1.png")
+add_image("tough_right_image2", "assets/images/enemies/tough enemy/tough_right2.png")
+add_image("tough_right_image3", "assets/images/enemies/tough enemy/tough_right3.png")
+add_image("tough_right_image4", "assets/images/enemies/tough enemy/tough_right4.png")
+add_list("tough_enemy_images", [["tough_back_image1","tough_back_image2","tough_back_image3","tough_back_image4"],
+                               ["tough_left_image1","tough_left_image2","tough_left_image3","tough_left_image4"],
+                               ["tough_front_image1","tough_front_image2","tough_front_image3","tough_front_image4"],
+                               ["tough_right_image1","tough_right_image2","tough_right_image3","tough_right_image4"]])
+
+add_image("spirit_up_image", "assets/images/enemies/spirit enemy/spirit_back.png")
+add_image("spirit_left_image", "assets/images/enemies/spirit enemy/spirit_left.png")
+add_image("spirit_down_image", "assets/images/enemies/spirit enemy/spirit_front.png")
+add_image("spirit_right_image", "assets/images/enemies/spirit enemy/spirit_right.png")
+def spirit_image(spirit): # returns the spirit with its face kept white and the rest of its body made see-through
+    face_mask = mask.from_threshold(spirit, (255,255,255), threshold=(1, 1, 1, 255))
     face = face_mask.to_surface(setcolor=(245,245,245),unsetcolor=(0,0,0,0))
-    body_mask = mask.from_threshold(spirit_enemy_images[i], (255,0,0), threshold=(1, 1, 1, 255)) # pixels to be turned transparent are red
+    body_mask = mask.from_threshold(spirit, (255,0,0), threshold=(1, 1, 1, 255)) # pixels to be turned transparent are red
     face.blit(body_mask.to_surface(setcolor=((25,0,25,200)), unsetcolor=(0,0,0,0)), (0,0))
-    spirit_enemy_images[i] = face
+    return face
+def load_spirit_enemy_images(): # the spirit images are remade from their files, so only the remade ones are kept as spirit_enemy_images
+    spirits = assets.resolve(["spirit_up_image", "spirit_left_image", "spirit_down_image", "spirit_right_image"])
+    spirit_images = []
+    for i, spirit in enumerate(spirits):
+        spirit_images.append(get("image_cache").get(f"spirit {i}", lambda: spirit_image(spirit), image_sources[spirit]))
+        image_sources[spirit_images[-1]] = image_sources[spirit] # so the hit images made from it know where it came from
+    return spirit_images
+assets.add("spirit_enemy_images", load_spirit_enemy_images)
+
+#======================Enemy Variants======================#
+# tinted and see-through versions of every enemy frame are made once here instead of every time they are drawn
+# looked up by the frame itself, e.g. hit_images[frame] is the red version drawn over an enemy that was just hit
+def load_hit_images(): # a red version of every enemy frame, looked up by the frame
+    hit_images = {}
+    for name in ["default", "fast", "flying", "tough"]:
+        for direction, direction_images in enumerate(get(f"{name}_enemy_images")):
+            for i, frame in enumerate(direction_images):
+                hit_images[frame] = get("image_cache").get(f"{name} hit {direction} {i}", lambda: silhouette(frame, HIT_COLOUR), image_sources[frame])
+    for name in ["crow", "spirit"]:
+        for direction, frame in enumerate(get(f"{name}_enemy_images")):
+            hit_images[frame] = get("image_cache").get(f"{name} hit {direction}", lambda: silhouette(frame, HIT_COLOUR), image_sources[frame])
+    return hit_images
+assets.add("hit_images", load_hit_images)
+
+def load_blur_images(): # a see-through version of every crow frame drawn behind it as it dashes, looked up by the frame
+    blur_images = {}
+    for direction, frame in enumerate(get("crow_enemy_images")):
+        blur_images[frame] = get("image_cache").get(f"crow blur {direction}", lambda: transparent_copy(frame, CROW_BLUR_ALPHA), image_sources[frame])
+    return blur_images
+assets.add("blur_images", load_blur_images)
 
 
 #======================Game======================#
-white_flowers1_image = transform.scale_by(image.load("assets/images/game/white flowers.png").convert_alpha(), PIXEL_RATIO)
-white_flowers2_image = transform.scale_by(image.load("assets/images/game/white flowers2.png").convert_alpha(), PIXEL_RATIO)
+add_image("white_flowers1_image", "assets/images/game/white flowers.png")
+add_image("white_flowers2_image", "assets/images/game/white flowers2.png")
 
-grass1_image = transform.scale_by(image.load("assets/images/game/grass.png").convert_alpha(), PIXEL_RATIO)
-grass2_image = transform.scale_by(image.load("assets/images/game/grass2.png").convert_alpha(), PIXEL_RATIO)
-grass3_image = transform.scale_by(image.load("assets/images/game/grass3.png").convert_alpha(), PIXEL_RATIO)
+add_image("grass1_image", "assets/images/game/grass.png")
+add_image("grass2_image", "assets/images/game/grass2.png")
+add_image("grass3_image", "assets/images/game/grass3.png")
 
-fences_image = transform.scale_by(image.load("assets/images/game/fences.png").convert_alpha(), PIXEL_RATIO)
-crate_image = transform.scale_by(image.load("assets/images/game/crate.png").convert_alpha(), PIXEL_RATIO)
-bullet_image = transform.scale_by(image.load("assets/images/game/bullet.png").convert_alpha(), PIXEL_RATIO)
-exclamation = transform.scale_by(image.load("assets/images/game/exclamation.png").convert_alpha(), PIXEL_RATIO)
+add_image("fences_image", "assets/images/game/fences.png")
+add_image("crate_image", "assets/images/game/crate.png")
+add_image("bullet_image", "assets/images/game/bullet.png")
+add_image("exclamation", "assets/images/game/exclamation.png")
+
+# the images a cell can have, saved states refer to them by their index in this list
+add_list("cell_images", [None, "grass1_image", "grass2_image", "grass3_image", "white_flowers1_image", "white_flowers2_image", "crate_image"])
 
 #======================Buttons======================#
-eraser_image = transform.scale_by(image.load("assets/images/buttons/erase_button.png").convert_alpha(), PIXEL_RATIO)
-eraser_image_pressed = transform.scale_by(image.load("assets/images/buttons/erase_button_pressed.png").convert_alpha(), PIXEL_RATIO)
-undo_image = transform.scale_by(image.load("assets/images/buttons/undo_button.png").convert_alpha(), PIXEL_RATIO)
-redo_image = transform.scale_by(image.load("assets/images/buttons/redo_button.png").convert_alpha(), PIXEL_RATIO)
-clear_image = transform.scale_by(image.load("assets/images/buttons/clear_button.png").convert_alpha(), PIXEL_RATIO)
-return_image = transform.scale_by(image.load("assets/images/buttons/return_button.png").convert_alpha(), PIXEL_RATIO)
-settings_image = transform.scale_by(image.load("assets/images/buttons/settings_button.png").convert_alpha(), PIXEL_RATIO)
-customise_image = transform.scale_by(image.load("assets/images/buttons/customise_button.png").convert_alpha(), PIXEL_RATIO)
+add_image("eraser_image", "assets/images/buttons/erase_button.png")
+add_image("eraser_image_pressed", "assets/images/buttons/erase_button_pressed.png")
+add_image("undo_image", "assets/images/buttons/undo_button.png")
+add_image("redo_image", "assets/images/buttons/redo_button.png")
+add_image("clear_image", "assets/images/buttons/clear_button.png")
+add_image("return_image", "assets/images/buttons/return_button.png")
+add_image("settings_image", "assets/images/buttons/settings_button.png")
+add_image("customise_image", "assets/images/buttons/customise_button.png")
 
 #======================Other======================#
-cursor_image = transform.scale_by(image.load("assets/images/other/mouse_cursor.png").convert_alpha(), PIXEL_RATIO)
-padlock_image = colour_swap(transform.scale_by(image.load("assets/images/other/padlock.png").convert_alpha(), PIXEL_RATIO), WHITE, BACKGROUND_COLOUR)
-down_arrow_image = transform.scale_by(image.load("assets/images/other/down_arrow.png").convert_alpha(), PIXEL_RATIO)
-up_arrow_image = transform.flip(down_arrow_image, False, True) # flip in y
+add_image("cursor_image", "assets/images/other/mouse_cursor.png")
+assets.add("padlock_image", lambda: get("image_cache").get("padlock", lambda: colour_swap(load_image("assets/images/other/padlock.png"), WHITE, BACKGROUND_COLOUR)))
+add_image("down_arrow_image", "assets/images/other/down_arrow.png")
+assets.add("up_arrow_image", lambda: transform.flip(get("down_arrow_image"), False, True)) # flip in y
 
 #======================Fonts======================#
-small_font_image = transform.scale_by(image.load("assets/images/fonts/small_font.png").convert_alpha(), PIXEL_RATIO) # sort and rename font files
-medium_font_image = transform.scale_by(image.load("assets/images/fonts/medium_font.png").convert_alpha(), PIXEL_RATIO)
-big_font_image = transform.scale_by(image.load("assets/images/fonts/big_big_font.png").convert_alpha(), PIXEL_RATIO)
-huge_font_image = transform.scale_by(image.load("assets/images/fonts/massive_font.png").convert_alpha(), PIXEL_RATIO)
+add_image("small_font_image", "assets/images/fonts/small_font.png") # sort and rename font files
+add_image("medium_font_image", "assets/images/fonts/medium_font.png")
+add_image("big_font_image", "assets/images/fonts/big_big_font.png")
+add_image("huge_font_image", "assets/images/fonts/massive_font.png")
 
 #======================Items======================#
-bomb_image = transform.scale_by(image.load("assets/images/items/bomb.png").convert_alpha(), PIXEL_RATIO)
-shotgun_image = transform.scale_by(image.load("assets/images/items/shotgun.png").convert_alpha(), PIXEL_RATIO)
-shoes_image = transform.scale_by(image.load("assets/images/items/shoes.png").convert_alpha(), PIXEL_RATIO)
-rapid_fire_image = transform.scale_by(image.load("assets/images/items/rapid_fire.png").convert_alpha(), PIXEL_RATIO)
-time_freeze_image = transform.scale_by(image.load("assets/images/items/clock.png").convert_alpha(), PIXEL_RATIO)
-backwards_shot_image = transform.scale_by(image.load("assets/images/items/backwards_shot.png").convert_alpha(), PIXEL_RATIO)
-heart_image = transform.scale_by(image.load("assets/images/items/heart.png").convert_alpha(), PIXEL_RATIO)
-
-item_images = [bomb_image, shoes_image, rapid_fire_image, shotgun_image, time_freeze_image, backwards_shot_image, heart_image]
+add_image("bomb_image", "assets/images/items/bomb.png")
+add_image("shotgun_image", "assets/images/items/shotgun.png")
+add_image("shoes_image", "assets/images/items/shoes.png")
+add_image("rapid_fire_image", "assets/images/items/rapid_fire.png")
+add_image("time_freeze_image", "assets/images/items/clock.png")
+add_image("backwards_shot_image", "assets/images/items/backwards_shot.png")
+add_image("heart_image", "assets/images/items/heart.png")
+
+add_list("item_images", ["bomb_image", "shoes_image", "rapid_fire_image", "shotgun_image", "time_freeze_image", "backwards_shot_image", "heart_image"])
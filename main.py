@@ -1,5 +1,9 @@
 #======================Imports======================#
+from time import perf_counter
+START_TIME = perf_counter() # before anything else is imported, so the time to the first frame includes importing pygame
+
 from sys import exit
+from concurrent.futures import ThreadPoolExecutor, wait
 from math import trunc
 import sqlite3
 import json
@@ -9,12 +13,12 @@ from constants import *
 from database_functions import *
 from utility_functions import split, colour_swap
 from game import Game
+from replay import InputRecorder
 from customise_classes import ColourGrid, DrawingGrid
-from utility_classes import ImageButton, TextButton, Font, CharacterDisplay, Slider, TextBox
+from utility_classes import ImageButton, TextButton, get_font, CharacterDisplay, Slider, TextBox, DirtyRects
 from leaderboard_classes import Leaderboard, TwoPlayerLeaderboard, Podium
-from sounds import all_sound_volumes, button_click
-from images import (default_front_image2, small_font_image, medium_font_image, big_font_image, huge_font_image, 
-                    settings_image, customise_image, return_image, cursor_image, item_images, up_arrow_image)
+import sounds
+import images
 
 #======================Loading and Creating the Database======================#
 db_connection = sqlite3.connect("testing.db")
@@ -24,20 +28,15 @@ db_create_database(db_cursor, db_connection) # already handles whether or not th
 #======================Initialising======================#
 pygame.init()
 pygame.key.set_repeat(500, 100) # pressed keys generate new events every 100 ms after 500 ms
-pygame.mixer.set_num_channels(10)
+pygame.mixer.set_num_channels(SOUND_CHANNELS)
 pygame.mouse.set_visible(False)
 
 screen = pygame.display.set_mode(SCREEN_SIZE)
 pygame.display.set_caption("UNTITLED GUN GAME")
-pygame.display.set_icon(default_front_image2)
+pygame.display.set_icon(images.default_front_image2) # loaded on its own before any other thread starts loading images
 
 clock = pygame.time.Clock()
-
-#======================Fonts======================#
-small_font = Font(small_font_image, CHARACTER_LIST, WHITE, 2*PIXEL_RATIO)
-medium_font = Font(medium_font_image, CHARACTER_LIST_U, WHITE, 5*PIXEL_RATIO)
-big_font = Font(big_font_image, CHARACTER_LIST_U, WHITE, 4*PIXEL_RATIO, character_spacing=2*PIXEL_RATIO)
-huge_font = Font(huge_font_image, CHARACTER_LIST_U, WHITE, 6*PIXEL_RATIO, character_spacing=2*PIXEL_RATIO)
+dirty_rects = DirtyRects(screen.get_rect()) # the areas of the screen that have changed each frame
 
 #======================Quit Function======================#
 def quit():
@@ -46,17 +45,76 @@ def quit():
     pygame.quit()
     exit()
 
+#======================Next Frame Function======================#
+def next_frame(): # play the sounds asked for this frame, then wait until it is time for the next one
+    sounds.end_frame()
+    clock.tick(FPS)
+
+#======================Loading Screen Function======================#
+# everything is loaded now the window is open, so nothing pauses the first time it is used
+# images, sounds and fonts are loaded on a pool of threads while the window shows a loading bar
+# decoding images and sounds lets other threads run, so they load alongside each other instead of one after another
+def loading_screen(futures): # shows how many of the futures are done until they all are
+    bar_rect = pygame.Rect(0, 0, 12*EIGHT_PIXELS, PIXEL_RATIO*4)
+    bar_rect.center = screen.get_rect().center
+    first_frame_time = None
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                for future in futures: # anything that hasn't started doesn't need loading
+                    future.cancel()
+                quit()
+
+        done = sum(future.done() for future in futures)
+        screen.fill(BACKGROUND_COLOUR)
+        pygame.draw.rect(screen, PALER_BACKGROUND, bar_rect)
+        pygame.draw.rect(screen, WHITE, (bar_rect.x, bar_rect.y, bar_rect.width * done // len(futures), bar_rect.height))
+        dirty_rects.add(bar_rect)
+        dirty_rects.update("loading")
+        if first_frame_time == None:
+            first_frame_time = perf_counter() - START_TIME
+
+        if done == len(futures):
+            break
+        wait(futures, timeout=1/FPS) # the next frame, or sooner if everything finishes loading before then
+
+    for future in futures:
+        future.result() # raises anything that went wrong while loading
+    print(f"first frame after {first_frame_time*1000:.0f}ms, {len(futures)} images, sounds and fonts loaded after {(perf_counter() - START_TIME)*1000:.0f}ms")
+
+loading_executor = ThreadPoolExecutor(max_workers=LOADING_THREADS)
+loading = images.submit_preload(loading_executor) + sounds.submit_preload(loading_executor)
+# the fonts scan their images for where each character is, which starts as soon as the image has loaded
+font_loading = [loading_executor.submit(lambda: get_font(images.small_font_image, CHARACTER_LIST, WHITE, 2*PIXEL_RATIO)),
+                loading_executor.submit(lambda: get_font(images.medium_font_image, CHARACTER_LIST_U, WHITE, 5*PIXEL_RATIO)),
+                loading_executor.submit(lambda: get_font(images.big_font_image, CHARACTER_LIST_U, WHITE, 4*PIXEL_RATIO, character_spacing=2*PIXEL_RATIO)),
+                loading_executor.submit(lambda: get_font(images.huge_font_image, CHARACTER_LIST_U, WHITE, 6*PIXEL_RATIO, character_spacing=2*PIXEL_RATIO))]
+loading_screen(loading + font_loading)
+loading_executor.shutdown()
+images.save_cache()
+
+#======================Fonts======================#
+small_font, medium_font, big_font, huge_font = [future.result() for future in font_loading]
+
+#======================Cursor Function======================#
+def cursor_rect(mpos, display_mouse): # return where the cursor is drawn, None if it isn't shown
+    # the cursor is hidden when the mouse is on the edge of the window, as it has probably left it
+    if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
+        return images.cursor_image.get_rect(topleft=mpos)
+    return None
+
 #======================Set Volume Function======================#
 def set_volume():
-    for sound in all_sound_volumes.keys():
-        sound.set_volume(all_sound_volumes[sound] * settings['volume'])
+    for sound in sounds.all_sound_volumes.keys():
+        sound.set_volume(sounds.all_sound_volumes[sound] * settings['volume'])
 
 #======================Main Menu function======================#
 def main_menu(username):
     one_player_button = TextButton((2*EIGHT_PIXELS, 7.5*EIGHT_PIXELS), (10*EIGHT_PIXELS, 4*EIGHT_PIXELS), "SINGLE"+NEW_LINE+"PLAYER", big_font)
     two_player_button = TextButton((2*EIGHT_PIXELS, 12*EIGHT_PIXELS), (10*EIGHT_PIXELS, 2*EIGHT_PIXELS), "TWO PLAYER", medium_font)
-    settings_button = ImageButton((2*EIGHT_PIXELS, 14.5*EIGHT_PIXELS), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), settings_image)
-    customise_button = ImageButton((20.5*EIGHT_PIXELS, 3.5*EIGHT_PIXELS), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), customise_image)
+    settings_button = ImageButton((2*EIGHT_PIXELS, 14.5*EIGHT_PIXELS), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.settings_image)
+    customise_button = ImageButton((20.5*EIGHT_PIXELS, 3.5*EIGHT_PIXELS), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.customise_image)
     leaderboard_button = TextButton((14*EIGHT_PIXELS, 14.5*EIGHT_PIXELS), (8*EIGHT_PIXELS, 2*EIGHT_PIXELS), "LEADERBOARDS"+NEW_LINE+"+ STATISTICS", small_font)
     log_out_button = TextButton((4.5*EIGHT_PIXELS, 14.5*EIGHT_PIXELS), (3.5*EIGHT_PIXELS, 2*EIGHT_PIXELS), "LOG"+NEW_LINE+"OUT", small_font)
     quit_button = TextButton((8.5*EIGHT_PIXELS, 14.5*EIGHT_PIXELS), (3.5*EIGHT_PIXELS, 2*EIGHT_PIXELS), "QUIT", small_font)
@@ -82,24 +140,24 @@ def main_menu(username):
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN: 
                 display_mouse = False # turn the mouse off when the user types
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mpos = mpos
         mpos = pygame.mouse.get_pos()
         if mpos != previous_mpos:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons
-        one_player_button.update(mpos, click)
-        two_player_button.update(mpos, click)
-        settings_button.update(mpos, click)
-        customise_button.update(mpos, click)
-        leaderboard_button.update(mpos, click)
-        quit_button.update(mpos, click)
-        log_out_button.update(mpos, click)
+        one_player_button.update(mpos, click, dirty_rects)
+        two_player_button.update(mpos, click, dirty_rects)
+        settings_button.update(mpos, click, dirty_rects)
+        customise_button.update(mpos, click, dirty_rects)
+        leaderboard_button.update(mpos, click, dirty_rects)
+        quit_button.update(mpos, click, dirty_rects)
+        log_out_button.update(mpos, click, dirty_rects)
 
         # check buttons
         if one_player_button.get_clicked(): 
@@ -151,7 +209,12 @@ def main_menu(username):
         elif quit_button.get_clicked():
             quit()
 
+        if not dirty_rects.get_dirty("main menu"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         one_player_button.draw(screen)
         two_player_button.draw(screen)
         settings_button.draw(screen)
@@ -170,19 +233,26 @@ def main_menu(username):
 
         leaderboard.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("main menu")
+        next_frame()
 
 #======================Game Function======================#
 # for both one and two players
 def game(player_hex, highscore, players=1, player2_hex=None):
     game = Game((4*EIGHT_PIXELS, 1*EIGHT_PIXELS), player_hex, FENCE_LIST, players=players, player2_hex=player2_hex) 
+    recorder = InputRecorder(game.get_seed(), players, player_hex, player2_hex) # so the last game can be played back with headless.py --replay
     
     if players == 1: # no item storage in 2 player
         item_store_rect = pygame.Rect((1*EIGHT_PIXELS - 2*PIXEL_RATIO, 2*EIGHT_PIXELS - 2*PIXEL_RATIO), (2.5*EIGHT_PIXELS, 2.5*EIGHT_PIXELS))
+
+    # the game changes almost every frame so is always sent to the display, wide enough for the screen shake
+    game_rect = pygame.Rect((4*EIGHT_PIXELS, 1*EIGHT_PIXELS), (GAME_WIDTH*EIGHT_PIXELS, GAME_HEIGHT*EIGHT_PIXELS)).inflate(4*PIXEL_RATIO, 0)
+    # the score along the top and the items and lives down either side are only sent when they change
+    hud_rects = [pygame.Rect((0, 0), (SCREEN_WIDTH, 1*EIGHT_PIXELS)), pygame.Rect((0, 0), (game_rect.left, SCREEN_HEIGHT)), pygame.Rect((game_rect.right, 0), (SCREEN_WIDTH - game_rect.right, SCREEN_HEIGHT))]
+    hud = None
   
     highscore_font = small_font.new_colour_copy(MINOR_TEXT)
 
@@ -204,11 +274,13 @@ def game(player_hex, highscore, players=1, player2_hex=None):
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
                 if event.key == pygame.K_ESCAPE:
-                    button_click.play()
+                    sounds.play("button_click")
                     pause = not pause
+                    dirty_rects.add_all()
 
         screen.fill(BACKGROUND_COLOUR)
 
@@ -216,9 +288,19 @@ def game(player_hex, highscore, players=1, player2_hex=None):
         mpos = pygame.mouse.get_pos()
         if not display_mouse and (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
         
         if not pause:
-            game.update(event_list)            
+            keys = pygame.key.get_pressed()
+            recorder.record(keys, event_list, game)
+            game.update(event_list, keys)
+            dirty_rects.add(game_rect)
+
+        previous_hud = hud
+        hud = (game.get_score(), game.get_player_item() if players == 1 else None, game.get_player_lives())
+        if hud != previous_hud:
+            for rect in hud_rects:
+                dirty_rects.add(rect)
 
         # draw everything to the screen
         game.draw(screen)
@@ -230,32 +312,34 @@ def game(player_hex, highscore, players=1, player2_hex=None):
             # draw item
             pygame.draw.rect(screen, PALER_BACKGROUND, item_store_rect)
             if game.get_player_item() != None: # can be 0
-                screen.blit(pygame.transform.scale_by(item_images[game.get_player_item()], 2), (item_store_rect.centerx - EIGHT_PIXELS, item_store_rect.centery - EIGHT_PIXELS))
+                screen.blit(pygame.transform.scale_by(images.item_images[game.get_player_item()], 2), (item_store_rect.centerx - EIGHT_PIXELS, item_store_rect.centery - EIGHT_PIXELS))
             
             # draw lives
             for i in range(0, game.get_player_lives()):
-                screen.blit(item_images[HEART], (1*EIGHT_PIXELS + i%2*EIGHT_PIXELS, 4.5*EIGHT_PIXELS + i//2*EIGHT_PIXELS))
+                screen.blit(images.item_images[HEART], (1*EIGHT_PIXELS + i%2*EIGHT_PIXELS, 4.5*EIGHT_PIXELS + i//2*EIGHT_PIXELS))
 
             # end the game if the player is dead
             if game.get_player_lives() == 0:
+                recorder.save(REPLAY_PATH, game.get_checksum())
                 return game.get_time_score(), game.get_enemy_score(), game.get_enemies_killed(), game.get_bullets_shot(), game.get_items_used()
             
         elif players == 2:
             # draw lives
             player1_lives, player2_lives = game.get_player_lives()
             for i in range(0, player1_lives):
-                screen.blit(item_images[HEART], (2.5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS + i*EIGHT_PIXELS))
+                screen.blit(images.item_images[HEART], (2.5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS + i*EIGHT_PIXELS))
             for i in range(0, player2_lives):
-                screen.blit(item_images[HEART], (20.5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS + i*EIGHT_PIXELS))
+                screen.blit(images.item_images[HEART], (20.5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS + i*EIGHT_PIXELS))
 
             # end the game if both players are dead
             if player1_lives <= 0 and player2_lives <= 0:
+                recorder.save(REPLAY_PATH, game.get_checksum())
                 return game.get_time_score(), game.get_enemy_score(), game.get_enemies_killed(), game.get_bullets_shot(), game.get_items_used()
 
         if pause:
             # update pause-relevant buttons
-            pause_exit_button.update(mpos, click)
-            pause_settings_button.update(mpos, click)
+            pause_exit_button.update(mpos, click, dirty_rects)
+            pause_settings_button.update(mpos, click, dirty_rects)
 
             # check for pause-relevant button presses
             if pause_settings_button.get_clicked():
@@ -270,11 +354,11 @@ def game(player_hex, highscore, players=1, player2_hex=None):
             pause_exit_button.draw(screen)
             pause_settings_button.draw(screen)
             
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("game")
+        next_frame()
 
 #======================Score Screen Function======================#
 # and updates the database
@@ -324,19 +408,19 @@ def score_screen(username, time_score, enemy_score, enemies_killed, bullets_shot
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons
-        play_again_button.update(mpos, click)
-        return_button.update(mpos, click)
+        play_again_button.update(mpos, click, dirty_rects)
+        return_button.update(mpos, click, dirty_rects)
 
         # check buttons
         if play_again_button.get_clicked():
@@ -344,7 +428,12 @@ def score_screen(username, time_score, enemy_score, enemies_killed, bullets_shot
         if return_button.get_clicked():
             return False
 
+        if not dirty_rects.get_dirty("score screen"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         big_font.render(screen, f"SCORE:", (EIGHT_PIXELS, EIGHT_PIXELS + 6*PIXEL_RATIO))
         huge_font.render(screen, f"{score}", (7.25*EIGHT_PIXELS, EIGHT_PIXELS))
         highscore_font.render(screen, f"HIGHSCORE: {highscore}", (1*EIGHT_PIXELS, 4.25*EIGHT_PIXELS))
@@ -364,11 +453,11 @@ def score_screen(username, time_score, enemy_score, enemies_killed, bullets_shot
         play_again_button.draw(screen)
         return_button.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("score screen")
+        next_frame()
 
 #======================Customisation Function======================#
 def customise(character_hex, username):
@@ -401,10 +490,10 @@ def customise(character_hex, username):
     # creates the hat drawing grid with the initial hat hex
     draw_hat_grid = DrawingGrid((13*EIGHT_PIXELS, 3.5*EIGHT_PIXELS), width, hat_height, HAT_COLOURS, initial_hex=hat_hex)
 
-    up_arrow = colour_swap(up_arrow_image, WHITE, PALER_BACKGROUND)
+    up_arrow = colour_swap(images.up_arrow_image, WHITE, PALER_BACKGROUND)
 
     save_button = TextButton((3*EIGHT_PIXELS, 16*EIGHT_PIXELS), (5.5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS), "SAVE", medium_font, disabled=True)
-    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), return_image)
+    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.return_image)
 
     custom_hex = character_hex
 
@@ -422,26 +511,29 @@ def customise(character_hex, username):
                 if event.button == 1:
                     clicking = True
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:
                     clicking = False
                     unclick = True
+                    dirty_rects.add_all()
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
+        if mpos != previous_mx_my:
+            dirty_rects.add_all() # the grids show what the mouse is over
         
         # update the grids and buttons
         draw_hat_grid.update(mpos, clicking, click, unclick)
         for grid in select_grids:
             grid.update(mpos, click)
-        save_button.update(mpos, click)
-        return_button.update(mpos, click)
+        save_button.update(mpos, click, dirty_rects)
+        return_button.update(mpos, click, dirty_rects)
 
         changed = False
 
@@ -474,7 +566,12 @@ def customise(character_hex, username):
         elif return_button.get_clicked():
             return # no need to return anything as it already updates the dataabse
         
+        if not dirty_rects.get_dirty("customise"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         saved_character.draw(screen)
         custom_character.draw(screen)
         screen.blit(up_arrow, (5*EIGHT_PIXELS, 5*EIGHT_PIXELS + 6*PIXEL_RATIO))
@@ -489,11 +586,11 @@ def customise(character_hex, username):
         save_button.draw(screen)
         return_button.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("customise")
+        next_frame()
 
 #======================Leaderboards and Statistics Function======================#
 def leaderboards(username):
@@ -501,7 +598,7 @@ def leaderboards(username):
     two_player_tab_button = TextButton((7.5*EIGHT_PIXELS, 1*EIGHT_PIXELS), (4.5*EIGHT_PIXELS, 2*EIGHT_PIXELS), "TWO"+NEW_LINE+"PLAYER", small_font, hold=False)
     stat_podiums_tab_button = TextButton((12*EIGHT_PIXELS, 1*EIGHT_PIXELS), (4.5*EIGHT_PIXELS, 2*EIGHT_PIXELS), "PODIUMS", small_font, hold=False)
     my_stats_tab_button = TextButton((16.5*EIGHT_PIXELS, 1*EIGHT_PIXELS), (4.5*EIGHT_PIXELS, 2*EIGHT_PIXELS), "MY"+NEW_LINE+"STATS", small_font, hold=False)
-    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), return_image)
+    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.return_image)
 
     # single player tab
     one_player_leaderboard = Leaderboard(db_cursor, (3*EIGHT_PIXELS, 3*EIGHT_PIXELS), 18*EIGHT_PIXELS, small_font, "score", "SinglePlayerGames", "Players", rows=10, highlight_key=username, display_characters=True)
@@ -535,22 +632,22 @@ def leaderboards(username):
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mpos = mpos
         mpos = pygame.mouse.get_pos()
         if mpos != previous_mpos:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons
-        one_player_tab_button.update(mpos, click)
-        two_player_tab_button.update(mpos, click)
-        stat_podiums_tab_button.update(mpos, click)
-        my_stats_tab_button.update(mpos, click)
-        return_button.update(mpos, click)
+        one_player_tab_button.update(mpos, click, dirty_rects)
+        two_player_tab_button.update(mpos, click, dirty_rects)
+        stat_podiums_tab_button.update(mpos, click, dirty_rects)
+        my_stats_tab_button.update(mpos, click, dirty_rects)
+        return_button.update(mpos, click, dirty_rects)
 
         # check buttons, unpress every other button and swap tabs if a tab button is pressed
         if one_player_tab_button.get_clicked():
@@ -576,7 +673,12 @@ def leaderboards(username):
         elif return_button.get_clicked():
             return
 
+        if not dirty_rects.get_dirty("leaderboards"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         one_player_tab_button.draw(screen)
         two_player_tab_button.draw(screen)
         stat_podiums_tab_button.draw(screen)
@@ -609,15 +711,15 @@ def leaderboards(username):
                 small_font.render(screen, str(player_stats[2]), (my_stats_rect.right - 2*PIXEL_RATIO, my_stats_y + 2*my_stats_spacing), alignment=RIGHT)
                 small_font.render(screen, str(player_stats[3]), (my_stats_rect.right - 2*PIXEL_RATIO, my_stats_y + 3*my_stats_spacing), alignment=RIGHT)
                 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
             
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("leaderboards")
+        next_frame()
 
 #======================Settings Function======================#
 def settings_screen(size=True):
-    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), return_image)
+    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.return_image)
     save_button = TextButton((SCREEN_WIDTH//2 - 5*EIGHT_PIXELS//2, 12*EIGHT_PIXELS), (5*EIGHT_PIXELS, 1.5*EIGHT_PIXELS), "SAVE", medium_font, disabled=True)
     volume_slider = Slider((SCREEN_WIDTH//2 - 9*EIGHT_PIXELS//2, 6.5*EIGHT_PIXELS), (9*EIGHT_PIXELS, 4*PIXEL_RATIO), 0, 100, settings['volume'] * 100)
     if size:
@@ -626,6 +728,7 @@ def settings_screen(size=True):
     mpos = pygame.mouse.get_pos()
     display_mouse = True
     saved = False
+    values = None # the rounded values of the sliders
     while True:
         click = False
         unclick = False
@@ -636,25 +739,31 @@ def settings_screen(size=True):
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:
                     unclick = True
+                    dirty_rects.add_all()
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons and sliders
-        return_button.update(mpos, click)
-        save_button.update(mpos, click)
-        volume_slider.update(click, unclick, mpos)
+        return_button.update(mpos, click, dirty_rects)
+        save_button.update(mpos, click, dirty_rects)
+        volume_slider.update(click, unclick, mpos, dirty_rects)
         if size:
-            size_slider.update(click, unclick, mpos)
+            size_slider.update(click, unclick, mpos, dirty_rects)
+
+        previous_values = values
+        values = (round(volume_slider.get_value()), round(size_slider.get_value()) if size else None)
+        if values != previous_values:
+            dirty_rects.add_all() # the values written above the sliders have changed
 
         # check if settings have been changed from their initial value
         if round(volume_slider.get_value()) / 100 == settings['volume'] and (not size or (size and round(size_slider.get_value()) == settings['size'])):
@@ -676,11 +785,16 @@ def settings_screen(size=True):
         elif return_button.get_clicked():
             return
             
-        if not saved and not pygame.mixer.get_busy(): # changes only when a sound is not being played
+        if not saved and not sounds.get_busy(): # changes only when a sound is not being played
             set_volume()
             saved = True
 
+        if not dirty_rects.get_dirty("settings"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         medium_font.render(screen, "SETTINGS", (SCREEN_WIDTH//2, 3*EIGHT_PIXELS), alignment=CENTER)
         small_font.render(screen, f"VOLUME: {round(volume_slider.get_value())}%", (SCREEN_WIDTH//2, 5*EIGHT_PIXELS), alignment=CENTER)
         if size:
@@ -692,11 +806,11 @@ def settings_screen(size=True):
         if size:
             size_slider.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("settings")
+        next_frame()
 
 #======================Login Function======================#
 def login(title="LOGIN:", button_text="LOGIN", blocked_names=[]): # title so that i can use the same function for adding the second player
@@ -711,7 +825,7 @@ def login(title="LOGIN:", button_text="LOGIN", blocked_names=[]): # title so tha
     name_box = TextBox((SCREEN_WIDTH//2 - 35*PIXEL_RATIO//2, 5*EIGHT_PIXELS), (36*PIXEL_RATIO, 16*PIXEL_RATIO), medium_font, small_font, 4, name="NAME", allowed_strings=valid_names, allowed_characters=UPPER_ALPHABET)
     pin_box = TextBox((SCREEN_WIDTH//2 - 35*PIXEL_RATIO//2, 68*PIXEL_RATIO), (36*PIXEL_RATIO, 16*PIXEL_RATIO), medium_font, small_font, 4, name="PIN", allowed_characters=NUMBERS, hide=True)
     login_button = TextButton((SCREEN_WIDTH//2 - 6*EIGHT_PIXELS//2, 12*EIGHT_PIXELS), (6*EIGHT_PIXELS, 16*PIXEL_RATIO), button_text, medium_font, disabled=True)
-    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), return_image)
+    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.return_image)
 
     mpos = pygame.mouse.get_pos()
     display_mouse = True
@@ -724,21 +838,22 @@ def login(title="LOGIN:", button_text="LOGIN", blocked_names=[]): # title so tha
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
+                dirty_rects.add_all() # typing changes the text boxes
                 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons and text boxes
         name_box.update(mpos, click, event_list)
         pin_box.update(mpos, click, event_list)
-        login_button.update(mpos, click)
-        return_button.update(mpos, click)
+        login_button.update(mpos, click, dirty_rects)
+        return_button.update(mpos, click, dirty_rects)
 
         # if both text boxes have valid inputs, allow the login button to be pressed
         if name_box.get_valid() and pin_box.get_valid():
@@ -756,18 +871,23 @@ def login(title="LOGIN:", button_text="LOGIN", blocked_names=[]): # title so tha
         elif return_button.get_clicked():
             return None
 
+        if not dirty_rects.get_dirty("login"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         medium_font.render(screen, title, (SCREEN_WIDTH//2, 3*EIGHT_PIXELS), alignment=CENTER)
         name_box.draw(screen)
         pin_box.draw(screen)
         login_button.draw(screen)
         return_button.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("login")
+        next_frame()
 
 #======================Create Account Function======================#
 def create_account():
@@ -776,7 +896,7 @@ def create_account():
     name_box = TextBox((SCREEN_WIDTH//2 - 35*PIXEL_RATIO//2, 5*EIGHT_PIXELS), (36*PIXEL_RATIO, 16*PIXEL_RATIO), medium_font, small_font, 4, name="NAME", not_allowed_strings=taken_names, allowed_characters=UPPER_ALPHABET)
     pin_box = TextBox((SCREEN_WIDTH//2 - 35*PIXEL_RATIO//2, 68*PIXEL_RATIO), (36*PIXEL_RATIO, 16*PIXEL_RATIO), medium_font, small_font, 4, name="PIN", allowed_characters=NUMBERS, hide=True)
     create_button = TextButton((SCREEN_WIDTH//2 - 6*EIGHT_PIXELS//2, 12*EIGHT_PIXELS), (6*EIGHT_PIXELS, 16*PIXEL_RATIO), "CREATE", medium_font, disabled=True)
-    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), return_image)
+    return_button = ImageButton((EIGHT_PIXELS//2, EIGHT_PIXELS//2), (2*EIGHT_PIXELS, 2*EIGHT_PIXELS), images.return_image)
 
     mpos = pygame.mouse.get_pos()
     display_mouse = True
@@ -789,21 +909,22 @@ def create_account():
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
-
-        screen.fill(BACKGROUND_COLOUR)
+                dirty_rects.add_all() # typing changes the text boxes
 
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons and textboxes
         name_box.update(mpos, click, event_list)
         pin_box.update(mpos, click, event_list)
-        create_button.update(mpos, click)
-        return_button.update(mpos, click)
+        create_button.update(mpos, click, dirty_rects)
+        return_button.update(mpos, click, dirty_rects)
 
         # if both text boxes have valid inputs, allow the create account button to be pressed
         if name_box.get_valid() and pin_box.get_valid():
@@ -818,18 +939,23 @@ def create_account():
         elif return_button.get_clicked():
             return None
         
+        if not dirty_rects.get_dirty("create account"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         medium_font.render(screen, "CREATE ACCOUNT:", (SCREEN_WIDTH//2, 3*EIGHT_PIXELS), alignment=CENTER)
         name_box.draw(screen)
         pin_box.draw(screen)
         create_button.draw(screen)
         return_button.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("create account")
+        next_frame()
     
 #======================Upon-Open Menu function======================#
 def open_screen():
@@ -848,20 +974,20 @@ def open_screen():
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     click = True
+                    dirty_rects.add_all() # clicking can change anything on the screen
             elif event.type == pygame.KEYDOWN:
                 display_mouse = False
 
-        screen.fill(BACKGROUND_COLOUR)
-
         previous_mx_my = (mpos)
         mpos = pygame.mouse.get_pos()
         if (mpos) != previous_mx_my:
             display_mouse = True
+        dirty_rects.add_moving("cursor", cursor_rect(mpos, display_mouse))
 
         # update buttons
-        login_button.update(mpos, click)
-        create_account_button.update(mpos, click)
-        quit_button.update(mpos, click)
+        login_button.update(mpos, click, dirty_rects)
+        create_account_button.update(mpos, click, dirty_rects)
+        quit_button.update(mpos, click, dirty_rects)
 
         # check buttons
         if login_button.get_clicked():
@@ -875,16 +1001,21 @@ def open_screen():
         elif quit_button.get_clicked():
             quit()
 
+        if not dirty_rects.get_dirty("open screen"): # nothing has changed, so nothing needs drawing
+            next_frame()
+            continue
+
         # draw everything to the screen
+        screen.fill(BACKGROUND_COLOUR)
         login_button.draw(screen)
         create_account_button.draw(screen)
         quit_button.draw(screen)
 
-        if not (mpos[X] == 0 or mpos[X] == SCREEN_WIDTH - 1 or mpos[Y] == 0 or mpos[Y] == SCREEN_HEIGHT - 1) and display_mouse:
-            screen.blit(cursor_image, mpos)
+        if cursor_rect(mpos, display_mouse):
+            screen.blit(images.cursor_image, mpos)
 
-        pygame.display.update()
-        clock.tick(FPS)
+        dirty_rects.update("open screen")
+        next_frame()
 
 if __name__ == "__main__":
     set_volume()
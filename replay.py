@@ -0,0 +1,258 @@
+import json
+from struct import pack, unpack, calcsize
+from zlib import compress, decompress, compressobj, decompressobj
+
+import pygame
+
+from constants import PIXEL_RATIO, FPS, UP, LEFT, DOWN, RIGHT
+from game_classes import KeyState, PLAYER_CONTROLS
+
+# a replay file is a header followed by the zlib compressed input of every frame
+# the input is run-length encoded as (number of frames, player masks..., space presses) runs
+# after the input come keyframes, zlib compressed JSON of Game.get_state() taken every KEYFRAME_INTERVAL frames,
+# then an index of where each keyframe is and finally a footer giving the position of the index
+# so any frame can be reached by loading the keyframe before it and simulating at most KEYFRAME_INTERVAL frames
+# the first keyframe is compressed on its own and every other one is compressed using it as a dictionary, as much of the state (the grid, the map) changes little
+# so loading a keyframe only ever reads and decompresses the first keyframe and itself, however long the replay is
+# keyframes are still most of the file, a replay without them is only the input, e.g. 20 minutes of game is under 1 KB instead of around 80 KB
+REPLAY_MAGIC = b"TSSR"
+REPLAY_VERSION = 9 # changes whenever how games play out, the saved state or the file layout changes, 9 since bullets leaving the game fly on again
+HEADER_FORMAT = "<4sBBBQII" # magic, version, players, pixel ratio, seed, frames, final checksum
+FOOTER_FORMAT = "<Q4s" # position of the index, magic
+KEYFRAME_INTERVAL = 60*FPS # a keyframe every minute of game, 0 for no keyframes
+
+DIRECTIONS = [UP, LEFT, DOWN, RIGHT] # bit order of the masks, moving in the low 4 bits and shooting in the high 4 bits
+
+def player_numbers(players): # the player numbers used by the Player class for a number of players
+    return [0] if players == 1 else [1, 2]
+
+def keys_to_mask(keys, player): # converts a key state into an 8 bit mask of the keys a player uses
+    move_keys, shoot_keys = PLAYER_CONTROLS[player]
+    mask = 0
+    for direction in DIRECTIONS:
+        if keys[move_keys[direction]]:
+            mask |= 1 << direction
+        if keys[shoot_keys[direction]]:
+            mask |= 1 << (direction + 4)
+    return mask
+
+def mask_to_keys(mask, player): # converts an 8 bit mask back into the list of keys a player is pressing
+    move_keys, shoot_keys = PLAYER_CONTROLS[player]
+    pressed = []
+    for direction in DIRECTIONS:
+        if mask & (1 << direction):
+            pressed.append(move_keys[direction])
+        if mask & (1 << (direction + 4)):
+            pressed.append(shoot_keys[direction])
+    return pressed
+
+def write_varint(number): # encodes a positive integer in as few bytes as possible, 7 bits per byte
+    data = bytearray()
+    while number >= 0x80:
+        data.append((number & 0x7f) | 0x80)
+        number >>= 7
+    data.append(number)
+    return data
+
+def read_varint(data, index): # decodes a varint starting at index, returns the number and the index after it
+    number = 0
+    shift = 0
+    while True:
+        byte = data[index]
+        index += 1
+        number |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return number, index
+        shift += 7
+
+def write_string(string): # length prefixed string
+    encoded = (string or "").encode()
+    return write_varint(len(encoded)) + encoded
+
+def read_string(data, index):
+    length, index = read_varint(data, index)
+    return data[index:index+length].decode(), index + length
+
+def compress_keyframe(state, first): # compresses a keyframe's JSON, using the first keyframe as a dictionary unless it is the first
+    compressor = compressobj(9) if state is first else compressobj(9, zdict=first)
+    return compressor.compress(state) + compressor.flush()
+
+def decompress_keyframe(data, first=None): # undoes compress_keyframe, first is None for the first keyframe
+    decompressor = decompressobj(zdict=first) if first else decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+#======================Input Recorder Class======================#
+# records the input given to a game every frame so that the game can be replayed
+# record must be called with the same keys and event list as every call to Game.update
+class InputRecorder():
+    def __init__(self, seed, players=1, character_hex="", player2_hex="", keyframe_interval=KEYFRAME_INTERVAL):
+        self.__seed = seed
+        self.__players = players
+        self.__character_hex = character_hex
+        self.__player2_hex = player2_hex or ""
+        self.__runs = [] # list of [frames, value] where value is a tuple of the masks and space presses
+        self.__frames = 0
+        self.__keyframe_interval = keyframe_interval
+        self.__keyframes = [] # list of (frame, run, frame in run, state as JSON), only compressed when saved so recording stays quick
+
+    def record(self, keys, event_list, game=None): # record a single frame of input, before it is passed to game.update
+        # if the game is passed in, its state is saved as a keyframe every keyframe_interval frames
+        state = None
+        if game and self.__keyframe_interval and self.__frames % self.__keyframe_interval == 0:
+            state = json.dumps(game.get_state(), separators=(",", ":")).encode()
+
+        value = [keys_to_mask(keys, player) for player in player_numbers(self.__players)]
+        spaces = 0
+        for event in event_list:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                spaces += 1
+        value.append(min(spaces, 255))
+        value = tuple(value)
+
+        if self.__runs and self.__runs[-1][1] == value: # same as the last frame, extend the run
+            self.__runs[-1][0] += 1
+        else:
+            self.__runs.append([1, value])
+
+        if state: # the keyframe points at the input of this frame so playback can start from it
+            self.__keyframes.append((self.__frames, len(self.__runs) - 1, self.__runs[-1][0] - 1, state))
+        self.__frames += 1
+
+    def get_frames(self): # return the number of frames recorded
+        return self.__frames
+
+    def save(self, path, final_checksum=0): # write the replay to a file
+        body = bytearray()
+        for frames, value in self.__runs:
+            body += write_varint(frames)
+            body += bytes(value)
+        body = compress(bytes(body), 9)
+        with open(path, "wb") as file:
+            file.write(pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.__players, PIXEL_RATIO, self.__seed, self.__frames, final_checksum))
+            file.write(write_string(self.__character_hex) + write_string(self.__player2_hex))
+            file.write(write_varint(self.__keyframe_interval) + write_varint(len(body)))
+            file.write(body)
+
+            index = write_varint(len(self.__keyframes))
+            for frame, run, run_frame, state in self.__keyframes:
+                state = compress_keyframe(state, self.__keyframes[0][3])
+                index += write_varint(frame) + write_varint(run) + write_varint(run_frame) + write_varint(file.tell()) + write_varint(len(state))
+                file.write(state)
+            index_position = file.tell()
+            file.write(index)
+            file.write(pack(FOOTER_FORMAT, index_position, REPLAY_MAGIC))
+
+#======================Replay Class======================#
+# a replay loaded from a file, only the input and the keyframe index are read until a keyframe is asked for
+class Replay():
+    def __init__(self, path):
+        self.__path = path
+        with open(path, "rb") as file:
+            data = file.read(calcsize(HEADER_FORMAT))
+            magic, version, self.__players, self.__pixel_ratio, self.__seed, self.__frames, self.__final_checksum = unpack(HEADER_FORMAT, data)
+            if magic != REPLAY_MAGIC:
+                raise ValueError(f"{path} is not a replay file")
+            if version != REPLAY_VERSION:
+                raise ValueError(f"{path} is replay version {version}, expected {REPLAY_VERSION}")
+
+            file.seek(-calcsize(FOOTER_FORMAT), 2) # the footer is at the very end of the file
+            index_position, magic = unpack(FOOTER_FORMAT, file.read(calcsize(FOOTER_FORMAT)))
+            if magic != REPLAY_MAGIC:
+                raise ValueError(f"{path} is incomplete")
+            file.seek(0)
+            data = file.read(index_position) # everything up to the keyframes is needed, the keyframes are skipped over below
+            index = file.read()[:-calcsize(FOOTER_FORMAT)]
+
+        position = calcsize(HEADER_FORMAT)
+        self.__character_hex, position = read_string(data, position)
+        self.__player2_hex, position = read_string(data, position)
+        self.__keyframe_interval, position = read_varint(data, position)
+        body_length, position = read_varint(data, position)
+        body = decompress(data[position:position+body_length])
+
+        self.__keyframes = [] # list of (frame, run, frame in run, position in file, length)
+        count, position = read_varint(index, 0)
+        for _ in range(count):
+            keyframe = []
+            for _ in range(5):
+                value, position = read_varint(index, position)
+                keyframe.append(value)
+            self.__keyframes.append(tuple(keyframe))
+
+        value_size = len(player_numbers(self.__players)) + 1
+        self.__runs = []
+        index = 0
+        while index < len(body):
+            frames, index = read_varint(body, index)
+            self.__runs.append((frames, tuple(body[index:index+value_size])))
+            index += value_size
+
+    def get_players(self):
+        return self.__players
+
+    def get_pixel_ratio(self): # replays only play back the same at the size they were recorded at
+        return self.__pixel_ratio
+
+    def get_seed(self):
+        return self.__seed
+
+    def get_frames(self):
+        return self.__frames
+
+    def get_final_checksum(self):
+        return self.__final_checksum
+
+    def get_character_hex(self):
+        return self.__character_hex
+
+    def get_player2_hex(self):
+        return self.__player2_hex or None
+
+    def get_runs(self): # return the list of (frames, value) runs
+        return self.__runs
+
+    def get_keyframe_interval(self):
+        return self.__keyframe_interval
+
+    def get_keyframe_count(self):
+        return len(self.__keyframes)
+
+    def get_keyframe(self, frame): # return the last keyframe at or before a frame as a dictionary, None if there are none
+        # keyframes are evenly spaced so the right one is found without searching
+        if not self.__keyframes:
+            return None
+        index = min(max(frame, 0) // self.__keyframe_interval, len(self.__keyframes) - 1)
+        keyframe_frame, run, run_frame, position, length = self.__keyframes[index]
+        with open(self.__path, "rb") as file:
+            first = None
+            if index: # the first keyframe is the dictionary this one was compressed with
+                file.seek(self.__keyframes[0][3])
+                first = decompress_keyframe(file.read(self.__keyframes[0][4]))
+            file.seek(position)
+            state = decompress_keyframe(file.read(length), first)
+        return {'frame' : keyframe_frame, 'run' : run, 'run_frame' : run_frame, 'state' : json.loads(state)}
+
+#======================Replay Input Class======================#
+# an input provider that plays back the input of a replay
+# starts from the beginning or from a keyframe returned by Replay.get_keyframe
+class ReplayInput():
+    def __init__(self, replay, keyframe=None):
+        self.__runs = replay.get_runs()
+        self.__players = player_numbers(replay.get_players())
+        self.__run = keyframe['run'] if keyframe else 0 # the current run
+        self.__frame = keyframe['run_frame'] if keyframe else 0 # the number of frames into the current run
+
+    def get_input(self, game): # return the key state and event list for the next frame
+        if self.__run >= len(self.__runs):
+            return KeyState(), [] # replay has ended
+        frames, value = self.__runs[self.__run]
+        pressed = []
+        for i in range(len(self.__players)):
+            pressed.extend(mask_to_keys(value[i], self.__players[i]))
+        event_list = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE) for _ in range(value[-1])]
+
+        self.__frame += 1
+        if self.__frame >= frames:
+            self.__frame = 0
+            self.__run += 1
+        return KeyState(pressed), event_list
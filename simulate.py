@@ -0,0 +1,151 @@
+#======================Imports======================#
+import argparse
+import json
+import signal
+import sys
+from itertools import product
+from multiprocessing import Pool, cpu_count
+from statistics import mean, median
+from time import perf_counter
+
+from headless import HeadlessRunner, BotInput # imported first so the game runs without a window or sound
+import constants
+import game as game_module
+from constants import *
+
+# the constants that can be changed with --set, the game module looks them up when they are used
+TUNABLE_CONSTANTS = ['INDEX_MULTIPLIER', 'DELAY_MULTIPLIER', 'MIN_FRAMES',
+                     'DIFFICULTY_BASE_1P', 'DIFFICULTY_GROWTH_1P', 'DIFFICULTY_CAP_1P',
+                     'DIFFICULTY_BASE_2P', 'DIFFICULTY_GROWTH_2P', 'DIFFICULTY_CAP_2P',
+                     'ITEM_CHANCE_1P', 'ITEM_CHANCE_2P']
+
+#======================Simulating======================#
+def set_constants(overrides): # set constants in the game module of this process, anything not overridden goes back to normal
+    for name in TUNABLE_CONSTANTS:
+        setattr(game_module, name, overrides.get(name, getattr(constants, name)))
+
+def reset_signals(): # run when each worker process starts
+    # SDL catches SIGTERM and SIGINT once the game starts the display, which would stop the pool or Ctrl-C from ending the workers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+def simulate(task): # run a single game with the bot and return its statistics, run in a worker process
+    seed, players, max_frames, sample_interval, overrides = task
+    set_constants(overrides)
+
+    runner = HeadlessRunner(BotInput(), players=players, seed=seed)
+    game = runner.get_game()
+    kills_per_wave = {} # wave index : enemies killed during it
+    enemies_alive = [] # number of enemies alive every sample_interval frames after the countdown
+    while not game.get_game_over() and runner.get_frames() < max_frames:
+        killed = game.get_enemies_killed()
+        timer = game.get_timer()
+        runner.step()
+        if game.get_enemies_killed() != killed:
+            wave = game.get_wave_index()
+            kills_per_wave[wave] = kills_per_wave.get(wave, 0) + game.get_enemies_killed() - killed
+        if game.get_timer() != timer and game.get_timer() % sample_interval == 0:
+            enemies_alive.append(len(game.get_enemies()))
+
+    return {'seed'              : seed,
+            'overrides'         : overrides,
+            'survival_seconds'  : game.get_timer() / FPS,
+            'game_over'         : game.get_game_over(),
+            'waves'             : game.get_wave_index() + 1,
+            'score'             : game.get_score(),
+            'enemies_killed'    : game.get_enemies_killed(),
+            'kills_per_wave'    : [kills_per_wave.get(wave, 0) for wave in range(game.get_wave_index() + 1)],
+            'enemies_alive'     : enemies_alive}
+
+#======================Reporting======================#
+def percentile(values, fraction): # nearest rank percentile of a list of numbers
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def aggregate(results): # combine the results of many games with the same constants into one report
+    survival = [result['survival_seconds'] for result in results]
+    report = {'games'           : len(results),
+              'overrides'       : results[0]['overrides'],
+              'deaths'          : sum(result['game_over'] for result in results),
+              'survival_seconds': {'mean'   : mean(survival),
+                                   'median' : median(survival),
+                                   'p10'    : percentile(survival, 0.1),
+                                   'p90'    : percentile(survival, 0.9),
+                                   'min'    : min(survival),
+                                   'max'    : max(survival)},
+              'waves'           : mean(result['waves'] for result in results),
+              'kills_per_wave'  : [],
+              'enemies_alive'   : []}
+
+    # averaged over the games that reached each wave / were still going at each sample
+    for wave in range(max(result['waves'] for result in results)):
+        kills = [result['kills_per_wave'][wave] for result in results if wave < len(result['kills_per_wave'])]
+        report['kills_per_wave'].append({'wave' : wave, 'games' : len(kills), 'mean' : mean(kills)})
+    for sample in range(max(len(result['enemies_alive']) for result in results)):
+        alive = [result['enemies_alive'][sample] for result in results if sample < len(result['enemies_alive'])]
+        report['enemies_alive'].append({'games' : len(alive), 'mean' : mean(alive), 'max' : max(alive)})
+    return report
+
+def print_report(report, sample_seconds): # print a report in a readable form
+    overrides = ", ".join(f"{name}={value}" for name, value in report['overrides'].items()) or "default constants"
+    survival = report['survival_seconds']
+    print(f"===== {overrides} =====")
+    print(f"games: {report['games']}, deaths: {report['deaths']}, mean waves reached: {report['waves']:.2f}")
+    print(f"survival seconds: mean {survival['mean']:.1f}, median {survival['median']:.1f}, p10 {survival['p10']:.1f}, p90 {survival['p90']:.1f}, min {survival['min']:.1f}, max {survival['max']:.1f}")
+    print("kills per wave:")
+    for wave in report['kills_per_wave']:
+        print(f"  wave {wave['wave']:>3}: {wave['mean']:6.1f} over {wave['games']} games")
+    print("enemies alive:")
+    step = max(1, len(report['enemies_alive']) // 20) # at most about 20 lines
+    for sample in range(0, len(report['enemies_alive']), step):
+        alive = report['enemies_alive'][sample]
+        print(f"  {(sample + 1)*sample_seconds:>6.0f}s: mean {alive['mean']:5.1f}, max {alive['max']:>3} over {alive['games']} games")
+
+def parse_override(text): # NAME=VALUE or NAME=VALUE1,VALUE2,... into the name and a list of values
+    name, _, values = text.partition("=")
+    if name not in TUNABLE_CONSTANTS:
+        raise argparse.ArgumentTypeError(f"{name} is not one of {', '.join(TUNABLE_CONSTANTS)}")
+    try:
+        return name, [json.loads(value) for value in values.split(",")]
+    except json.JSONDecodeError:
+        raise argparse.ArgumentTypeError(f"values for {name} must be numbers")
+
+#======================Command Line======================#
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="play many games with the bot across every core and report how difficult they were")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play for each set of constants")
+    parser.add_argument("--players", type=int, choices=[1, 2], default=1)
+    parser.add_argument("--first-seed", type=int, default=0, help="games use the seeds from this one upwards")
+    parser.add_argument("--max-minutes", type=float, default=15, help="stop games that the bot survives this long")
+    parser.add_argument("--sample-seconds", type=float, default=5, help="how often the number of enemies alive is recorded")
+    parser.add_argument("--processes", type=int, default=cpu_count())
+    parser.add_argument("--set", type=parse_override, action="append", default=[], metavar="NAME=VALUE[,VALUE...]",
+                        help="change a constant, giving several values sweeps over every combination")
+    parser.add_argument("--json", default=None, help="also save the reports and every game's results to this file")
+    arguments = parser.parse_args()
+
+    names = [name for name, _ in arguments.set]
+    sweep = [dict(zip(names, values)) for values in product(*[values for _, values in arguments.set])]
+    max_frames = round(arguments.max_minutes*60*FPS) + 3*FPS # plus the countdown
+    sample_interval = max(1, round(arguments.sample_seconds*FPS))
+    tasks = [(arguments.first_seed + i, arguments.players, max_frames, sample_interval, overrides) for overrides in sweep for i in range(arguments.games)]
+
+    start_time = perf_counter()
+    results = []
+    with Pool(arguments.processes, initializer=reset_signals) as pool:
+        for result in pool.imap_unordered(simulate, tasks, chunksize=max(1, len(tasks) // (arguments.processes*8))):
+            results.append(result)
+            print(f"\r{len(results)}/{len(tasks)} games", end="", file=sys.stderr)
+        pool.close() # let the workers finish on their own, rather than being terminated when the with block ends
+        pool.join()
+    print(f"\r{len(tasks)} games in {perf_counter() - start_time:.1f}s on {arguments.processes} processes", file=sys.stderr)
+
+    reports = []
+    for overrides in sweep:
+        matching = sorted([result for result in results if result['overrides'] == overrides], key=lambda result: result['seed'])
+        reports.append(aggregate(matching))
+        print_report(reports[-1], arguments.sample_seconds)
+
+    if arguments.json:
+        with open(arguments.json, "w") as file:
+            json.dump({'reports' : reports, 'results' : sorted(results, key=lambda result: result['seed'])}, file)
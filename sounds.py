@@ -1,28 +1,68 @@
 from pygame import mixer
 
-mixer.init()
-
-button_click = mixer.Sound("assets/sounds/button click.wav")
-hover_effect = mixer.Sound("assets/sounds/hover effect.wav")
-
-default_shoot = mixer.Sound("assets/sounds/gun sounds/pew sound.wav")
-enemy_killed = mixer.Sound("assets/sounds/famitracker/score.wav")
-crow_sound = mixer.Sound("assets/sounds/enemy sounds/crow.mp3")
-player_hit_sound = mixer.Sound("assets/sounds/famitracker/death3.wav")
-player_death_sound = mixer.Sound("assets/sounds/famitracker/death2.wav")
-power_up = mixer.Sound("assets/sounds/famitracker/life_up.wav")
-crate_thud = mixer.Sound("assets/sounds/thud.wav")
-bomb_sound = mixer.Sound("assets/sounds/famitracker/bomb.wav")
-
-item_sounds = [bomb_sound, power_up, power_up, power_up, None, power_up, power_up]
-
-all_sound_volumes = {default_shoot:      0.2,
-                     crow_sound:         0.4, 
-                     button_click:       0.4, 
-                     hover_effect:       0.4, 
-                     player_hit_sound:   0.5, 
-                     player_death_sound: 0.5, 
-                     power_up:          0.5, 
-                     enemy_killed:       0.5, 
-                     crate_thud:         0.5,
-                     bomb_sound:         0.8}
+from constants import LOW_PRIORITY, MEDIUM_PRIORITY, HIGH_PRIORITY
+from asset_registry import AssetRegistry
+from voice_manager import VoiceManager
+
+#======================Lazy Loading======================#
+# like images.py, importing this module loads nothing and doesn't start the mixer
+# each sound is loaded the first time it is used as sounds.<name>, or all at once by preload()
+assets = AssetRegistry()
+get = assets.get
+
+def __getattr__(name): # only called for names that haven't been used yet, after loading they are normal attributes of the module
+    if not assets.has(name):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = get(name)
+    return globals()[name]
+
+def preload(): # load every sound now, e.g. while the game is starting, rather than the first time each is played
+    assets.preload()
+
+def submit_preload(executor): # start loading every sound on the executor's threads, returns a future for each
+    return assets.submit_preload(executor)
+
+def load_sound(path): # the mixer is started when the first sound is loaded, if the game hasn't started it already
+    if not mixer.get_init():
+        mixer.init()
+    return mixer.Sound(path)
+
+def add_sound(name, path, priority, min_frames=0): # add a sound file, it can't be played again until min_frames after it was last played
+    assets.add(name, lambda: load_sound(path))
+    voices.add(name, priority, min_frames)
+
+#======================Playing======================#
+# sounds are played by name through voices, e.g. sounds.play("enemy_killed"), rather than straight on the mixer
+# end_frame() must be called once a frame, that is when the frame's sounds actually start, or flush() to start them sooner
+voices = VoiceManager(get)
+play = voices.play
+end_frame = voices.end_frame
+flush = voices.flush
+get_busy = voices.get_busy
+get_voice_info = voices.get_voice_info
+
+#======================Sounds======================#
+add_sound("button_click", "assets/sounds/button click.wav", MEDIUM_PRIORITY)
+add_sound("hover_effect", "assets/sounds/hover effect.wav", MEDIUM_PRIORITY, 3)
+
+add_sound("default_shoot", "assets/sounds/gun sounds/pew sound.wav", LOW_PRIORITY, 3) # both players shooting at once is heard as one shot
+add_sound("enemy_killed", "assets/sounds/famitracker/score.wav", LOW_PRIORITY, 4)
+add_sound("crow_sound", "assets/sounds/enemy sounds/crow.mp3", LOW_PRIORITY, 15)
+add_sound("player_hit_sound", "assets/sounds/famitracker/death3.wav", HIGH_PRIORITY)
+add_sound("player_death_sound", "assets/sounds/famitracker/death2.wav", HIGH_PRIORITY)
+add_sound("power_up", "assets/sounds/famitracker/life_up.wav", MEDIUM_PRIORITY)
+add_sound("crate_thud", "assets/sounds/thud.wav", LOW_PRIORITY, 4)
+add_sound("bomb_sound", "assets/sounds/famitracker/bomb.wav", MEDIUM_PRIORITY)
+
+item_sounds = ["bomb_sound", "power_up", "power_up", "power_up", None, "power_up", "power_up"] # the name of the sound each item makes when used, None for no sound
+
+assets.add("all_sound_volumes", lambda: {get("default_shoot"):      0.2,
+                                         get("crow_sound"):         0.4, 
+                                         get("button_click"):       0.4, 
+                                         get("hover_effect"):       0.4, 
+                                         get("player_hit_sound"):   0.5, 
+                                         get("player_death_sound"): 0.5, 
+                                         get("power_up"):          0.5, 
+                                         get("enemy_killed"):       0.5, 
+                                         get("crate_thud"):         0.5,
+                                         get("bomb_sound"):         0.8})
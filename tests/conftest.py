@@ -0,0 +1,9 @@
+import os
+import sys
+
+# the game's modules are imported from the folder above and its assets are loaded relative to it, wherever pytest is run from
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import headless # sets the dummy video and audio drivers before pygame is started
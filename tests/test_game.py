@@ -0,0 +1,33 @@
+import json
+
+from headless import HeadlessRunner, BotInput
+
+#======================Checksums======================#
+def test_same_seed_gives_same_checksums():
+    first = HeadlessRunner(BotInput(), seed=1, checksums=True)
+    second = HeadlessRunner(BotInput(), seed=1, checksums=True)
+    first.run(max_frames=600)
+    second.run(max_frames=600)
+    assert first.get_checksums() == second.get_checksums()
+
+def test_different_seeds_give_different_checksums():
+    first = HeadlessRunner(BotInput(), seed=1)
+    second = HeadlessRunner(BotInput(), seed=2)
+    first.run(max_frames=600)
+    second.run(max_frames=600)
+    assert first.get_game().get_checksum() != second.get_game().get_checksum()
+
+def test_checksum_after_load_state():
+    # a game loaded from a saved state has the same checksum as the game it was saved from and carries on the same way
+    runner = HeadlessRunner(BotInput(), seed=2, checksums=True)
+    runner.run(max_frames=900)
+    assert not runner.get_game().get_game_over()
+    state = json.loads(json.dumps(runner.get_game().get_state())) # states are saved as JSON in replays
+    loaded = HeadlessRunner(BotInput(), seed=5, checksums=True) # the seed is replaced by the random generator in the state
+    loaded.load_state(state, runner.get_frames())
+    assert loaded.get_game().get_checksum() == runner.get_game().get_checksum()
+
+    runner.run(max_frames=600)
+    loaded.run(max_frames=600)
+    assert len(loaded.get_checksums()) == 600
+    assert loaded.get_checksums() == runner.get_checksums()[900:]
@@ -0,0 +1,53 @@
+from constants import EIGHT_PIXELS, BULLET_SPEED, BULLET_LIFETIME
+from game_classes import Cell, BulletStore
+from grid_classes import TileMap
+
+def make_tile_map(columns, rows, collision=[]): # a tile map of a grid with collision on the (row, column) tiles given
+    grid = [[Cell((column*EIGHT_PIXELS, row*EIGHT_PIXELS)) for column in range(columns)] for row in range(rows)]
+    for row, column in collision:
+        grid[row][column].set_collision(True)
+    tile_map = TileMap(columns, rows)
+    tile_map.build(grid)
+    return tile_map
+
+def middle(row, column): # the position of the middle of a tile
+    return ((column + 0.5)*EIGHT_PIXELS, (row + 0.5)*EIGHT_PIXELS)
+
+#======================Bullet Store======================#
+def test_bullets_move_and_expire():
+    bullets = BulletStore(capacity=2) # grows as bullets are added
+    tile_map = make_tile_map(16, 16)
+    for spawn_time in [0, 10, 20]:
+        bullets.add(middle(8, 8), (1, 0), 1, spawn_time)
+    bullets.update(BULLET_LIFETIME + 10, tile_map)
+    assert bullets.get_count() == 2 # only the bullet shot more than BULLET_LIFETIME ago has gone
+    assert bullets.get_positions() == [middle(8, 8)[0] + BULLET_SPEED, middle(8, 8)[1]] * 2
+
+def test_removed_bullets_are_dropped_in_order():
+    bullets = BulletStore()
+    for i in range(5):
+        bullets.add(middle(1, i), (0, 1), i, 0)
+    bullets.get_rects()
+    bullets.remove(1)
+    bullets.remove(3)
+    assert len(bullets.get_rects()) == 3
+    assert [bullets.get_damage(i) for i in range(3)] == [0, 2, 4]
+    assert bullets.get_positions() == [*middle(1, 0), *middle(1, 2), *middle(1, 4)]
+
+def test_bullets_hit_walls_but_not_the_edge_of_the_game():
+    # bullets that go out of the game through a gap in the fences carry on until they expire
+    bullets = BulletStore()
+    tile_map = make_tile_map(16, 16, collision=[(4, 4)])
+    bullets.add(middle(4, 4), (1, 0), 1, 0)
+    bullets.add((-3*EIGHT_PIXELS, middle(8, 0)[1]), (-1, 0), 1, 0)
+    bullets.update(1, tile_map)
+    assert bullets.get_count() == 1
+    assert bullets.get_positions()[0] == -3*EIGHT_PIXELS - BULLET_SPEED
+
+def test_bullet_state_round_trip():
+    bullets = BulletStore()
+    bullets.add(middle(2, 3), (0.6, 0.8), 2, 7)
+    loaded = BulletStore()
+    loaded.load_state(bullets.get_state())
+    assert loaded.get_state() == bullets.get_state()
+    assert loaded.get_rects() == bullets.get_rects()
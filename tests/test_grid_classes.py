@@ -0,0 +1,184 @@
+import random
+
+import numpy as np
+from pygame import Rect
+
+from constants import EIGHT_PIXELS, UP, LEFT, DOWN, RIGHT
+from game_classes import Cell
+from grid_classes import SpatialHash, TileMap, FlowField, FreeTiles
+
+def make_grid(columns, rows, collision=[]): # a grid of cells with collision on the (row, column) tiles given
+    grid = [[Cell((column*EIGHT_PIXELS, row*EIGHT_PIXELS)) for column in range(columns)] for row in range(rows)]
+    for row, column in collision:
+        grid[row][column].set_collision(True)
+    return grid
+
+def random_rect(generator, size=100): # a rect somewhere in a size by size area, some partly off its top and left
+    return Rect(generator.randint(-10, size), generator.randint(-10, size), generator.randint(1, 20), generator.randint(1, 20))
+
+#======================Spatial Hash======================#
+def test_spatial_hash_matches_checking_every_rect():
+    # whatever is inserted, moved and removed, the hash finds the same collisions as checking every rect
+    generator = random.Random(1)
+    spatial_hash = SpatialHash(cell_size=8)
+    rects = {}
+    for step in range(2000):
+        item = generator.randrange(30)
+        if item in rects and generator.random() < 0.2:
+            spatial_hash.remove(item)
+            del rects[item]
+        elif item in rects:
+            rects[item].topleft = random_rect(generator).topleft # moved in place, as enemies move their own rects
+            spatial_hash.move(item, rects[item])
+        else:
+            rects[item] = random_rect(generator)
+            spatial_hash.insert(item, rects[item])
+
+        query = random_rect(generator)
+        found = spatial_hash.query(query)
+        assert len(found) == len(set(found))
+        assert {item for item, rect in rects.items() if rect.colliderect(query)} <= set(found)
+        ignore = generator.choice(list(rects)) if rects else None
+        assert spatial_hash.collides(query, ignore=ignore) == any(rect.colliderect(query) for item, rect in rects.items() if item != ignore)
+        assert all(item in spatial_hash for item in rects)
+
+def test_spatial_hash_clear():
+    spatial_hash = SpatialHash()
+    spatial_hash.insert("enemy", Rect(0, 0, 10, 10))
+    spatial_hash.clear()
+    assert "enemy" not in spatial_hash
+    assert spatial_hash.query(Rect(0, 0, 10, 10)) == []
+
+#======================Tile Map======================#
+def check_tile_map(tile_map, collision): # the rects cover exactly the tiles with collision without overlapping, and each tile knows its rect
+    size = tile_map.get_tile_size()
+    covered = set()
+    for rect in tile_map.get_rects():
+        tiles = {(row, column) for row in range(rect.top // size, rect.bottom // size) for column in range(rect.left // size, rect.right // size)}
+        assert not tiles & covered
+        covered |= tiles
+    assert covered == collision
+    columns, rows = tile_map.get_size()
+    assert tile_map.get_collision() == [[(row, column) in collision for column in range(columns)] for row in range(rows)]
+    for row, column in collision:
+        tile = Rect(column*size, row*size, size, size)
+        assert [rect for rect in tile_map.get_collidables(tile) if rect.colliderect(tile)] == [rect for rect in tile_map.get_rects() if rect.contains(tile)]
+
+def test_tile_map_merges_a_built_grid():
+    collision = {(0, 0), (0, 1), (0, 2), (1, 0), (2, 0), (3, 3), (4, 3), (4, 4), (6, 6)}
+    tile_map = TileMap(8, 8)
+    tile_map.build(make_grid(8, 8, collision))
+    check_tile_map(tile_map, collision)
+    assert Rect(0, 0, 3*EIGHT_PIXELS, EIGHT_PIXELS) in tile_map.get_rects() # a tile joins the tiles to its right first
+
+def test_tile_map_adding_tiles_matches_building():
+    # crates are added one at a time and only the rects around each one are merged again
+    generator = random.Random(2)
+    collision = {(0, column) for column in range(12)} | {(11, column) for column in range(12)}
+    tile_map = TileMap(12, 12)
+    tile_map.build(make_grid(12, 12, collision))
+    for _ in range(60):
+        tile = (generator.randrange(12), generator.randrange(12))
+        version = tile_map.get_version()
+        tile_map.add_tile(*tile)
+        assert tile_map.get_version() == (version if tile in collision else version + 1) # only changes if the tile didn't already have collision
+        collision.add(tile)
+        check_tile_map(tile_map, collision)
+
+def test_tile_map_collides_many():
+    # each rect no bigger than a tile is checked against the tiles under its corners
+    generator = random.Random(3)
+    collision = {(generator.randrange(10), generator.randrange(10)) for _ in range(25)}
+    tile_map = TileMap(10, 10)
+    tile_map.build(make_grid(10, 10, collision))
+    size = (EIGHT_PIXELS // 2, EIGHT_PIXELS // 3)
+    topleft = np.array([(generator.randrange(10*EIGHT_PIXELS - size[0]), generator.randrange(10*EIGHT_PIXELS - size[1])) for _ in range(500)])
+    expected = [any(Rect(left, top, *size).colliderect(rect) for rect in tile_map.get_rects()) for left, top in topleft.tolist()]
+    assert tile_map.collides_many(topleft, size).tolist() == expected
+
+#======================Flow Field======================#
+STEPS = {UP : (0, -1), LEFT : (-1, 0), DOWN : (0, 1), RIGHT : (1, 0)} # direction : (column, row) step
+
+def middle(column, row): # the position of the middle of a tile
+    return ((column + 0.5)*EIGHT_PIXELS, (row + 0.5)*EIGHT_PIXELS)
+
+def follow(flow_field, column, row): # the tiles walked through following the flow field from the middle of a tile until it gives no direction
+    path = []
+    while (direction := flow_field.get_direction(middle(column, row), None, EIGHT_PIXELS//4)) is not None:
+        column, row = column + STEPS[direction][0], row + STEPS[direction][1]
+        path.append((column, row))
+        assert len(path) < 100 # never goes round in circles
+    return path
+
+def test_flow_field_leads_around_walls():
+    # a wall down the middle with a gap at the bottom, and a tile boxed in on the right
+    walls = {(row, 4) for row in range(6)} | {(0, 7), (1, 6), (1, 8), (2, 7)}
+    tile_map = TileMap(9, 7)
+    tile_map.build(make_grid(9, 7, walls))
+    flow_field = FlowField(tile_map)
+    flow_field.update([middle(1, 1), None])
+
+    assert follow(flow_field, 1, 1) == [] # already on the target
+    assert follow(flow_field, 7, 1) == [] # no way out
+    path = follow(flow_field, 8, 3)
+    assert path[-1] == (1, 1)
+    assert not any((row, column) in walls for column, row in path)
+    assert len(path) == 4 + 3 + 3 + 5 # across and down to the gap, then across and up, the shortest way round
+
+def test_flow_field_searches_again_when_a_crate_is_placed():
+    tile_map = TileMap(5, 5)
+    tile_map.build(make_grid(5, 5))
+    flow_field = FlowField(tile_map)
+    flow_field.update([middle(0, 2)])
+    assert len(follow(flow_field, 4, 2)) == 4
+    for row in range(5):
+        tile_map.add_tile(row, 2)
+    flow_field.update([middle(0, 2)])
+    assert follow(flow_field, 4, 2) == []
+
+def test_flow_field_turns_in_the_middle_of_a_tile():
+    # an enemy off the middle of its tile across the way to go is moved back to the middle first
+    tile_map = TileMap(5, 5)
+    tile_map.build(make_grid(5, 5))
+    flow_field = FlowField(tile_map)
+    flow_field.update([middle(0, 2)])
+    x, y = middle(3, 2)
+    assert flow_field.get_direction((x, y), None, 2) == LEFT
+    assert flow_field.get_direction((x, y + 3), None, 2) == UP
+    assert flow_field.get_direction((x, y - 3), None, 2) == DOWN
+    assert flow_field.get_direction((x, y), DOWN, 2) == LEFT # the preferred direction is only used if it is one of the shortest ways
+
+#======================Free Tiles======================#
+def test_free_tiles_matches_a_set():
+    # whatever is added and removed, the list holds each free tile once and picks only from them
+    generator = random.Random(4)
+    tiles = [(row, column) for row in range(6) for column in range(6)]
+    free_tiles = FreeTiles(tiles)
+    expected = set(tiles)
+    for _ in range(500):
+        tile = (generator.randrange(7), generator.randrange(6)) # some were never free
+        if generator.random() < 0.6:
+            free_tiles.remove(tile)
+            expected.discard(tile)
+        else:
+            free_tiles.add(tile)
+            expected.add(tile)
+        assert len(free_tiles) == len(expected)
+        assert sorted(free_tiles.get_tiles()) == sorted(expected)
+        assert (tile in free_tiles) == (tile in expected)
+        choice = free_tiles.choice(generator)
+        assert choice in expected if expected else choice is None
+
+def test_free_tiles_choice_only_depends_on_the_seed():
+    # games are replayed from their seed, so the same changes and seed have to pick the same tiles
+    picks = []
+    for _ in range(2):
+        free_tiles = FreeTiles((row, column) for row in range(4) for column in range(4))
+        generator = random.Random(5)
+        picked = []
+        while len(free_tiles):
+            picked.append(free_tiles.choice(generator))
+            free_tiles.remove(picked[-1])
+        picks.append(picked)
+    assert picks[0] == picks[1]
+    assert sorted(picks[0]) == [(row, column) for row in range(4) for column in range(4)]
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from pygame import Surface, SRCALPHA
+
+from image_cache import ImageCache
+
+def make_image(colour): # a small image filled with a colour
+    image = Surface((3, 2), SRCALPHA)
+    image.fill(colour)
+    return image
+
+def cache_files(tmp_path): # the path of a cache file and a source file its images are made from
+    source = tmp_path / "source.png"
+    source.write_bytes(b"first")
+    return str(tmp_path / "images.cache"), str(source)
+
+def saved_cache(path, source): # a cache file with a red image in it that depends on the source
+    cache = ImageCache(path, [source])
+    cache.get("red", lambda: make_image((255, 0, 0, 255)))
+    cache.save()
+
+def is_made_again(path, source): # returns if the red image has to be made again when the cache is next loaded
+    made = []
+    image = ImageCache(path, [source]).get("red", lambda: made.append(True) or make_image((255, 0, 0, 255)))
+    assert image.get_at((2, 1)) == (255, 0, 0, 255)
+    return bool(made)
+
+#======================Image Cache======================#
+def test_saved_images_are_loaded_from_the_file(tmp_path):
+    path, source = cache_files(tmp_path)
+    saved_cache(path, source)
+    assert not is_made_again(path, source)
+
+def test_changed_source_rebuilds_the_cache(tmp_path):
+    path, source = cache_files(tmp_path)
+    saved_cache(path, source)
+    with open(source, "wb") as file:
+        file.write(b"second")
+    os.utime(source, ns=(os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns + 10**9)) # so it looks newer on file systems with coarse times
+    assert is_made_again(path, source)
+
+def test_touched_source_keeps_the_cache(tmp_path):
+    # only the modified time has changed, so the hash shows the images are still right
+    path, source = cache_files(tmp_path)
+    saved_cache(path, source)
+    os.utime(source, ns=(os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns + 10**9))
+    assert not is_made_again(path, source)
+
+def test_unreadable_cache_is_rebuilt(tmp_path):
+    path, source = cache_files(tmp_path)
+    with open(path, "wb") as file:
+        file.write(b"not an image cache")
+    assert is_made_again(path, source)
+
+def test_threads_share_one_image_per_name(tmp_path):
+    # the loading threads ask for the same images at once, each name must only end up with one image
+    path, source = cache_files(tmp_path)
+    cache = ImageCache(path, [source])
+    names = [f"image {i % 20}" for i in range(400)]
+    with ThreadPoolExecutor(8) as executor:
+        images = list(executor.map(lambda name: cache.get(name, lambda: make_image((0, 255, 0, 255))), names))
+    for name, image in zip(names, images):
+        assert image is cache.get(name, lambda: None)
+    cache.save()
+    assert ImageCache(path, [source]).get("image 3", lambda: None) is not None
@@ -0,0 +1,74 @@
+import pytest
+
+from constants import FPS
+from replay import write_varint, read_varint, write_string, read_string, Replay
+from headless import HeadlessRunner, BotInput, play_replay, seek_replay
+
+def record(path, seed, frames, keyframe_interval=0): # record the bot playing a game and save it, returns the runner
+    runner = HeadlessRunner(BotInput(), seed=seed, checksums=True, record=True, keyframe_interval=keyframe_interval)
+    results = runner.run(max_frames=frames)
+    assert not results['game_over'] # so the whole length asked for is recorded
+    runner.get_recorder().save(path, results['checksum'])
+    return runner
+
+#======================Encoding======================#
+@pytest.mark.parametrize("number", [0, 1, 127, 128, 255, 16383, 16384, 2**32, 2**63])
+def test_varint_round_trip(number):
+    data = b"\x01" + write_varint(number) + b"\x02"
+    assert read_varint(data, 1) == (number, len(data) - 1)
+
+def test_string_round_trip():
+    data = write_string("0d11") + write_string("") + write_string(None)
+    string, index = read_string(data, 0)
+    assert string == "0d11"
+    string, index = read_string(data, index)
+    assert string == ""
+    string, index = read_string(data, index)
+    assert string == "" and index == len(data)
+
+#======================Replays======================#
+def test_replay_round_trip(tmp_path):
+    # playing a replay back gives the same checksum on every frame as the game it was recorded from
+    path = str(tmp_path / "game.replay")
+    runner = record(path, seed=3, frames=1200)
+    replay = Replay(path)
+    assert replay.get_seed() == 3
+    assert replay.get_frames() == 1200
+    assert sum(frames for frames, _ in replay.get_runs()) == 1200 # the run-length encoded input covers every frame
+    played, matches = play_replay(path, checksums=True)
+    assert matches
+    assert played.get_checksums() == runner.get_checksums()
+
+def test_replay_rejects_other_files(tmp_path):
+    path = tmp_path / "not a replay"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        Replay(str(path))
+
+#======================Seeking======================#
+def test_seek_matches_straight_run(tmp_path):
+    # seeking loads the keyframe before a frame and plays on from it, which has to end up where playing from the start does
+    path = str(tmp_path / "game.replay")
+    runner = record(path, seed=3, frames=25*FPS, keyframe_interval=5*FPS)
+    replay = Replay(path)
+    assert replay.get_keyframe_count() == 5
+    for frame in [1, 5*FPS - 1, 5*FPS, 5*FPS + 1, 12*FPS + 7, 20*FPS, 25*FPS]:
+        seeked = seek_replay(replay, frame)
+        assert seeked.get_frames() == frame
+        assert seeked.get_game().get_checksum() == runner.get_checksums()[frame - 1]
+
+def test_get_keyframe_finds_the_one_before(tmp_path):
+    path = str(tmp_path / "game.replay")
+    record(path, seed=4, frames=12*FPS, keyframe_interval=5*FPS)
+    replay = Replay(path)
+    for frame, keyframe_frame in [(0, 0), (5*FPS - 1, 0), (5*FPS, 5*FPS), (11*FPS, 10*FPS), (100*FPS, 10*FPS)]:
+        assert replay.get_keyframe(frame)['frame'] == keyframe_frame
+
+def test_seek_without_keyframes(tmp_path):
+    # a replay saved without keyframes is played from the start instead
+    path = str(tmp_path / "game.replay")
+    runner = record(path, seed=3, frames=600)
+    replay = Replay(path)
+    assert replay.get_keyframe_count() == 0
+    assert replay.get_keyframe(300) is None
+    assert seek_replay(replay, 300).get_game().get_checksum() == runner.get_checksums()[299]
@@ -1,11 +1,12 @@
 from math import ceil
+from collections import OrderedDict
 
 import pygame
 
 from constants import *
-from utility_functions import colour_swap, clip, round_to_nearest, split, get_key
-from images import padlock_image
-from sounds import button_click, hover_effect
+from utility_functions import colour_swap, clip, round_to_nearest, split, get_key, transparent_copy
+import images
+import sounds
 
 #======================Stack Class======================# 
 # used for the undo and redo buttons in the DrawingGrid class
@@ -59,10 +60,53 @@ class Queue():
 
     def dequeue(self): # removes the first item from the queue and returns it
         return self.__queue.pop(0)
+
+    def get_items(self): # returns a list of the items in the queue, from first to last
+        return list(self.__queue)
     
     def reset(self): # empties the queue
         self.__queue = []
 
+#======================Dirty Rects Class======================#
+# the areas of the screen that have changed in a frame, so a frame with no changes isn't drawn and only the changes are sent to the display
+# widgets add their rect when they look different, and anything that moves adds where it was and where it is now
+class DirtyRects():
+    def __init__(self, screen_rect):
+        self.__screen_rect = pygame.Rect(screen_rect)
+        self.__rects = []
+        self.__everything = True # if the whole screen has changed
+        self.__moving = {} # key : where something that moves was drawn last time it moved, None if it wasn't drawn
+        self.__screen = None # the screen (menu function) last sent to the display, everything has changed if it was a different one
+
+    def add(self, rect): # add an area that has changed
+        rect = self.__screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.__rects.append(rect)
+
+    def add_all(self): # the whole screen has changed
+        self.__everything = True
+
+    def add_moving(self, key, rect): # add where something was drawn and where it is drawn now if it has moved, rect is None if it isn't drawn
+        previous = self.__moving.get(key)
+        if rect != previous:
+            if previous:
+                self.add(previous)
+            if rect:
+                self.add(rect)
+            self.__moving[key] = rect
+
+    def get_dirty(self, screen): # return if anything on a screen has changed since it was last sent to the display
+        return self.__everything or len(self.__rects) > 0 or screen != self.__screen
+
+    def update(self, screen): # send the changed areas of a screen to the display, then start the next frame with nothing changed
+        if self.__everything or screen != self.__screen:
+            pygame.display.update()
+        elif self.__rects:
+            pygame.display.update(self.__rects)
+        self.__rects = []
+        self.__everything = False
+        self.__screen = screen
+
 #======================Button Class======================#
 # creates a pressable button that can be interacted with
 # the parent class of TextButton and ImageButton, that are used all over the project
@@ -94,7 +138,8 @@ class Button():
     def get_clicked(self): # return if the button is currently clicked
         return self.__clicked
 
-    def update(self, mpos, click): # update the image and state of the button based on the mouse position and click
+    def update(self, mpos, click, dirty_rects=None): # update the image and state of the button based on the mouse position and click
+        previous_image = self._image
         if self.__disabled:
             self._image = self._disabled_image
         else:
@@ -106,13 +151,13 @@ class Button():
 
             if self._rect.collidepoint(mpos): # if the mouse is in the button rect
                 if self.__hover == False:
-                    hover_effect.play() # if you were previously not hovering, play the hover sound
+                    sounds.play("hover_effect") # if you were previously not hovering, play the hover sound
                 if self._hover_image:
                     self._image = self._hover_image # if there is a hover image, display it
                 self.__hover = True
                 if click:
                     if not self.__pressed: # if the button was previously not pressed, play the click sound
-                        button_click.play()
+                        sounds.play("button_click")
                     self.__clicked = True
                     self.__pressed = True
                     self.__pressed_time = pygame.time.get_ticks()
@@ -121,6 +166,9 @@ class Button():
             
             if self.__pressed and self._pressed_image:
                 self._image = self._pressed_image # if the button is pressed and there is a pressed image, display it
+
+        if dirty_rects and self._image is not previous_image: # the button looks different
+            dirty_rects.add(self._rect)
     
     def draw(self, screen): # draws the button
         if self._image: # if the button has an image, display it
@@ -212,6 +260,10 @@ class Font():
         self.__space_width = space_width
         self.__character_spacing = character_spacing
         self.__height = font_image.get_height()
+        self.__rendered = OrderedDict() # text that has already been rendered, oldest first, so it can be drawn with a single blit
+        self.__rendered_bytes = 0
+        self.__hits = 0
+        self.__misses = 0
 
         border_colour = (255,0,0) # not in settings file as it is a property of the font images
         text_colour = (255,255,255)
@@ -227,7 +279,7 @@ class Font():
             font_image = colour_swap(font_image, text_colour, colour)
 
         if alpha != 255:
-            font_image.set_alpha(alpha) # make transparent
+            font_image = transparent_copy(font_image, alpha) # make transparent, copied as recoloured images are shared
 
         for x in range(0, font_image.get_width(), int(PIXEL_RATIO)): # loop through the width of the font image, incrementing by a pixel each time
             colour = font_image.get_at((x, 0)) # get the colour of the current pixel
@@ -239,8 +291,8 @@ class Font():
             else:
                 current_width += PIXEL_RATIO # stores the current width of the character, width since last border colour
 
-    def new_colour_copy(self, new_colour, alpha=255): # return a copy of the font with a different colour
-        return Font(self.__font_image, self.__character_list, new_colour, self.__space_width, character_spacing=self.__character_spacing, alpha=alpha)
+    def new_colour_copy(self, new_colour, alpha=255): # return a copy of the font with a different colour, shared with anything else that asks for it
+        return get_font(self.__font_image, self.__character_list, new_colour, self.__space_width, character_spacing=self.__character_spacing, alpha=alpha)
     
     def get_text_width(self, text): # given some text, returns the width of the text in this font
         width = [0] # stores width of each line
@@ -264,6 +316,28 @@ class Font():
         return self.__character_spacing
 
     def render(self, screen, text, pos, alignment=LEFT, hide=False): # render a string of text to the screen in the font
+        key = (text, alignment, hide)
+        if key in self.__rendered:
+            self.__rendered.move_to_end(key) # the most recently used text is kept at the end
+            self.__hits += 1
+        else:
+            self.__misses += 1
+            self.__rendered[key] = self.__render_text(text, alignment, hide)
+            self.__rendered_bytes += self.__rendered[key][0].get_pitch() * self.__rendered[key][0].get_height()
+            if len(self.__rendered) > FONT_CACHE_SIZE:
+                text_image, _ = self.__rendered.popitem(last=False)[1] # forget the least recently used text
+                self.__rendered_bytes -= text_image.get_pitch() * text_image.get_height()
+        text_image, offset = self.__rendered[key]
+        screen.blit(text_image, (pos[X] + offset[X], pos[Y] + offset[Y]))
+
+    def get_cache_info(self): # return how well the cache of rendered text is being used and how much memory it takes up
+        return {'hits'    : self.__hits,
+                'misses'  : self.__misses,
+                'strings' : len(self.__rendered),
+                'bytes'   : self.__rendered_bytes}
+
+    def __render_text(self, text, alignment, hide): # draw a string of text onto its own surface, returns the surface and where it goes relative to the text position
+        placed = [] # each character image and its offset from the text position
         x_offset = [0]
         line = 0
         y_offset = 0
@@ -275,8 +349,8 @@ class Font():
                 x_offset.append(0) # create a new entry in the offset list
                 line += 1
             elif character != ' ':
-                if alignment == LEFT: # only draw the characters if the alignment is to the left
-                    screen.blit(self.__characters[character], (pos[X] + x_offset[line], pos[Y] + y_offset))
+                if alignment == LEFT: # only place the characters if the alignment is to the left
+                    placed.append((self.__characters[character], (x_offset[line], y_offset)))
                 x_offset[line] += self.__characters[character].get_width()
                 x_offset[line] += self.__character_spacing # add the necessary widths to the x_offset
             else:
@@ -297,7 +371,7 @@ class Font():
                     y_offset = self.__height + 2*PIXEL_RATIO
                     line += 1
                 if character != ' ':
-                    screen.blit(self.__characters[character], (pos[X] + x_offset[line], pos[Y]))
+                    placed.append((self.__characters[character], (x_offset[line], 0)))
                     x_offset[line] += self.__characters[character].get_width()
                     x_offset[line] += self.__character_spacing
                 else:
@@ -314,12 +388,30 @@ class Font():
                     y_offset = self.__height + 2*PIXEL_RATIO
                     line += 1
                 elif character != ' ':
-                    screen.blit(self.__characters[character], (pos[X] + x_offset[line], pos[Y] + y_offset))
+                    placed.append((self.__characters[character], (x_offset[line], y_offset)))
                     x_offset[line] += self.__characters[character].get_width()
                     x_offset[line] += self.__character_spacing
                 else:
                     x_offset[line] += self.__space_width
 
+        if not placed:
+            return pygame.Surface((0, 0), pygame.SRCALPHA), (0, 0)
+        bounds = pygame.Rect(placed[0][1], placed[0][0].get_size()).unionall([pygame.Rect(offset, character_image.get_size()) for character_image, offset in placed])
+        text_image = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        text_image.blits([(character_image, (offset[X] - bounds.x, offset[Y] - bounds.y)) for character_image, offset in placed], doreturn=False)
+        return text_image, bounds.topleft
+
+#======================Font Variants======================#
+# building a font recolours the whole font image and scans it for characters, too slow to do every time an enemy is killed
+# so each font is built the first time it is asked for and the same one is given to everything that asks for it after
+font_variants = {}
+
+def get_font(font_image, character_list, colour, space_width, character_spacing=PIXEL_RATIO, alpha=255): # return the font with these settings
+    key = (font_image, tuple(character_list), tuple(colour), space_width, character_spacing, alpha)
+    if key not in font_variants:
+        font_variants[key] = Font(font_image, character_list, colour, space_width, character_spacing=character_spacing, alpha=alpha)
+    return font_variants[key]
+
 #======================Text Box Class======================#
 # creates a text box that a message can be written into
 # used for entering usernames and pins for logging in or creating an account
@@ -345,7 +437,7 @@ class TextBox():
         if click:
             if self.__rect.collidepoint(mpos): # if they have clicked on the text box, typing becomes true
                 if not self.__typing:
-                    button_click.play()
+                    sounds.play("button_click")
                 self.__typing = True
                 self.__error_message = "" # reset the error message if they begin to type
             else:
@@ -508,7 +600,7 @@ class Pixel():
         # otherwise draw the background colour
         if self.__locked:
             pygame.draw.rect(screen, LOCKED_COLOUR, self.__rect)
-            screen.blit(padlock_image, self.__rect.topleft)
+            screen.blit(images.padlock_image, self.__rect.topleft)
         elif self.__colour:
             pygame.draw.rect(screen, self.__colour, self.__rect) 
         elif self.__background_colour:
@@ -538,18 +630,22 @@ class Slider():
     def get_value(self): # returns the value of the slider
         return round(self.__value_from_x(self.__slider_rect.centerx), 2)
 
-    def update(self, click, unclick, mpos): # update the slider from inputs of clicking and the mouse position
+    def update(self, click, unclick, mpos, dirty_rects=None): # update the slider from inputs of clicking and the mouse position
         if not self.__active and click and self.__slider_rect.collidepoint(mpos): # if the slider is clicked on
-            button_click.play()
+            sounds.play("button_click")
             self.__active = True # become active
                             
         if self.__active:
+            previous_rect = self.__slider_rect.copy()
             if mpos[X] <= self.__bar_rect.left:
                 self.__slider_rect.centerx = self.__bar_rect.left # stop the slider at the left boundary
             elif mpos[X] >= self.__bar_rect.right:
                 self.__slider_rect.centerx = self.__bar_rect.right # stop the slider at the right boundary
             else:
                 self.__slider_rect.centerx = mpos[X] # if within range, the x of the slider becomes the x of the mouse position
+            if dirty_rects and self.__slider_rect != previous_rect: # where the slider was and where it is now
+                dirty_rects.add(previous_rect)
+                dirty_rects.add(self.__slider_rect)
 
             if unclick: # if active and the mouse button is unclicked, no longer active
                 self.__active = False
@@ -1,6 +1,9 @@
 from math import ceil, log
+from collections import OrderedDict
+from threading import Lock
 
-from pygame import Rect, mask
+import numpy as np
+from pygame import Rect, Surface, SRCALPHA, mask, surfarray
 
 def create_hex_dictionary(list): # creates a dictionary where each item in the provided list has a hex number associated with it
     bit_depth = ceil(log(len(list), 16)) # bit depth will be the n where the number of data points are greater than 2^(n-1) but less than or equal to 2^n
@@ -37,13 +40,77 @@ def clip(image, x, y, width, height):  # clips an image to the rect dimensions p
     clipped_image = image.subsurface(image_copy.get_clip())
     return clipped_image.copy()
 
-def colour_swap(image, old_colour, new_colour):
+# recolours are remembered so the same one is only made once, e.g. every button made from the same white image
+# only the most recently used are kept so recolouring many different images, such as text while the game runs, can't use up memory
+# the same copy is returned to everyone who asks for that recolour, so it must never be drawn on or changed, blit it onto another surface instead
+COLOUR_SWAP_CACHE_SIZE = 256 # how many recolours and 8-bit images are remembered, kept here as constants.py imports this file
+recoloured_images = OrderedDict() # the recolours made so far keyed by (image, old colour, new colour), least recently used first
+paletted_images = OrderedDict() # an 8-bit version of each image that has been recoloured, None if the image can't be stored with a palette
+colour_swap_lock = Lock() # images are recoloured on the loading threads at the same time
+
+def colour_swap(image, old_colour, new_colour): # returns a copy of the image with one colour swapped for another, the copy is shared so it must not be changed
+    key = (image, tuple(old_colour), tuple(new_colour))
+    with colour_swap_lock:
+        if key in recoloured_images:
+            recoloured_images.move_to_end(key)
+            return recoloured_images[key]
+        if image in paletted_images:
+            paletted_images.move_to_end(image)
+        else:
+            paletted_images[image] = palettise(image)
+            if len(paletted_images) > COLOUR_SWAP_CACHE_SIZE:
+                paletted_images.popitem(last=False)
+        if paletted_images[image] and opaque(old_colour) and opaque(new_colour):
+            recoloured_images[key] = palette_swap(paletted_images[image], old_colour, new_colour)
+        else:
+            recoloured_images[key] = mask_swap(image, old_colour, new_colour)
+        if len(recoloured_images) > COLOUR_SWAP_CACHE_SIZE:
+            recoloured_images.popitem(last=False) # forget the least recently used recolour
+        return recoloured_images[key]
+
+def mask_swap(image, old_colour, new_colour): # swaps a colour by drawing the new colour over every pixel of the old colour
     colour_mask = mask.from_threshold(image, old_colour, threshold=(1, 1, 1, 255))
     colour_change_surface = colour_mask.to_surface(setcolor=new_colour, unsetcolor=(0, 0, 0, 0))
     image_copy = image.copy()
     image_copy.blit(colour_change_surface, (0, 0))
     return image_copy
 
+def palettise(image): # returns an 8-bit copy of the image and its palette, or None if it has partly transparent pixels or too many colours
+    if image.get_colorkey() is not None or image.get_alpha() not in (None, 255):
+        return None
+    alpha = surfarray.array_alpha(image)
+    if np.any((alpha != 0) & (alpha != 255)):
+        return None
+    visible = alpha == 255
+    colours, indices = np.unique(surfarray.array2d(image)[visible], return_inverse=True) # mapped colours, so each colour is a single number
+    if len(colours) > 255:
+        return None
+    pixels = np.zeros(alpha.shape, dtype=np.uint8) # index 0 is kept for transparent pixels
+    pixels[visible] = indices + 1
+    paletted_image = Surface(image.get_size(), depth=8)
+    surfarray.blit_array(paletted_image, pixels)
+    paletted_image.set_colorkey(0)
+    return paletted_image, [(0, 0, 0)] + [tuple(image.unmap_rgb(colour))[:3] for colour in colours.tolist()]
+
+def palette_swap(paletted, old_colour, new_colour): # swaps a colour by changing the palette of the shared 8-bit pixels and drawing them onto a new image
+    paletted_image, palette = paletted
+    old_colour, new_colour = tuple(old_colour[:3]), tuple(new_colour[:3])
+    paletted_image.set_palette([new_colour if index and colour == old_colour else colour for index, colour in enumerate(palette)])
+    image = Surface(paletted_image.get_size(), SRCALPHA)
+    image.blit(paletted_image, (0, 0))
+    return image
+
+def opaque(colour): # returns if a colour has no transparency
+    return len(colour) == 3 or colour[3] == 255
+
+def silhouette(image, colour): # returns a surface where every visible pixel of the image is the colour provided
+    return mask.from_surface(image).to_surface(setcolor=colour, unsetcolor=(0, 0, 0, 0))
+
+def transparent_copy(image, alpha):
+    image_copy = image.copy()
+    image_copy.set_alpha(alpha)
+    return image_copy
+
 def round_to_nearest(x, nearest):
     return nearest * round(x/nearest)
 
@@ -0,0 +1,93 @@
+from pygame import mixer
+
+from constants import CHANNEL_PRIORITIES
+
+#======================Voice Manager Class======================#
+# plays sounds on the mixer's channels for the whole game, so a burst of sounds can't use up every channel
+# sounds asked for during a frame are played together at the end of it, one of each however many times it was asked for
+# each sound can only be played again after a number of frames, and a more important sound takes a channel from a less important one
+class VoiceManager():
+    def __init__(self, get_sound):
+        self.__get_sound = get_sound # returns a loaded sound from its name
+        self.__sounds = {} # name : (priority, fewest frames between plays)
+        self.__pending = {} # name : how many times it has been asked to play this frame
+        self.__last_played = {} # name : frame it was last played on
+        self.__channels = None # made once the mixer has been started by loading a sound
+        self.__channel_sounds = [None] * len(CHANNEL_PRIORITIES) # (priority, frame) of the sound last played on each channel
+        self.__frame = 0
+        self.__voices = 0 # channels playing at the end of the last frame
+        self.__info = {'requested'    : 0, # every time a sound was asked to play
+                       'played'       : 0,
+                       'coalesced'    : 0, # asked for again in a frame it was already going to play in
+                       'rate_limited' : 0, # asked for too soon after it last played
+                       'stolen'       : 0, # played by stopping an older sound that was no more important
+                       'dropped'      : 0, # every channel it could use was playing something more important or started this frame
+                       'peak_voices'  : 0}
+        self.__voice_frames = {} # number of channels playing : number of frames that ended with that many
+
+    def add(self, name, priority, min_frames=0): # add a sound that can be played, min_frames is the fewest frames there can be between two plays of it
+        self.__sounds[name] = (priority, min_frames)
+
+    def play(self, name): # ask for a sound to be played at the end of this frame
+        self.__info['requested'] += 1
+        if name in self.__pending:
+            self.__info['coalesced'] += 1
+        self.__pending[name] = self.__pending.get(name, 0) + 1
+
+    def end_frame(self): # play the sounds asked for this frame, then start the next frame
+        self.flush()
+        if self.__channels:
+            self.__voices = sum(channel.get_busy() for channel in self.__channels)
+            self.__info['peak_voices'] = max(self.__info['peak_voices'], self.__voices)
+        self.__voice_frames[self.__voices] = self.__voice_frames.get(self.__voices, 0) + 1
+        self.__frame += 1
+
+    def flush(self): # play the sounds asked for so far this frame now, most important first, e.g. before the game pauses
+        for name in sorted(self.__pending, key=lambda name: -self.__sounds[name][0]):
+            priority, min_frames = self.__sounds[name]
+            if name in self.__last_played and self.__frame - self.__last_played[name] < min_frames:
+                self.__info['rate_limited'] += 1
+                continue
+            sound = self.__get_sound(name) # loaded first as it starts the mixer if nothing else has
+            channel = self.__find_channel(priority)
+            if channel is None:
+                self.__info['dropped'] += 1
+                continue
+            self.__channels[channel].play(sound)
+            self.__channel_sounds[channel] = (priority, self.__frame)
+            self.__last_played[name] = self.__frame
+            self.__info['played'] += 1
+        self.__pending.clear()
+
+    def __find_channel(self, priority): # returns the index of the channel to play a sound with this priority on, None if there isn't one
+        if self.__channels is None:
+            mixer.set_num_channels(len(CHANNEL_PRIORITIES))
+            self.__channels = [mixer.Channel(i) for i in range(len(CHANNEL_PRIORITIES))]
+
+        usable = [i for i in range(len(CHANNEL_PRIORITIES)) if CHANNEL_PRIORITIES[i] <= priority]
+        usable.sort(key=lambda i: CHANNEL_PRIORITIES[i]) # channels any sound can use first, so the kept channels stay free
+        for i in usable:
+            if not self.__channels[i].get_busy():
+                return i
+
+        # every usable channel is busy, so stop the least important sound that isn't more important than this one, the oldest if there are several
+        # sounds started this frame are never stopped, so the frame's own sounds don't cut each other off
+        playing = [i for i in usable if self.__channel_sounds[i] and self.__channel_sounds[i][0] <= priority and self.__channel_sounds[i][1] < self.__frame]
+        if not playing:
+            return None
+        self.__info['stolen'] += 1
+        return min(playing, key=lambda i: self.__channel_sounds[i])
+
+    def get_busy(self): # returns True if a sound is playing or waiting to be played
+        return bool(self.__pending) or bool(mixer.get_init() and mixer.get_busy())
+
+    def get_voices(self): # returns how many channels were playing at the end of the last frame
+        return self.__voices
+
+    def get_voice_info(self): # return how many sounds were asked for, played and skipped, and how many channels were playing each frame
+        info = dict(self.__info)
+        info['frames'] = self.__frame
+        info['voices'] = self.__voices
+        info['mean_voices'] = sum(voices * frames for voices, frames in self.__voice_frames.items()) / self.__frame if self.__frame else 0
+        info['voices_per_frame'] = dict(sorted(self.__voice_frames.items())) # number of channels playing : number of frames
+        return info